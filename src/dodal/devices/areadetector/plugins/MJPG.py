@@ -1,10 +1,11 @@
-import threading
 from pathlib import Path
 
 import requests
 from ophyd import Component, Device, DeviceStatus, EpicsSignal, EpicsSignalRO, Signal
 from PIL import Image
 
+from dodal.devices.device_executor import ExecutorFullError, get_device_executor
+
 
 class MJPG(Device):
     filename: Signal = Component(Signal)
@@ -34,10 +35,15 @@ class MJPG(Device):
                 image.save(self.last_saved_path.get())
                 self.post_processing(image)
                 st.set_finished()
-            except requests.HTTPError as e:
+            except Exception as e:
                 st.set_exception(e)
 
-        threading.Thread(target=get_snapshot, daemon=True).start()
+        try:
+            get_device_executor().submit(
+                get_snapshot, task_name=f"{self.name} snapshot"
+            )
+        except ExecutorFullError as e:
+            st.set_exception(e)
 
         return st
 
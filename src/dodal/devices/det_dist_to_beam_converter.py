@@ -1,6 +1,11 @@
+import os
+import threading
 from enum import Enum
+from typing import Dict, Tuple
 
+import numpy as np
 from numpy import interp, loadtxt
+from numpy.typing import ArrayLike
 
 
 class Axis(Enum):
@@ -8,10 +13,43 @@ class Axis(Enum):
     Y_AXIS = 2
 
 
+# Parsed lookup tables shared by all converters, keyed by the absolute path of the
+# lookup file and holding the modification time of the file when it was parsed
+_TABLE_CACHE: Dict[str, Tuple[int, np.ndarray]] = {}
+_TABLE_CACHE_LOCK = threading.Lock()
+
+
+def load_lookup_table(lookup_file: str) -> np.ndarray:
+    """Gets the columns of a lookup file, only parsing the file if it has not been
+    parsed before or has been modified since.
+
+    Returns:
+        np.ndarray: A read-only array with one contiguous row per column of the file.
+    """
+    path = os.path.abspath(lookup_file)
+    modified = os.stat(path).st_mtime_ns
+    with _TABLE_CACHE_LOCK:
+        cached = _TABLE_CACHE.get(path)
+    if cached is not None and cached[0] == modified:
+        return cached[1]
+
+    rows = loadtxt(path, delimiter=" ", comments=["#", "Units"], ndmin=2)
+    columns = np.ascontiguousarray(rows.T)
+    columns.setflags(write=False)
+    with _TABLE_CACHE_LOCK:
+        _TABLE_CACHE[path] = (modified, columns)
+    return columns
+
+
+def clear_lookup_table_cache():
+    with _TABLE_CACHE_LOCK:
+        _TABLE_CACHE.clear()
+
+
 class DetectorDistanceToBeamXYConverter:
     def __init__(self, lookup_file: str):
         self.lookup_file: str = lookup_file
-        self.lookup_table_values: list = self.parse_table()
+        self.lookup_table_values: np.ndarray = self.parse_table()
 
     def get_beam_xy_from_det_dist(self, det_dist_mm: float, beam_axis: Axis) -> float:
         beam_axis_values = self.lookup_table_values[beam_axis.value]
@@ -42,20 +80,60 @@ class DetectorDistanceToBeamXYConverter:
             det_distance, image_size_pixels, det_dim, Axis.X_AXIS
         )
 
+    def get_beam_xy_from_det_dists(
+        self, det_dists_mm: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gets the beam centre in mm for many detector distances at once.
+
+        Args:
+            det_dists_mm (ArrayLike): The detector distances in mm.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The X and Y beam centres in mm, each the
+                same shape as det_dists_mm.
+        """
+        table = np.asarray(self.lookup_table_values, dtype=float)
+        det_dists = np.asarray(det_dists_mm, dtype=float)
+        det_dist_array = table[0]
+        return (
+            interp(det_dists, det_dist_array, table[Axis.X_AXIS.value]),
+            interp(det_dists, det_dist_array, table[Axis.Y_AXIS.value]),
+        )
+
+    def get_beam_xy_pixels_from_det_dists(
+        self,
+        det_dists_mm: ArrayLike,
+        image_size_pixels: Tuple[int, int],
+        det_dims: Tuple[float, float],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gets the beam centre in pixels for many detector distances at once.
+
+        Args:
+            det_dists_mm (ArrayLike): The detector distances in mm.
+            image_size_pixels (Tuple[int, int]): The width and height of the image in
+                pixels.
+            det_dims (Tuple[float, float]): The width and height of the detector in mm.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The X and Y beam centres in pixels, each
+                the same shape as det_dists_mm.
+        """
+        x_mm, y_mm = self.get_beam_xy_from_det_dists(det_dists_mm)
+        x_mm *= image_size_pixels[0] / det_dims[0]
+        y_mm *= image_size_pixels[1] / det_dims[1]
+        return x_mm, y_mm
+
     def reload_lookup_table(self):
         self.lookup_table_values = self.parse_table()
 
-    def parse_table(self) -> list:
-        rows = loadtxt(self.lookup_file, delimiter=" ", comments=["#", "Units"])
-        columns = list(zip(*rows))
-
-        return columns
+    def parse_table(self) -> np.ndarray:
+        return load_lookup_table(self.lookup_file)
 
     def __eq__(self, other):
         if not isinstance(other, DetectorDistanceToBeamXYConverter):
             return NotImplemented
         if self.lookup_file != other.lookup_file:
             return False
-        if self.lookup_table_values != other.lookup_table_values:
-            return False
-        return True
+        if self.lookup_table_values is other.lookup_table_values:
+            return True
+        return bool(np.array_equal(self.lookup_table_values, other.lookup_table_values))
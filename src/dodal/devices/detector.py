@@ -1,7 +1,11 @@
 from enum import Enum, auto
 from typing import Any, Optional, Tuple
 
-from pydantic import BaseModel, validator
+import numpy as np
+from numpy.typing import ArrayLike
+from pydantic import BaseModel, ValidationError, validator
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import ExtraError
 
 from dodal.devices.det_dim_constants import (
     EIGER2_X_16M_SIZE,
@@ -82,6 +86,71 @@ class DetectorParams(BaseModel):
             self.det_dist_to_beam_converter_path
         )
 
+    def evolve(self, **changes: Any) -> "DetectorParams":
+        """Creates a copy of these parameters with some fields changed.
+
+        Only the changed fields are validated, so sub-objects that depend only on
+        unchanged fields, such as the beam converter and the detector size constants,
+        are shared with the copy rather than rebuilt.
+
+        Args:
+            **changes: The new values of the fields to change.
+
+        Raises:
+            ValidationError: If a field does not exist or a new value is invalid.
+
+        Returns:
+            DetectorParams: The new parameters.
+        """
+        to_validate = set(changes)
+        if (
+            "det_dist_to_beam_converter_path" in changes
+            and "beam_xy_converter" not in changes
+        ):
+            to_validate.add("beam_xy_converter")
+
+        values = dict(self.__dict__)
+        values.update(changes)
+        errors = [
+            ErrorWrapper(ExtraError(), loc=name)
+            for name in changes
+            if name not in self.__fields__
+        ]
+        validated = {}
+        for name, model_field in self.__fields__.items():
+            if name not in to_validate:
+                continue
+            value, field_errors = model_field.validate(
+                values[name], values, loc=name, cls=self.__class__
+            )
+            if field_errors:
+                errors.append(field_errors)
+            else:
+                values[name] = validated[name] = value
+        if errors:
+            raise ValidationError(errors, self.__class__)
+        return self.copy(update=validated)
+
+    def _roi_offset_mm(self) -> Tuple[float, float]:
+        full_size_mm = self.detector_size_constants.det_dimension
+        roi_size_mm = (
+            self.detector_size_constants.roi_dimension
+            if self.use_roi_mode
+            else full_size_mm
+        )
+
+        offset_x = (full_size_mm.width - roi_size_mm.width) / 2.0
+        offset_y = (full_size_mm.height - roi_size_mm.height) / 2.0
+        return offset_x, offset_y
+
+    def _roi_offset_pixels(self) -> Tuple[float, float]:
+        full_size_pixels = self.detector_size_constants.det_size_pixels
+        roi_size_pixels = self.get_detector_size_pizels()
+
+        offset_x = (full_size_pixels.width - roi_size_pixels.width) / 2.0
+        offset_y = (full_size_pixels.height - roi_size_pixels.height) / 2.0
+        return offset_x, offset_y
+
     def get_beam_position_mm(self, detector_distance: float) -> Tuple[float, float]:
         x_beam_mm = self.beam_xy_converter.get_beam_xy_from_det_dist(
             detector_distance, Axis.X_AXIS
@@ -90,15 +159,28 @@ class DetectorParams(BaseModel):
             detector_distance, Axis.Y_AXIS
         )
 
-        full_size_mm = self.detector_size_constants.det_dimension
-        roi_size_mm = (
-            self.detector_size_constants.roi_dimension
-            if self.use_roi_mode
-            else full_size_mm
+        offset_x, offset_y = self._roi_offset_mm()
+
+        return x_beam_mm - offset_x, y_beam_mm - offset_y
+
+    def get_beam_positions_mm(
+        self, detector_distances: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gets the beam centre in mm for each of many detector distances, such as
+        those in a distance sweep, in one pass over the lookup table.
+
+        Args:
+            detector_distances (ArrayLike): The detector distances in mm.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The X and Y beam centres in mm, each the
+                same shape as detector_distances.
+        """
+        x_beam_mm, y_beam_mm = self.beam_xy_converter.get_beam_xy_from_det_dists(
+            detector_distances
         )
 
-        offset_x = (full_size_mm.width - roi_size_mm.width) / 2.0
-        offset_y = (full_size_mm.height - roi_size_mm.height) / 2.0
+        offset_x, offset_y = self._roi_offset_mm()
 
         return x_beam_mm - offset_x, y_beam_mm - offset_y
 
@@ -109,7 +191,6 @@ class DetectorParams(BaseModel):
 
     def get_beam_position_pixels(self, detector_distance: float) -> Tuple[float, float]:
         full_size_pixels = self.detector_size_constants.det_size_pixels
-        roi_size_pixels = self.get_detector_size_pizels()
 
         x_beam_pixels = self.beam_xy_converter.get_beam_x_pixels(
             detector_distance,
@@ -122,8 +203,36 @@ class DetectorParams(BaseModel):
             self.detector_size_constants.det_dimension.height,
         )
 
-        offset_x = (full_size_pixels.width - roi_size_pixels.width) / 2.0
-        offset_y = (full_size_pixels.height - roi_size_pixels.height) / 2.0
+        offset_x, offset_y = self._roi_offset_pixels()
+
+        return x_beam_pixels - offset_x, y_beam_pixels - offset_y
+
+    def get_beam_positions_pixels(
+        self, detector_distances: ArrayLike
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Gets the beam centre in pixels for each of many detector distances, such as
+        those in a distance sweep, in one pass over the lookup table.
+
+        Args:
+            detector_distances (ArrayLike): The detector distances in mm.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The X and Y beam centres in pixels, each
+                the same shape as detector_distances.
+        """
+        full_size_pixels = self.detector_size_constants.det_size_pixels
+        det_dimension = self.detector_size_constants.det_dimension
+
+        (
+            x_beam_pixels,
+            y_beam_pixels,
+        ) = self.beam_xy_converter.get_beam_xy_pixels_from_det_dists(
+            detector_distances,
+            (full_size_pixels.width, full_size_pixels.height),
+            (det_dimension.width, det_dimension.height),
+        )
+
+        offset_x, offset_y = self._roi_offset_pixels()
 
         return x_beam_pixels - offset_x, y_beam_pixels - offset_y
 
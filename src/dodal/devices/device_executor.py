@@ -0,0 +1,267 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from dodal.log import LOGGER
+
+
+class ExecutorFullError(RuntimeError):
+    """Raised when work is submitted to a `DeviceExecutor` whose queue is full."""
+
+
+@dataclass
+class _Task:
+    name: str
+    func: Callable[[], Any]
+    future: Future
+    submitted: float
+    started: Optional[float] = None
+
+
+@dataclass
+class ExecutorMetrics:
+    """A snapshot of the work done by a `DeviceExecutor`. Times are in seconds."""
+
+    num_workers: int
+    queue_depth: int
+    max_queue_depth: int
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    mean_queue_latency: float
+    max_queue_latency: float
+    mean_run_time: float
+    max_run_time: float
+    running: Dict[str, float] = field(default_factory=dict)
+
+
+class DeviceExecutor:
+    """A bounded pool of named daemon threads for device-side background work, such
+    as waiting for a scan to start after a kickoff.
+
+    Worker threads are started as they are needed, up to `max_workers`, and are then
+    reused. At most `max_queued` tasks can wait for a worker, after which `submit`
+    raises an `ExecutorFullError`. The executor records how long tasks wait in the
+    queue and how long they run for, and `metrics` reports which tasks are currently
+    running and for how long, so that stuck work can be found.
+    """
+
+    # Running tasks older than this, in seconds, are logged as possibly stuck
+    LONG_RUNNING_WARNING: float = 30.0
+
+    def __init__(
+        self, max_workers: int = 8, max_queued: int = 32, name: str = "dodal-device"
+    ):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.name = name
+
+        # Unbounded so that shutdown can always queue a stop for each worker, the
+        # limit on queued work is checked in submit
+        self._queue: "queue.Queue[Optional[_Task]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        self._idle_workers = 0
+        self._running: Dict[int, _Task] = {}
+        self._shutdown = False
+
+        self._max_queue_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_queue_latency = 0.0
+        self._max_queue_latency = 0.0
+        self._total_run_time = 0.0
+        self._max_run_time = 0.0
+
+    def submit(
+        self, func: Callable[..., Any], *args, task_name: str = "", **kwargs
+    ) -> Future:
+        """Runs func(*args, **kwargs) on a worker thread.
+
+        Args:
+            func (Callable): The work to run.
+            task_name (str, optional): A name for the work in metrics and logs.
+
+        Raises:
+            ExecutorFullError: If the queue of work waiting for a worker is full.
+
+        Returns:
+            Future: The future result of func.
+        """
+        future: Future = Future()
+        task = _Task(
+            task_name or getattr(func, "__name__", repr(func)),
+            lambda: func(*args, **kwargs),
+            future,
+            time.monotonic(),
+        )
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError(f"{self.name} executor has been shut down")
+            if self._queue.qsize() >= self.max_queued:
+                self._rejected += 1
+                LOGGER.warning(
+                    f"{self.name} executor rejected {task.name}, "
+                    f"{self.max_queued} tasks already queued"
+                )
+                raise ExecutorFullError(
+                    f"{self.name} executor queue is full, could not run {task.name}"
+                )
+            self._queue.put_nowait(task)
+            self._submitted += 1
+            queue_depth = self._queue.qsize()
+            self._max_queue_depth = max(self._max_queue_depth, queue_depth)
+            # Idle workers may not have taken earlier tasks from the queue yet
+            if (
+                queue_depth > self._idle_workers
+                and len(self._workers) < self.max_workers
+            ):
+                self._start_worker()
+        return future
+
+    def map(
+        self, func: Callable[[Any], Any], items: Iterable, task_name: str = ""
+    ) -> List[Any]:
+        """Runs func on each item in parallel on the workers and waits for them all.
+
+        Items that cannot be queued are run in the calling thread, as are all items
+        when called from one of the workers, so that the work cannot wait on itself.
+
+        Args:
+            func (Callable): The work to run on each item.
+            items (Iterable): The items to run the work on.
+            task_name (str, optional): A name for the work in metrics and logs.
+
+        Returns:
+            List[Any]: The result of func for each item, in order.
+        """
+        items = list(items)
+        in_worker = threading.current_thread() in self._workers
+        futures: List[Optional[Future]] = []
+        for item in items:
+            future = None
+            if not in_worker:
+                try:
+                    future = self.submit(func, item, task_name=task_name)
+                except ExecutorFullError:
+                    pass
+            futures.append(future)
+        return [
+            func(item) if future is None else future.result()
+            for item, future in zip(items, futures)
+        ]
+
+    def _start_worker(self):
+        worker = threading.Thread(
+            target=self._work,
+            name=f"{self.name}-{len(self._workers)}",
+            daemon=True,
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle_workers += 1
+            task = self._queue.get()
+            with self._lock:
+                self._idle_workers -= 1
+            if task is None:
+                return
+            if not task.future.set_running_or_notify_cancel():
+                continue
+            self._run(task)
+
+    def _run(self, task: _Task):
+        task.started = time.monotonic()
+        queue_latency = task.started - task.submitted
+        ident = threading.get_ident()
+        with self._lock:
+            self._running[ident] = task
+            self._total_queue_latency += queue_latency
+            self._max_queue_latency = max(self._max_queue_latency, queue_latency)
+        try:
+            task.future.set_result(task.func())
+            failed = False
+        except BaseException as e:
+            LOGGER.exception(f"{self.name} executor task {task.name} failed")
+            task.future.set_exception(e)
+            failed = True
+        run_time = time.monotonic() - task.started
+        with self._lock:
+            del self._running[ident]
+            self._completed += 1
+            self._failed += failed
+            self._total_run_time += run_time
+            self._max_run_time = max(self._max_run_time, run_time)
+
+    def metrics(self) -> ExecutorMetrics:
+        """Gets a snapshot of the work done by the executor so far."""
+        now = time.monotonic()
+        with self._lock:
+            started = self._completed + len(self._running)
+            return ExecutorMetrics(
+                num_workers=len(self._workers),
+                queue_depth=self._queue.qsize(),
+                max_queue_depth=self._max_queue_depth,
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                rejected=self._rejected,
+                mean_queue_latency=(
+                    self._total_queue_latency / started if started else 0.0
+                ),
+                max_queue_latency=self._max_queue_latency,
+                mean_run_time=(
+                    self._total_run_time / self._completed if self._completed else 0.0
+                ),
+                max_run_time=self._max_run_time,
+                running={
+                    task.name: now - task.started
+                    for task in self._running.values()
+                    if task.started is not None
+                },
+            )
+
+    def log_metrics(self) -> ExecutorMetrics:
+        """Logs the executor metrics, warning about any long-running tasks."""
+        metrics = self.metrics()
+        LOGGER.info(f"{self.name} executor: {metrics}")
+        for task_name, running_for in metrics.running.items():
+            if running_for > self.LONG_RUNNING_WARNING:
+                LOGGER.warning(
+                    f"{self.name} executor task {task_name} has been running for "
+                    f"{running_for:.1f}s"
+                )
+        return metrics
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None):
+        """Stops accepting work and stops the workers once queued work is done."""
+        with self._lock:
+            self._shutdown = True
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join(timeout)
+
+
+_DEVICE_EXECUTOR: Optional[DeviceExecutor] = None
+_DEVICE_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_device_executor() -> DeviceExecutor:
+    """Gets the executor shared by all devices, creating it if needed."""
+    global _DEVICE_EXECUTOR
+    with _DEVICE_EXECUTOR_LOCK:
+        if _DEVICE_EXECUTOR is None:
+            _DEVICE_EXECUTOR = DeviceExecutor()
+        return _DEVICE_EXECUTOR
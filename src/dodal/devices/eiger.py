@@ -1,18 +1,57 @@
+import threading
+import time
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple, Type
 
 from ophyd import Component, Device, EpicsSignalRO, Signal
 from ophyd.areadetector.cam import EigerDetectorCam
-from ophyd.status import AndStatus, Status, SubscriptionStatus
+from ophyd.status import AndStatus, DeviceStatus, Status, SubscriptionStatus
 
 from dodal.devices.detector import DetectorParams, TriggerMode
 from dodal.devices.eiger_odin import EigerOdin
+from dodal.devices.odin_throughput import FrameRateTracker
 from dodal.devices.status import await_value
 from dodal.devices.utils import run_functions_without_blocking
 from dodal.log import LOGGER
 
 FREE_RUN_MAX_IMAGES = 1000000
 
+# Parameters that can change between collections of a detector that is kept armed
+# without rewriting the rest of its configuration when it is re-armed
+PER_COLLECTION_PARAMETERS = {
+    "directory",
+    "prefix",
+    "run_number",
+    "omega_start",
+    "omega_increment",
+    "num_triggers",
+    "start_index",
+    "nexus_file_run_number",
+    "beam_xy_converter",
+}
+
+
+def validate_detector_parameters(detector_params: Optional[DetectorParams]):
+    if detector_params is None:
+        raise Exception("Parameters for scan must be specified")
+
+    to_check = [
+        (
+            detector_params.detector_size_constants is None,
+            "Detector Size must be set",
+        ),
+        (
+            detector_params.beam_xy_converter is None,
+            "Beam converter must be set",
+        ),
+    ]
+
+    errors = [message for check_result, message in to_check if check_result]
+
+    if errors:
+        raise Exception("\n".join(errors))
+
 
 class InternalEigerTriggerMode(Enum):
     INTERNAL_SERIES = 0
@@ -21,12 +60,178 @@ class InternalEigerTriggerMode(Enum):
     EXTERNAL_ENABLE = 3
 
 
+class FramesCapturedStatus(DeviceStatus):
+    """A status that completes when Odin has captured the target number of frames,
+    notifying watchers (progress bars) of the frames captured and the frame rate.
+
+    Rather than a fixed timeout the status fails if the frames stall. Until the frame
+    rate is known the frames may stall for `first_frame_timeout`, or indefinitely if
+    it is None, after that for `STALL_FRAME_PERIODS` frame periods at the measured
+    rate, but at least `MIN_STALL_TIMEOUT` seconds. Stalls are checked for by a timer
+    that is only rescheduled when the frames captured could next have stalled.
+    """
+
+    STALL_FRAME_PERIODS = 20
+    MIN_STALL_TIMEOUT = 5.0
+    RATE_WINDOW = 2.0
+
+    def __init__(
+        self,
+        device: "EigerDetector",
+        target: int,
+        first_frame_timeout: Optional[float] = None,
+        *args,
+        **kwargs,
+    ):
+        super().__init__(device, *args, **kwargs)
+        self.start_ts = time.time()
+        self.first_frame_timeout = first_frame_timeout
+        self._name = device.name
+        self._target_count = target
+        self._rate_tracker = FrameRateTracker(self.RATE_WINDOW)
+        self._last_count: Optional[int] = None
+        self._last_progress = time.monotonic()
+        self._stopped = threading.Event()
+        self._completion_lock = threading.Lock()
+        self._stall_lock = threading.Lock()
+        self._stall_timer: Optional[threading.Timer] = None
+        self._stall_deadline = 0.0
+
+        self._counter = device.odin.file_writer.num_captured
+        self._counter.subscribe(self._frames_captured_changed)
+        self._schedule_stall_check()
+
+    @property
+    def frame_rate(self) -> float:
+        """The rate frames are being captured at in Hz, 0 until it is known."""
+        return self._rate_tracker.rate
+
+    def allowed_stall_time(self) -> Optional[float]:
+        """How long the frames may stall before the status fails, in seconds."""
+        if self.frame_rate <= 0:
+            return self.first_frame_timeout
+        return max(self.MIN_STALL_TIMEOUT, self.STALL_FRAME_PERIODS / self.frame_rate)
+
+    def set_first_frame_timeout(self, timeout: float):
+        """Sets how long to wait from now for frames if the frame rate is not known."""
+        if self.frame_rate <= 0:
+            self._last_progress = time.monotonic()
+        self.first_frame_timeout = timeout
+        self._schedule_stall_check()
+
+    def _frames_captured_changed(self, value=None, **kwargs):
+        if value is None or self._stopped.is_set():
+            return
+        if value != self._last_count:
+            self._last_count = value
+            self._last_progress = time.monotonic()
+            self._rate_tracker.add(value, kwargs.get("timestamp") or time.time())
+            # A newly known frame rate may bring the next possible stall forward
+            self._schedule_stall_check()
+        target_reached = value >= self._target_count
+        self._notify_watchers(value)
+        if target_reached:
+            self._complete()
+
+    def _notify_watchers(self, value: int):
+        """Passes the progress to the watchers using only the arguments that bluesky
+        progress bars accept, the frame rate is available from `frame_rate`. A
+        failing watcher is logged rather than stopping the status completing."""
+        if not self._watchers:
+            return
+        time_elapsed = time.time() - self.start_ts
+        remaining = max(self._target_count - value, 0)
+        progress = dict(
+            name=self._name,
+            current=value,
+            initial=0,
+            target=self._target_count,
+            unit="frames",
+            precision=0,
+            fraction=remaining / self._target_count if self._target_count else 0,
+            time_elapsed=time_elapsed,
+            time_remaining=(
+                remaining / self.frame_rate if self.frame_rate > 0 else None
+            ),
+        )
+        self._call_watchers(**progress)
+
+    def _call_watchers(self, **progress):
+        for watcher in self._watchers:
+            try:
+                watcher(**progress)
+            except Exception:
+                LOGGER.exception(f"Failed to notify {watcher} of frames captured")
+
+    def _schedule_stall_check(self):
+        """Checks for a stall when the frames could next have stalled, unless a check
+        is already due by then."""
+        allowed_stall = self.allowed_stall_time()
+        with self._stall_lock:
+            if self._stopped.is_set() or allowed_stall is None:
+                return
+            deadline = self._last_progress + allowed_stall
+            if self._stall_timer is not None:
+                if self._stall_deadline <= deadline:
+                    return
+                self._stall_timer.cancel()
+            self._stall_deadline = deadline
+            self._stall_timer = threading.Timer(
+                max(deadline - time.monotonic(), 0), self._check_for_stall
+            )
+            self._stall_timer.daemon = True
+            self._stall_timer.start()
+
+    def _check_for_stall(self):
+        with self._stall_lock:
+            self._stall_timer = None
+        allowed_stall = self.allowed_stall_time()
+        stalled_for = time.monotonic() - self._last_progress
+        if allowed_stall is not None and stalled_for >= allowed_stall:
+            self._complete(
+                TimeoutError(
+                    f"Frames captured stalled at {self._last_count} of "
+                    f"{self._target_count} for {stalled_for:.1f}s"
+                )
+            )
+        else:
+            self._schedule_stall_check()
+
+    def cancel(self, reason: str):
+        """Stops monitoring the frames and fails the status."""
+        self._complete(RuntimeError(reason))
+
+    def _complete(self, exception: Optional[Exception] = None):
+        with self._completion_lock:
+            if self._stopped.is_set():
+                return
+            self.clean_up()
+        if exception is None:
+            self.set_finished()
+        else:
+            self.set_exception(exception)
+
+    def clean_up(self):
+        self._stopped.set()
+        self._counter.clear_sub(self._frames_captured_changed)
+        with self._stall_lock:
+            if self._stall_timer is not None:
+                self._stall_timer.cancel()
+                self._stall_timer = None
+
+
 class EigerDetector(Device):
     class ArmingSignal(Signal):
         def set(self, value, *, timeout=None, settle_time=None, **kwargs):
             return self.parent.async_stage()
 
+    class ThresholdEnergySignal(Signal):
+        def set(self, value, *, timeout=None, settle_time=None, **kwargs):
+            return self.parent.start_threshold_change(value)
+
     do_arm: ArmingSignal = Component(ArmingSignal)
+    # Set to an energy in eV to start changing the threshold before arming
+    threshold_energy: ThresholdEnergySignal = Component(ThresholdEnergySignal)
     cam: EigerDetectorCam = Component(EigerDetectorCam, "CAM:")
     odin: EigerOdin = Component(EigerOdin, "")
 
@@ -35,15 +240,36 @@ class EigerDetector(Device):
 
     STALE_PARAMS_TIMEOUT = 60
     GENERAL_STATUS_TIMEOUT = 10
+    # How long to wait for frames before the frame rate is known, after which the
+    # timeout adapts to the frame rate, see FramesCapturedStatus
     ALL_FRAMES_TIMEOUT = 30
 
     filewriters_finished: SubscriptionStatus
+    # The progress of a free run collection, created when the detector is armed
+    frames_captured: Optional[FramesCapturedStatus] = None
 
     detector_params: Optional[DetectorParams] = None
 
+    # If True the detector stays armed on unstage, and is re-armed for the next
+    # collection rewriting only the per-collection parameters if nothing else has
+    # changed, see PER_COLLECTION_PARAMETERS
+    keep_armed: bool = False
+    armed_params: Optional[DetectorParams] = None
+    _collection_prepared: bool = False
+
     arming_status = Status()
     arming_status.set_finished()
 
+    # The energy of a threshold change started ahead of arming, and its status
+    pending_threshold_change: Optional[Tuple[float, Status]] = None
+    # A threshold change requested whilst armed, applied by the next arm
+    queued_threshold_change: Optional[Tuple[float, Status]] = None
+
+    @classmethod
+    def with_odin_nodes(cls, num_nodes: int) -> Type["EigerDetector"]:
+        """Gets a subclass of this detector with num_nodes Odin filewriter nodes."""
+        return _eiger_detector_type(cls, num_nodes)
+
     @classmethod
     def with_params(
         cls,
@@ -58,24 +284,7 @@ class EigerDetector(Device):
 
     def set_detector_parameters(self, detector_params: DetectorParams):
         self.detector_params = detector_params
-        if self.detector_params is None:
-            raise Exception("Parameters for scan must be specified")
-
-        to_check = [
-            (
-                self.detector_params.detector_size_constants is None,
-                "Detector Size must be set",
-            ),
-            (
-                self.detector_params.beam_xy_converter is None,
-                "Beam converter must be set",
-            ),
-        ]
-
-        errors = [message for check_result, message in to_check if check_result]
-
-        if errors:
-            raise Exception("\n".join(errors))
+        validate_detector_parameters(detector_params)
 
     def async_stage(self):
         self.odin.nodes.clear_odin_errors()
@@ -83,9 +292,23 @@ class EigerDetector(Device):
         if not status_ok:
             raise Exception(f"Odin not initialised: {error_message}")
 
-        self.arming_status = self.do_arming_chain()
+        if self.keep_armed and self.is_armed() and self.only_collection_changed():
+            LOGGER.info("Eiger kept armed, re-arming with new collection parameters")
+            self.arming_status = self.do_collection_update_chain()
+        else:
+            self.arming_status = self.do_arming_chain()
+        self._collection_prepared = True
         return self.arming_status
 
+    def only_collection_changed(self) -> bool:
+        """Whether the detector parameters differ from those the detector was armed
+        with only in the per-collection parameters."""
+        if self.armed_params is None or self.detector_params is None:
+            return False
+        return self.armed_params.dict(
+            exclude=PER_COLLECTION_PARAMETERS
+        ) == self.detector_params.dict(exclude=PER_COLLECTION_PARAMETERS)
+
     def is_armed(self):
         return self.odin.fan.ready.get() == 1 and self.cam.acquire.get() == 1
 
@@ -99,30 +322,40 @@ class EigerDetector(Device):
         if not self.is_armed():
             LOGGER.info("Eiger not armed, arming")
             self.async_stage().wait(timeout=self.GENERAL_STATUS_TIMEOUT)
+        elif self.keep_armed and not self._collection_prepared:
+            self.async_stage().wait(timeout=self.GENERAL_STATUS_TIMEOUT)
+
+    def create_frames_captured_status(
+        self, first_frame_timeout: Optional[float] = None
+    ) -> FramesCapturedStatus:
+        """Creates a status that reports the progress of the current collection and
+        completes when all of its frames have been captured."""
+        assert self.detector_params is not None
+        return FramesCapturedStatus(
+            self, self.detector_params.full_number_of_images, first_frame_timeout
+        )
 
     def stop_odin_when_all_frames_collected(self):
         LOGGER.info("Waiting on all frames")
         try:
-            await_value(
-                self.odin.file_writer.num_captured,
-                self.detector_params.full_number_of_images,
-            ).wait(self.ALL_FRAMES_TIMEOUT)
+            if self.frames_captured is None:
+                self.frames_captured = self.create_frames_captured_status()
+            self.frames_captured.set_first_frame_timeout(self.ALL_FRAMES_TIMEOUT)
+            self.frames_captured.wait()
         finally:
+            self.frames_captured = None
             LOGGER.info("Stopping Odin")
             self.odin.stop().wait(5)
 
     def unstage(self) -> bool:
+        """Waits for the collection to be written then disarms the detector. If
+        `keep_armed` is set the detector is left armed for the next collection."""
         assert self.detector_params is not None
+        self._collection_prepared = False
+        if self.keep_armed:
+            return self._unstage_keeping_armed()
         try:
-            self.wait_on_arming_if_started()
-            if self.detector_params.trigger_mode == TriggerMode.FREE_RUN:
-                # In free run mode we have to manually stop odin
-                self.stop_odin_when_all_frames_collected()
-
-            self.odin.file_writer.start_timeout.put(1)
-            LOGGER.info("Waiting on filewriter to finish")
-            self.filewriters_finished.wait(30)
-
+            self._wait_for_collection_written()
             LOGGER.info("Disarming detector")
         finally:
             self.disarm_detector()
@@ -130,6 +363,27 @@ class EigerDetector(Device):
             self.disable_roi_mode()
         return status_ok
 
+    def _wait_for_collection_written(self):
+        self.wait_on_arming_if_started()
+        if self.detector_params.trigger_mode == TriggerMode.FREE_RUN:
+            # In free run mode we have to manually stop odin
+            self.stop_odin_when_all_frames_collected()
+
+        self.odin.file_writer.start_timeout.put(1)
+        LOGGER.info("Waiting on filewriter to finish")
+        self.filewriters_finished.wait(30)
+
+    def _unstage_keeping_armed(self) -> bool:
+        try:
+            self._wait_for_collection_written()
+            LOGGER.info("Keeping detector armed")
+        except Exception:
+            LOGGER.info("Collection failed, disarming detector")
+            self.disarm_detector()
+            self.disable_roi_mode()
+            raise
+        return self.odin.check_odin_state()
+
     def stop(self, *args):
         """Emergency stop the device, mainly used to clean up after error."""
         self.wait_on_arming_if_started()
@@ -209,6 +463,16 @@ class EigerDetector(Device):
         )
         return status
 
+    def set_omega_pvs(self) -> Status:
+        assert self.detector_params is not None
+        status = self.cam.omega_start.set(
+            self.detector_params.omega_start, timeout=self.GENERAL_STATUS_TIMEOUT
+        )
+        status &= self.cam.omega_incr.set(
+            self.detector_params.omega_increment, timeout=self.GENERAL_STATUS_TIMEOUT
+        )
+        return status
+
     def set_mx_settings_pvs(self):
         assert self.detector_params is not None
         beam_x_pixels, beam_y_pixels = self.detector_params.get_beam_position_pixels(
@@ -223,12 +487,7 @@ class EigerDetector(Device):
         status &= self.cam.det_distance.set(
             self.detector_params.detector_distance, timeout=self.GENERAL_STATUS_TIMEOUT
         )
-        status &= self.cam.omega_start.set(
-            self.detector_params.omega_start, timeout=self.GENERAL_STATUS_TIMEOUT
-        )
-        status &= self.cam.omega_incr.set(
-            self.detector_params.omega_increment, timeout=self.GENERAL_STATUS_TIMEOUT
-        )
+        status &= self.set_omega_pvs()
         return status
 
     def set_detector_threshold(self, energy: float, tolerance: float = 0.1) -> Status:
@@ -250,6 +509,88 @@ class EigerDetector(Device):
             status.set_finished()
             return status
 
+    def start_threshold_change(self, energy: float, tolerance: float = 0.1) -> Status:
+        """Starts changing the energy threshold on the detector to the specified energy
+        (in eV) in the background, e.g. as soon as the beamline energy is requested,
+        so that arming does not need to wait for the change.
+
+        The detector cannot change threshold whilst armed, so if it is armed the change
+        is queued for the next arm. Its status then completes once that arm has set the
+        threshold, or fails if the arm is for a different energy.
+
+        Args:
+            energy (float): The energy to set (in eV)
+            tolerance (float, optional): If the energy is already set to within
+                this tolerance it is not set again. Defaults to 0.1eV.
+
+        Returns:
+            Status: The status of the threshold change.
+        """
+        if self.is_armed():
+            LOGGER.info(
+                f"Eiger armed, threshold change to {energy}eV queued for next arm"
+            )
+            if self.queued_threshold_change is not None:
+                self.queued_threshold_change[1].set_exception(
+                    RuntimeError(f"Superseded by threshold change to {energy}eV")
+                )
+            status = Status()
+            self.queued_threshold_change = (energy, status)
+            return status
+        return self._start_threshold_change(energy, tolerance)
+
+    def _start_threshold_change(self, energy: float, tolerance: float) -> Status:
+        pending = self.pending_threshold_change
+        if (
+            pending is not None
+            and abs(pending[0] - energy) <= tolerance
+            and not (pending[1].done and not pending[1].success)
+        ):
+            return pending[1]
+        LOGGER.info(f"Starting Eiger threshold change to {energy}eV")
+        if pending is not None and not pending[1].done:
+            # Don't set the threshold whilst a previous change is in progress
+            status = run_functions_without_blocking(
+                [
+                    lambda: pending[1],
+                    lambda: self.set_detector_threshold(energy, tolerance),
+                ]
+            )
+        else:
+            status = self.set_detector_threshold(energy, tolerance)
+        self.pending_threshold_change = (energy, status)
+        return status
+
+    def _threshold_change_for_arming(
+        self, energy: float, tolerance: float = 0.1
+    ) -> Status:
+        """Uses a threshold change already started for this energy, otherwise starts
+        one. A change queued whilst armed completes with this change if it is for the
+        same energy, otherwise it fails."""
+        status = self._start_threshold_change(energy, tolerance)
+        self.pending_threshold_change = None
+        queued = self.queued_threshold_change
+        self.queued_threshold_change = None
+        if queued is not None:
+            queued_energy, queued_status = queued
+            if abs(queued_energy - energy) <= tolerance:
+
+                def complete_queued(status: Status):
+                    if status.success:
+                        queued_status.set_finished()
+                    else:
+                        queued_status.set_exception(status.exception())
+
+                status.add_callback(complete_queued)
+            else:
+                queued_status.set_exception(
+                    RuntimeError(
+                        f"Eiger armed at {energy}eV, threshold change to "
+                        f"{queued_energy}eV not applied"
+                    )
+                )
+        return status
+
     def set_num_triggers_and_captures(self) -> Status:
         """Sets the number of triggers and the number of images for the Eiger to capture
         during the datacollection. The number of images is the number of images per
@@ -294,6 +635,11 @@ class EigerDetector(Device):
 
     def _wait_fan_ready(self) -> Status:
         self.filewriters_finished = self.odin.create_finished_status()
+        if self.detector_params.trigger_mode == TriggerMode.FREE_RUN:
+            if self.frames_captured is not None:
+                self.frames_captured.cancel("New collection started")
+            # Odin has reset its frame count by now
+            self.frames_captured = self.create_frames_captured_status()
         LOGGER.info("Eiger staging: awaiting odin fan ready")
         return await_value(self.odin.fan.ready, 1, self.GENERAL_STATUS_TIMEOUT)
 
@@ -306,17 +652,27 @@ class EigerDetector(Device):
         self.odin.file_writer.data_type.put(f"UInt{bit_depth}")
 
     def disarm_detector(self):
+        self.armed_params = None
+        if self.frames_captured is not None:
+            self.frames_captured.cancel("Detector disarmed")
+            self.frames_captured = None
         self.cam.acquire.put(0)
 
     def do_arming_chain(self) -> Status:
         functions_to_do_arm = list()
         detector_params: DetectorParams = self.detector_params
+        if self.keep_armed and self.is_armed():
+            # Armed with parameters that cannot be changed whilst armed
+            functions_to_do_arm.append(
+                lambda: self.cam.acquire.set(0, timeout=self.GENERAL_STATUS_TIMEOUT)
+            )
+        self.armed_params = detector_params.copy()
         if detector_params.use_roi_mode:
             functions_to_do_arm.append(lambda: self.change_roi_mode(enable=True))
 
         functions_to_do_arm.extend(
             [
-                lambda: self.set_detector_threshold(
+                lambda: self._threshold_change_for_arming(
                     energy=detector_params.current_energy_ev
                 ),
                 self.set_cam_pvs,
@@ -333,3 +689,37 @@ class EigerDetector(Device):
         )
 
         return run_functions_without_blocking(functions_to_do_arm)
+
+    def do_collection_update_chain(self) -> Status:
+        """Re-arms a detector that was kept armed for a collection that differs only in
+        the per-collection parameters. As in `do_arming_chain` the detector is disarmed
+        whilst its parameters are written and the filewriters are restarted for the new
+        file, but only the per-collection parameters are rewritten."""
+        self.armed_params = self.detector_params.copy()
+        return run_functions_without_blocking(
+            [
+                lambda: self.cam.acquire.set(0, timeout=self.GENERAL_STATUS_TIMEOUT),
+                self.set_odin_pvs,
+                self.set_omega_pvs,
+                self.set_num_triggers_and_captures,
+                lambda: await_value(self.stale_params, 0, 60),
+                self._wait_for_odin_status,
+                lambda: self.cam.acquire.set(1, timeout=self.GENERAL_STATUS_TIMEOUT),
+                self._wait_fan_ready,
+                self._finish_arm,
+            ]
+        )
+
+
+@lru_cache(maxsize=None)
+def _eiger_detector_type(
+    base: Type[EigerDetector], num_nodes: int
+) -> Type[EigerDetector]:
+    odin_type = EigerOdin.with_num_nodes(num_nodes)
+    if odin_type is base.odin.cls:
+        return base
+    return type(
+        f"{base.__name__}{num_nodes}OdinNodes",
+        (base,),
+        {"odin": Component(odin_type, "")},
+    )
@@ -0,0 +1,290 @@
+import asyncio
+from typing import Optional
+
+from ophyd.v2.core import AsyncStatus, Device, wait_for_value
+from ophyd.v2.epics import epics_signal_r, epics_signal_rw
+
+from dodal.devices.detector import DetectorParams, TriggerMode
+from dodal.devices.eiger import (
+    FREE_RUN_MAX_IMAGES,
+    InternalEigerTriggerMode,
+    validate_detector_parameters,
+)
+from dodal.devices.eiger_odin_async import EigerOdinAsync
+from dodal.log import LOGGER
+
+# The MULTIPLE image mode of the areaDetector cam
+IMAGE_MODE_MULTIPLE = 1
+
+
+class EigerCamAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        def rw(datatype, suffix: str):
+            return epics_signal_rw(
+                datatype, f"{prefix}{suffix}_RBV", f"{prefix}{suffix}"
+            )
+
+        self.acquire = rw(int, "Acquire")
+        self.acquire_time = rw(float, "AcquireTime")
+        self.acquire_period = rw(float, "AcquirePeriod")
+        self.num_exposures = rw(int, "NumExposures")
+        self.image_mode = rw(int, "ImageMode")
+        self.trigger_mode = rw(int, "TriggerMode")
+        self.num_images = rw(int, "NumImages")
+        self.num_triggers = rw(int, "NumTriggers")
+        self.omega_start = rw(float, "OmegaStart")
+        self.omega_incr = rw(float, "OmegaIncr")
+        self.beam_center_x = rw(float, "BeamX")
+        self.beam_center_y = rw(float, "BeamY")
+        self.det_distance = rw(float, "DetDist")
+        self.photon_energy = rw(float, "PhotonEnergy")
+        self.roi_mode = rw(int, "ROIMode")
+        super().__init__(name)
+
+
+class EigerDetectorAsync(Device):
+    """An ophyd v2 version of `EigerDetector`.
+
+    Arming writes all of the detector and filewriter configuration concurrently and
+    then waits on the detector, rather than chaining each write after the last.
+    Cancelling the arm, e.g. through `stop`, disarms the detector.
+    """
+
+    STALE_PARAMS_TIMEOUT = 60
+    GENERAL_STATUS_TIMEOUT = 10
+    ALL_FRAMES_TIMEOUT = 30
+    FILEWRITERS_TIMEOUT = 30
+
+    def __init__(self, prefix: str, name: str = "", num_odin_nodes: int = 4):
+        self.cam = EigerCamAsync(prefix + "CAM:")
+        self.odin = EigerOdinAsync(prefix, num_nodes=num_odin_nodes)
+        self.stale_params = epics_signal_r(int, prefix + "CAM:StaleParameters_RBV")
+        self.bit_depth = epics_signal_r(int, prefix + "CAM:BitDepthImage_RBV")
+        self.detector_params: Optional[DetectorParams] = None
+        self._arming: Optional[asyncio.Task] = None
+        super().__init__(name)
+
+    @classmethod
+    def with_params(
+        cls,
+        params: DetectorParams,
+        name: str = "EigerDetectorAsync",
+        *args,
+        **kwargs,
+    ):
+        det = cls(name=name, *args, **kwargs)
+        det.set_detector_parameters(params)
+        return det
+
+    def set_detector_parameters(self, detector_params: DetectorParams):
+        validate_detector_parameters(detector_params)
+        self.detector_params = detector_params
+
+    def arm(self) -> AsyncStatus:
+        """Starts arming the detector, returning a status that completes once armed."""
+        self._arming = asyncio.ensure_future(self._arm())
+        return AsyncStatus(self._arming)
+
+    async def is_armed(self) -> bool:
+        fan_ready, acquire = await asyncio.gather(
+            self.odin.fan.ready.get_value(), self.cam.acquire.get_value()
+        )
+        return fan_ready == 1 and acquire == 1
+
+    async def wait_on_arming_if_started(self):
+        if self._arming is not None and not self._arming.done():
+            LOGGER.info("Waiting for arming to finish")
+            await asyncio.wait_for(asyncio.shield(self._arming), 60)
+
+    @AsyncStatus.wrap
+    async def stage(self):
+        await self.wait_on_arming_if_started()
+        if not await self.is_armed():
+            LOGGER.info("Eiger not armed, arming")
+            await asyncio.wait_for(self.arm(), self.GENERAL_STATUS_TIMEOUT)
+
+    @AsyncStatus.wrap
+    async def unstage(self) -> bool:
+        """Waits for the collection to be written then disarms the detector."""
+        assert self.detector_params is not None
+        try:
+            await self.wait_on_arming_if_started()
+            if self.detector_params.trigger_mode == TriggerMode.FREE_RUN:
+                # In free run mode we have to manually stop odin
+                await self.stop_odin_when_all_frames_collected()
+
+            await self.odin.file_writer.start_timeout.set(1)
+            LOGGER.info("Waiting on filewriter to finish")
+            await self.odin.wait_for_writers_finished(self.FILEWRITERS_TIMEOUT)
+
+            LOGGER.info("Disarming detector")
+        finally:
+            _, status_ok, _ = await asyncio.gather(
+                self.disarm_detector(),
+                self.odin.check_odin_state(),
+                self.disable_roi_mode(),
+            )
+        return status_ok
+
+    @AsyncStatus.wrap
+    async def stop(self, success: bool = True):
+        """Emergency stop the device, mainly used to clean up after error."""
+        if self._arming is not None and not self._arming.done():
+            self._arming.cancel()
+        await asyncio.gather(
+            self.odin.stop(),
+            self.odin.file_writer.start_timeout.set(1),
+            self.disarm_detector(),
+            self.disable_roi_mode(),
+        )
+
+    async def stop_odin_when_all_frames_collected(self):
+        assert self.detector_params is not None
+        LOGGER.info("Waiting on all frames")
+        try:
+            await wait_for_value(
+                self.odin.file_writer.num_captured,
+                self.detector_params.full_number_of_images,
+                self.ALL_FRAMES_TIMEOUT,
+            )
+        finally:
+            LOGGER.info("Stopping Odin")
+            await asyncio.wait_for(self.odin.stop(), 5)
+
+    async def disable_roi_mode(self):
+        await self.change_roi_mode(False)
+
+    async def change_roi_mode(self, enable: bool):
+        assert self.detector_params is not None
+        detector_dimensions = (
+            self.detector_params.detector_size_constants.roi_size_pixels
+            if enable
+            else self.detector_params.detector_size_constants.det_size_pixels
+        )
+        file_writer = self.odin.file_writer
+        await asyncio.gather(
+            self.cam.roi_mode.set(1 if enable else 0),
+            file_writer.image_height.set(detector_dimensions.height),
+            file_writer.image_width.set(detector_dimensions.width),
+            file_writer.num_row_chunks.set(detector_dimensions.height),
+            file_writer.num_col_chunks.set(detector_dimensions.width),
+        )
+
+    async def set_cam_pvs(self):
+        assert self.detector_params is not None
+        await asyncio.gather(
+            self.cam.acquire_time.set(self.detector_params.exposure_time),
+            self.cam.acquire_period.set(self.detector_params.exposure_time),
+            self.cam.num_exposures.set(1),
+            self.cam.image_mode.set(IMAGE_MODE_MULTIPLE),
+            self.cam.trigger_mode.set(InternalEigerTriggerMode.EXTERNAL_SERIES.value),
+        )
+
+    async def set_odin_pvs(self):
+        assert self.detector_params is not None
+        file_prefix = self.detector_params.full_filename
+        await asyncio.gather(
+            self.odin.file_writer.num_frames_chunks.set(1),
+            self.odin.file_writer.file_path.set(self.detector_params.directory),
+            self.odin.file_writer.file_name.set(file_prefix),
+            wait_for_value(
+                self.odin.meta.file_name, file_prefix, self.GENERAL_STATUS_TIMEOUT
+            ),
+            wait_for_value(
+                self.odin.file_writer.id, file_prefix, self.GENERAL_STATUS_TIMEOUT
+            ),
+        )
+
+    async def set_mx_settings_pvs(self):
+        assert self.detector_params is not None
+        beam_x_pixels, beam_y_pixels = self.detector_params.get_beam_position_pixels(
+            self.detector_params.detector_distance
+        )
+        await asyncio.gather(
+            self.cam.beam_center_x.set(beam_x_pixels),
+            self.cam.beam_center_y.set(beam_y_pixels),
+            self.cam.det_distance.set(self.detector_params.detector_distance),
+            self.cam.omega_start.set(self.detector_params.omega_start),
+            self.cam.omega_incr.set(self.detector_params.omega_increment),
+        )
+
+    async def set_detector_threshold(self, energy: float, tolerance: float = 0.1):
+        """Ensures the energy threshold on the detector is set to the specified energy
+        (in eV), within the specified tolerance.
+
+        Args:
+            energy (float): The energy to set (in eV)
+            tolerance (float, optional): If the energy is already set to within
+                this tolerance it is not set again. Defaults to 0.1eV.
+        """
+        current_energy = await self.cam.photon_energy.get_value()
+        if abs(current_energy - energy) > tolerance:
+            await self.cam.photon_energy.set(energy)
+
+    async def set_num_triggers_and_captures(self):
+        """Sets the number of triggers and the number of images for the Eiger to
+        capture during the datacollection. The number of images is the number of
+        images per trigger.
+        """
+        assert self.detector_params is not None
+        if self.detector_params.trigger_mode == TriggerMode.FREE_RUN:
+            # The Eiger can't actually free run so we set a very large number of frames
+            num_triggers = FREE_RUN_MAX_IMAGES
+            # Setting Odin to write 0 frames tells it to write until externally stopped
+            num_capture = 0
+        else:
+            num_triggers = self.detector_params.num_triggers
+            num_capture = self.detector_params.full_number_of_images
+        await asyncio.gather(
+            self.cam.num_images.set(self.detector_params.num_images_per_trigger),
+            self.cam.num_triggers.set(num_triggers),
+            self.odin.file_writer.num_capture.set(num_capture),
+        )
+
+    async def forward_bit_depth_to_filewriter(self):
+        bit_depth = await self.bit_depth.get_value()
+        await self.odin.file_writer.data_type.set(f"UInt{bit_depth}")
+
+    async def disarm_detector(self):
+        await self.cam.acquire.set(0)
+
+    async def _arm(self):
+        assert self.detector_params is not None
+        detector_params = self.detector_params
+        await self.odin.clear_odin_errors()
+        status_ok, error_message = await self.odin.check_odin_initialised()
+        if not status_ok:
+            raise Exception(f"Odin not initialised: {error_message}")
+
+        try:
+            LOGGER.info("Eiger staging: writing configuration")
+            configuration = [
+                self.set_detector_threshold(detector_params.current_energy_ev),
+                self.set_cam_pvs(),
+                self.set_odin_pvs(),
+                self.set_mx_settings_pvs(),
+                self.set_num_triggers_and_captures(),
+            ]
+            if detector_params.use_roi_mode:
+                configuration.append(self.change_roi_mode(enable=True))
+            await asyncio.wait_for(
+                asyncio.gather(*configuration), self.GENERAL_STATUS_TIMEOUT
+            )
+            await wait_for_value(self.stale_params, 0, self.STALE_PARAMS_TIMEOUT)
+
+            await self.forward_bit_depth_to_filewriter()
+            LOGGER.info("Eiger staging: awaiting odin metadata")
+            await asyncio.gather(
+                self.odin.file_writer.capture.set(1),
+                wait_for_value(self.odin.meta.ready, 1, self.GENERAL_STATUS_TIMEOUT),
+            )
+
+            # The put to acquire only completes at the end of the acquisition
+            await self.cam.acquire.set(1, wait=False)
+            LOGGER.info("Eiger staging: awaiting odin fan ready")
+            await wait_for_value(self.odin.fan.ready, 1, self.GENERAL_STATUS_TIMEOUT)
+            LOGGER.info("Eiger staging: Finishing arming")
+        except asyncio.CancelledError:
+            LOGGER.info("Eiger arming cancelled, disarming")
+            await self.disarm_detector()
+            raise
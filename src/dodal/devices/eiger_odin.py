@@ -1,9 +1,12 @@
-from typing import List, Tuple
+import time
+from functools import lru_cache, partial
+from typing import Any, Dict, List, Tuple, Type
 
 from ophyd import Component, Device, EpicsSignal, EpicsSignalRO, EpicsSignalWithRBV
 from ophyd.areadetector.plugins import HDF5Plugin_V22
 from ophyd.status import Status, SubscriptionStatus
 
+from dodal.devices.device_executor import get_device_executor
 from dodal.devices.status import await_value
 
 
@@ -51,15 +54,92 @@ class OdinNode(Device):
     )
 
 
-class OdinNodesStatus(Device):
-    node_0: OdinNode = Component(OdinNode, "OD1:")
-    node_1: OdinNode = Component(OdinNode, "OD2:")
-    node_2: OdinNode = Component(OdinNode, "OD3:")
-    node_3: OdinNode = Component(OdinNode, "OD4:")
+class BaseOdinNodesStatus(Device):
+    """The status of the Odin filewriter nodes, which are the `OdinNode` components
+    named node_0, node_1 etc. Use `odin_nodes_status_type` to get a device with a
+    given number of nodes.
+
+    The status PVs of every node are monitored into an in-memory snapshot, so the
+    checks below do not need to go to EPICS. `snapshot_timestamp` gives the time of
+    the most recent update.
+    """
+
+    MONITORED_SIGNALS = [
+        "writing",
+        "frames_dropped",
+        "frames_timed_out",
+        "error_status",
+        "fp_initialised",
+        "fr_initialised",
+        "num_captured",
+        "error_message",
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._nodes: List[OdinNode] = [
+            getattr(self, name)
+            for name in self.component_names
+            if name.startswith("node_")
+        ]
+        self._snapshot: Dict[str, Dict[str, Any]] = {
+            node.attr_name: {} for node in self.nodes
+        }
+        self.snapshot_timestamp: float = 0.0
+        for node in self.nodes:
+            for signal_name in self.MONITORED_SIGNALS:
+                getattr(node, signal_name).subscribe(
+                    partial(self._update_snapshot, node.attr_name, signal_name)
+                )
 
     @property
     def nodes(self) -> List[OdinNode]:
-        return [self.node_0, self.node_1, self.node_2, self.node_3]
+        return self._nodes
+
+    def _update_snapshot(
+        self, node_name: str, signal_name: str, value=None, obj=None, **kwargs
+    ):
+        if getattr(obj, "as_string", False) and value is not None:
+            value = str(value)
+        self._snapshot[node_name][signal_name] = value
+        self.snapshot_timestamp = kwargs.get("timestamp") or time.time()
+
+    def cached_value(self, node: OdinNode, signal_name: str) -> Any:
+        """Gets the value of a node signal from the monitored snapshot, only reading
+        from EPICS if no monitor update has been received yet."""
+        node_snapshot = self._snapshot[node.attr_name]
+        if node_snapshot.get(signal_name) is None:
+            self._refresh_signal_family(signal_name)
+        return node_snapshot[signal_name]
+
+    def read_signal_family(self, signal_name: str) -> List[Any]:
+        """Reads one signal from every node from EPICS, as a single parallel batch.
+
+        Args:
+            signal_name (str): The name of the signal on each `OdinNode`.
+
+        Returns:
+            List[Any]: The value of the signal on each node, in node order.
+        """
+        return get_device_executor().map(
+            lambda node: getattr(node, signal_name).get(),
+            self.nodes,
+            task_name=f"read Odin {signal_name}",
+        )
+
+    def _refresh_signal_family(self, signal_name: str):
+        for node, value in zip(self.nodes, self.read_signal_family(signal_name)):
+            self._snapshot[node.attr_name][signal_name] = value
+
+    def refresh_snapshot(self):
+        """Re-reads every monitored signal from EPICS into the snapshot."""
+        for signal_name in self.MONITORED_SIGNALS:
+            self._refresh_signal_family(signal_name)
+        self.snapshot_timestamp = time.time()
+
+    def snapshot_age(self) -> float:
+        """The time in seconds since the snapshot was last updated."""
+        return time.time() - self.snapshot_timestamp
 
     def check_node_frames_from_attr(
         self, node_get_func, error_message_verb: str
@@ -76,46 +156,81 @@ class OdinNodesStatus(Device):
 
     def check_frames_timed_out(self) -> Tuple[bool, str]:
         return self.check_node_frames_from_attr(
-            lambda node: node.frames_timed_out.get(), "timed out"
+            lambda node: self.cached_value(node, "frames_timed_out"), "timed out"
         )
 
     def check_frames_dropped(self) -> Tuple[bool, str]:
         return self.check_node_frames_from_attr(
-            lambda node: node.frames_dropped.get(), "dropped"
+            lambda node: self.cached_value(node, "frames_dropped"), "dropped"
         )
 
     def get_error_state(self) -> Tuple[bool, str]:
         is_error = []
         error_messages = []
         for node_number, node_pv in enumerate(self.nodes):
-            is_error.append(node_pv.error_status.get())
+            is_error.append(self.cached_value(node_pv, "error_status"))
             if is_error[node_number]:
                 error_messages.append(
                     f"Filewriter {node_number} is in an error state with error message\
-                     - {node_pv.error_message.get()}"
+                     - {self.cached_value(node_pv, 'error_message')}"
                 )
         return any(is_error), "\n".join(error_messages)
 
     def get_init_state(self) -> bool:
         is_initialised = []
         for node_number, node_pv in enumerate(self.nodes):
-            is_initialised.append(node_pv.fr_initialised.get())
-            is_initialised.append(node_pv.fp_initialised.get())
+            is_initialised.append(self.cached_value(node_pv, "fr_initialised"))
+            is_initialised.append(self.cached_value(node_pv, "fp_initialised"))
         return all(is_initialised)
 
     def clear_odin_errors(self):
         for node_number, node_pv in enumerate(self.nodes):
-            error_message = node_pv.error_message.get()
+            error_message = self.cached_value(node_pv, "error_message")
             if len(error_message) != 0:
                 self.log.info(f"Clearing odin errors from node {node_number}")
                 node_pv.clear_errors.put(1)
 
 
+class OdinNodesStatus(BaseOdinNodesStatus):
+    node_0: OdinNode = Component(OdinNode, "OD1:")
+    node_1: OdinNode = Component(OdinNode, "OD2:")
+    node_2: OdinNode = Component(OdinNode, "OD3:")
+    node_3: OdinNode = Component(OdinNode, "OD4:")
+
+
+@lru_cache(maxsize=None)
+def odin_nodes_status_type(num_nodes: int) -> Type[BaseOdinNodesStatus]:
+    """Gets the device class for Odin with num_nodes filewriter nodes, with PV
+    prefixes OD1: to OD<num_nodes>:.
+
+    Raises:
+        ValueError: If num_nodes is not positive.
+    """
+    if num_nodes <= 0:
+        raise ValueError(f"Odin must have at least one node, not {num_nodes}")
+    if num_nodes == len(OdinNodesStatus.component_names):
+        return OdinNodesStatus
+    components = {
+        f"node_{node_number}": Component(OdinNode, f"OD{node_number + 1}:")
+        for node_number in range(num_nodes)
+    }
+    return type(f"OdinNodesStatus{num_nodes}", (BaseOdinNodesStatus,), components)
+
+
 class EigerOdin(Device):
     fan: EigerFan = Component(EigerFan, "OD:FAN:")
     file_writer: OdinFileWriter = Component(OdinFileWriter, "OD:")
     meta: OdinMetaListener = Component(OdinMetaListener, "OD:META:")
-    nodes: OdinNodesStatus = Component(OdinNodesStatus, "")
+    nodes: BaseOdinNodesStatus = Component(OdinNodesStatus, "")
+
+    @classmethod
+    def with_num_nodes(cls, num_nodes: int) -> Type["EigerOdin"]:
+        """Gets a subclass of this device with num_nodes Odin filewriter nodes.
+
+        Raises:
+            ValueError: If num_nodes is not positive.
+        """
+        return _eiger_odin_type(cls, num_nodes)
 
     def create_finished_status(self) -> SubscriptionStatus:
         writing_finished = await_value(self.meta.ready, 0)
@@ -159,3 +274,15 @@ class EigerOdin(Device):
         status = self.file_writer.capture.set(0)
         status &= self.meta.stop_writing.set(1)
         return status
+
+
+@lru_cache(maxsize=None)
+def _eiger_odin_type(base: Type[EigerOdin], num_nodes: int) -> Type[EigerOdin]:
+    nodes_type = odin_nodes_status_type(num_nodes)
+    if nodes_type is base.nodes.cls:
+        return base
+    return type(
+        f"{base.__name__}{num_nodes}Nodes",
+        (base,),
+        {"nodes": Component(nodes_type, "")},
+    )
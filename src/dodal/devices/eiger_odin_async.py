@@ -0,0 +1,216 @@
+import asyncio
+from typing import Any, List, Tuple
+
+from ophyd.v2.core import Device, DeviceVector, SignalR, wait_for_value
+from ophyd.v2.epics import epics_signal_r, epics_signal_rw, epics_signal_w
+
+from dodal.log import LOGGER
+
+
+class EigerFanAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.on = epics_signal_r(int, prefix + "ProcessConnected_RBV")
+        self.connected = epics_signal_r(int, prefix + "AllConsumersConnected_RBV")
+        self.ready = epics_signal_r(int, prefix + "StateReady_RBV")
+        self.frames_sent = epics_signal_r(int, prefix + "FramesSent_RBV")
+        super().__init__(name)
+
+
+class OdinMetaListenerAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.initialised = epics_signal_r(int, prefix + "ProcessConnected_RBV")
+        self.ready = epics_signal_r(int, prefix + "Writing_RBV")
+        # file_name should not be set. Set the filewriter file_name and this will be
+        # updated in EPICS
+        self.file_name = epics_signal_r(str, prefix + "FileName")
+        self.stop_writing = epics_signal_w(int, prefix + "Stop")
+        super().__init__(name)
+
+
+class OdinFileWriterAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.capture = epics_signal_rw(int, prefix + "Capture_RBV", prefix + "Capture")
+        self.num_capture = epics_signal_rw(
+            int, prefix + "NumCapture_RBV", prefix + "NumCapture"
+        )
+        self.num_captured = epics_signal_r(int, prefix + "NumCaptured_RBV")
+        self.file_path = epics_signal_rw(
+            str, prefix + "FilePath_RBV", prefix + "FilePath"
+        )
+        self.file_name = epics_signal_rw(
+            str, prefix + "FileName_RBV", prefix + "FileName"
+        )
+        self.data_type = epics_signal_rw(
+            str, prefix + "DataType_RBV", prefix + "DataType"
+        )
+        self.num_frames_chunks = epics_signal_rw(
+            int, prefix + "NumFramesChunks_RBV", prefix + "NumFramesChunks"
+        )
+        self.num_row_chunks = epics_signal_rw(
+            int, prefix + "NumRowChunks_RBV", prefix + "NumRowChunks"
+        )
+        self.num_col_chunks = epics_signal_rw(
+            int, prefix + "NumColChunks_RBV", prefix + "NumColChunks"
+        )
+        self.image_height = epics_signal_rw(
+            int, prefix + "ImageHeight_RBV", prefix + "ImageHeight"
+        )
+        self.image_width = epics_signal_rw(
+            int, prefix + "ImageWidth_RBV", prefix + "ImageWidth"
+        )
+        self.start_timeout = epics_signal_w(int, prefix + "StartTimeout")
+        # id should not be set. Set the filewriter file_name and this will be updated
+        # in EPICS
+        self.id = epics_signal_r(str, prefix + "AcquisitionID_RBV")
+        super().__init__(name)
+
+
+class OdinNodeAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.writing = epics_signal_r(int, prefix + "Writing_RBV")
+        self.frames_dropped = epics_signal_r(int, prefix + "FramesDropped_RBV")
+        self.frames_timed_out = epics_signal_r(int, prefix + "FramesTimedOut_RBV")
+        self.error_status = epics_signal_r(int, prefix + "FPErrorState_RBV")
+        self.fp_initialised = epics_signal_r(int, prefix + "FPProcessConnected_RBV")
+        self.fr_initialised = epics_signal_r(int, prefix + "FRProcessConnected_RBV")
+        self.clear_errors = epics_signal_w(int, prefix + "FPClearErrors")
+        self.num_captured = epics_signal_r(int, prefix + "NumCaptured_RBV")
+        self.error_message = epics_signal_r(str, prefix + "FPErrorMessage_RBV")
+        super().__init__(name)
+
+
+class EigerOdinAsync(Device):
+    """An ophyd v2 version of `EigerOdin`, the Odin filewriters behind an Eiger.
+
+    The checks across the nodes read each PV of every node concurrently.
+    """
+
+    def __init__(self, prefix: str, name: str = "", num_nodes: int = 4):
+        self.fan = EigerFanAsync(prefix + "OD:FAN:")
+        self.file_writer = OdinFileWriterAsync(prefix + "OD:")
+        self.meta = OdinMetaListenerAsync(prefix + "OD:META:")
+        self.nodes: DeviceVector[OdinNodeAsync] = DeviceVector(
+            {
+                node_number: OdinNodeAsync(f"{prefix}OD{node_number + 1}:")
+                for node_number in range(num_nodes)
+            }
+        )
+        super().__init__(name)
+
+    async def read_node_signals(self, signal_name: str) -> List[Any]:
+        """Reads one signal from every node concurrently.
+
+        Args:
+            signal_name (str): The name of the signal on each `OdinNodeAsync`.
+
+        Returns:
+            List[Any]: The value of the signal on each node, in node order.
+        """
+        signals: List[SignalR] = [
+            getattr(node, signal_name) for node in self.nodes.values()
+        ]
+        return list(await asyncio.gather(*(signal.get_value() for signal in signals)))
+
+    async def _check_node_frames(
+        self, signal_name: str, error_message_verb: str
+    ) -> Tuple[bool, str]:
+        frames = await self.read_node_signals(signal_name)
+        frames_details = [
+            f"Filewriter {node_number} {error_message_verb} {value} frames"
+            for node_number, value in enumerate(frames)
+        ]
+        return any(value != 0 for value in frames), "\n".join(frames_details)
+
+    async def check_frames_dropped(self) -> Tuple[bool, str]:
+        return await self._check_node_frames("frames_dropped", "dropped")
+
+    async def check_frames_timed_out(self) -> Tuple[bool, str]:
+        return await self._check_node_frames("frames_timed_out", "timed out")
+
+    async def get_error_state(self) -> Tuple[bool, str]:
+        is_error, error_messages = await asyncio.gather(
+            self.read_node_signals("error_status"),
+            self.read_node_signals("error_message"),
+        )
+        messages = [
+            f"Filewriter {node_number} is in an error state with error message - "
+            f"{error_messages[node_number]}"
+            for node_number, error in enumerate(is_error)
+            if error
+        ]
+        return any(is_error), "\n".join(messages)
+
+    async def get_init_state(self) -> bool:
+        fr_initialised, fp_initialised = await asyncio.gather(
+            self.read_node_signals("fr_initialised"),
+            self.read_node_signals("fp_initialised"),
+        )
+        return all(fr_initialised) and all(fp_initialised)
+
+    async def clear_odin_errors(self):
+        error_messages = await self.read_node_signals("error_message")
+        to_clear = []
+        for node_number, error_message in enumerate(error_messages):
+            if len(error_message) != 0:
+                LOGGER.info(f"Clearing odin errors from node {node_number}")
+                to_clear.append(self.nodes[node_number].clear_errors.set(1))
+        await asyncio.gather(*to_clear)
+
+    async def check_odin_initialised(self) -> Tuple[bool, str]:
+        (
+            fan_connected,
+            fan_on,
+            meta_initialised,
+            (is_error_state, error_messages),
+            nodes_initialised,
+        ) = await asyncio.gather(
+            self.fan.connected.get_value(),
+            self.fan.on.get_value(),
+            self.meta.initialised.get_value(),
+            self.get_error_state(),
+            self.get_init_state(),
+        )
+        to_check = [
+            (not fan_connected, "EigerFan is not connected"),
+            (not fan_on, "EigerFan is not initialised"),
+            (not meta_initialised, "MetaListener is not initialised"),
+            (is_error_state, error_messages),
+            (not nodes_initialised, "One or more filewriters is not initialised"),
+        ]
+
+        errors = [message for check_result, message in to_check if check_result]
+
+        return not errors, "\n".join(errors)
+
+    async def check_odin_state(self) -> bool:
+        (
+            (is_initialised, error_message),
+            (frames_dropped, frames_dropped_details),
+            (frames_timed_out, frames_timed_out_details),
+        ) = await asyncio.gather(
+            self.check_odin_initialised(),
+            self.check_frames_dropped(),
+            self.check_frames_timed_out(),
+        )
+
+        if not is_initialised:
+            raise Exception(error_message)
+        if frames_dropped:
+            LOGGER.error(f"Frames dropped: {frames_dropped_details}")
+        if frames_timed_out:
+            LOGGER.error(f"Frames timed out: {frames_timed_out_details}")
+
+        return is_initialised and not frames_dropped and not frames_timed_out
+
+    async def wait_for_writers_finished(self, timeout: float):
+        """Waits for the meta listener and every node to stop writing."""
+        await asyncio.gather(
+            wait_for_value(self.meta.ready, 0, timeout),
+            *(wait_for_value(node.writing, 0, timeout) for node in self.nodes.values()),
+        )
+
+    async def stop(self):
+        """Stop odin manually"""
+        await asyncio.gather(
+            self.file_writer.capture.set(0), self.meta.stop_writing.set(1)
+        )
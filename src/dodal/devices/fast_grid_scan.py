@@ -1,10 +1,11 @@
-import threading
 import time
-from typing import Any
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 from bluesky.plan_stubs import mv
 from numpy import ndarray
+from numpy.typing import ArrayLike
 from ophyd import (
     Component,
     Device,
@@ -13,12 +14,14 @@ from ophyd import (
     EpicsSignalWithRBV,
     Signal,
 )
-from ophyd.status import DeviceStatus, StatusBase
+from ophyd.status import DeviceStatus, Status, StatusBase
 from pydantic import BaseModel, validator
 from pydantic.dataclasses import dataclass
 
+from dodal.devices.device_executor import ExecutorFullError, get_device_executor
 from dodal.devices.motors import XYZLimitBundle
 from dodal.devices.status import await_value
+from dodal.devices.utils import run_functions_without_blocking
 from dodal.parameters.experiment_parameter_base import AbstractExperimentParameterBase
 
 
@@ -42,6 +45,18 @@ class GridAxis:
     def is_within(self, steps):
         return 0 <= steps <= self.full_steps
 
+    def steps_within(self, steps: ArrayLike) -> ndarray:
+        """Gives a mask of which of an array of steps are within the axis"""
+        steps = np.asarray(steps)
+        return (steps >= 0) & (steps <= self.full_steps)
+
+    def snaked_steps(self, rows: int) -> ndarray:
+        """Gives the steps along this axis of each frame of a grid with this as the
+        fast axis, reversing direction on every other row"""
+        steps = np.tile(np.arange(self.full_steps), (rows, 1))
+        steps[1::2] = steps[1::2, ::-1]
+        return steps.ravel()
+
 
 class GridScanParams(BaseModel, AbstractExperimentParameterBase):
     """
@@ -99,26 +114,14 @@ class GridScanParams(BaseModel, AbstractExperimentParameterBase):
                        the parameters
         :return: True if the scan is valid
         """
-        x_in_limits = limits.x.is_within(self.x_axis.start) and limits.x.is_within(
-            self.x_axis.end
-        )
-        y_in_limits = limits.y.is_within(self.y_axis.start) and limits.y.is_within(
-            self.y_axis.end
-        )
-
-        first_grid_in_limits = (
-            x_in_limits and y_in_limits and limits.z.is_within(self.z1_start)
-        )
-
-        z_in_limits = limits.z.is_within(self.z_axis.start) and limits.z.is_within(
-            self.z_axis.end
-        )
-
-        second_grid_in_limits = (
-            x_in_limits and z_in_limits and limits.y.is_within(self.y2_start)
-        )
-
-        return first_grid_in_limits and second_grid_in_limits
+        # The start and end of each grid, which bound every frame of the scan
+        corners = [
+            [self.x_axis.start, self.y_axis.start, self.z1_start],
+            [self.x_axis.end, self.y_axis.end, self.z1_start],
+            [self.x_axis.start, self.y2_start, self.z_axis.start],
+            [self.x_axis.end, self.y2_start, self.z_axis.end],
+        ]
+        return bool(limits.positions_valid(corners).all())
 
     def get_num_images(self):
         return self.x_steps * self.y_steps + self.x_steps * self.z_steps
@@ -148,56 +151,222 @@ class GridScanParams(BaseModel, AbstractExperimentParameterBase):
             ]
         )
 
+    def _axes(self) -> Tuple[GridAxis, GridAxis, GridAxis]:
+        return self.x_axis, self.y_axis, self.z_axis
 
-class GridScanCompleteStatus(DeviceStatus):
+    @staticmethod
+    def _as_grid_positions(grid_positions: ArrayLike) -> ndarray:
+        positions = np.asarray(grid_positions)
+        if positions.ndim != 2 or positions.shape[1] != 3:
+            raise ValueError(
+                f"Expected an (N, 3) array of grid positions, got {positions.shape}"
+            )
+        return positions
+
+    def grid_positions_within_grid(self, grid_positions: ArrayLike) -> ndarray:
+        """Checks many grid positions, given as steps in the x, y, z grid, against the
+        bounds of the grid.
+
+        :param grid_positions: An (N, 3) array of x, y, z positions in grid steps
+        :return: An (N,) mask that is True for positions within the grid"""
+        positions = self._as_grid_positions(grid_positions)
+        within = np.ones(len(positions), dtype=bool)
+        for axis_number, axis in enumerate(self._axes()):
+            within &= axis.steps_within(positions[:, axis_number])
+        return within
+
+    def grid_positions_to_motor_positions(self, grid_positions: ArrayLike) -> ndarray:
+        """Converts many grid positions, given as steps in the x, y, z grid, to real
+        motor positions.
+
+        :param grid_positions: An (N, 3) array of x, y, z positions in grid steps
+        :return: An (N, 3) array of the motor positions these correspond to.
+        :raises: IndexError if any of the positions are outside the grid."""
+        positions = self._as_grid_positions(grid_positions)
+        outside = ~self.grid_positions_within_grid(positions)
+        if outside.any():
+            raise IndexError(
+                f"{positions[outside].tolist()} are outside the bounds of the grid"
+            )
+        starts = np.array([axis.start for axis in self._axes()])
+        step_sizes = np.array([axis.step_size for axis in self._axes()])
+        return starts + step_sizes * positions
+
+    def all_motor_positions(self) -> ndarray:
+        """Gives the motor position of every frame of the scan, in the order the frames
+        are taken. The first grid snakes in x over y at z1_start, then the second grid
+        snakes in x over z at y2_start.
+
+        :return: A (get_num_images(), 3) array of x, y, z motor positions."""
+        first_grid = np.empty((self.x_steps * self.y_steps, 3))
+        first_grid[:, 0] = self.x_axis.steps_to_motor_position(
+            self.x_axis.snaked_steps(self.y_steps)
+        )
+        first_grid[:, 1] = self.y_axis.steps_to_motor_position(
+            np.repeat(np.arange(self.y_steps), self.x_steps)
+        )
+        first_grid[:, 2] = self.z1_start
+
+        second_grid = np.empty((self.x_steps * self.z_steps, 3))
+        second_grid[:, 0] = self.x_axis.steps_to_motor_position(
+            self.x_axis.snaked_steps(self.z_steps)
+        )
+        second_grid[:, 1] = self.y2_start
+        second_grid[:, 2] = self.z_axis.steps_to_motor_position(
+            np.repeat(np.arange(self.z_steps), self.x_steps)
+        )
+        return np.concatenate([first_grid, second_grid])
+
+
+class ImageProgressReporter:
     """
-    A Status for the grid scan completion
-    A special status object that notifies watchers (progress bars)
-    based on comparing device.expected_images to device.position_counter.
+    Notifies watchers (progress bars) of the number of images taken towards a target.
+
+    Watchers are notified at most notify_rate times a second, except for the final
+    image, and `flush` sends them the latest count if it was held back. The time
+    remaining is estimated from an exponentially weighted moving average of the
+    image rate between notifications.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    # Weight given to the latest image rate in the moving average
+    RATE_SMOOTHING: float = 0.3
+
+    def __init__(
+        self,
+        name: str,
+        target: Any,
+        watchers: List[Callable],
+        notify_rate: Optional[float] = 10.0,
+    ):
+        self.name = name
+        self.target = target
+        self.watchers = watchers
+        self.notify_rate = notify_rate
         self.start_ts = time.time()
 
-        self.device.position_counter.subscribe(self._notify_watchers)
-        self.device.status.subscribe(self._running_changed)
+        self.latest_count = None
+        self._notified_count = 0
+        self._notified_ts: Optional[float] = None
+        self._image_rate: Optional[float] = None
 
-        self._name = self.device.name
-        self._target_count = self.device.expected_images.get()
+    def update(self, value):
+        """Records the latest image count, notifying the watchers unless throttled.
 
-    def _notify_watchers(self, value, *args, **kwargs):
-        if not self._watchers:
+        Raises if the count cannot be compared with the target, after notifying the
+        watchers with no fraction or time remaining.
+        """
+        self.latest_count = value
+        if not self.watchers:
             return
-        time_elapsed = time.time() - self.start_ts
+        now = time.time()
+        if (
+            self.notify_rate
+            and self._notified_ts is not None
+            and now - self._notified_ts < 1 / self.notify_rate
+            and value != self.target
+        ):
+            return
+        self._send_progress(value, now)
+
+    def flush(self):
+        """Notifies the watchers of the latest image count if it was held back."""
+        if (
+            self.watchers
+            and self.latest_count is not None
+            and self.latest_count != self._notified_count
+        ):
+            self._send_progress(self.latest_count, time.time())
+
+    def _update_image_rate(self, value, now: float):
+        previous_ts = self.start_ts if self._notified_ts is None else self._notified_ts
+        if now <= previous_ts or value < self._notified_count:
+            return
+        rate = (value - self._notified_count) / (now - previous_ts)
+        if self._image_rate is None:
+            self._image_rate = rate
+        else:
+            self._image_rate = (
+                self.RATE_SMOOTHING * rate
+                + (1 - self.RATE_SMOOTHING) * self._image_rate
+            )
+
+    def _send_progress(self, value, now: float):
+        time_elapsed = now - self.start_ts
+        error: Optional[Exception] = None
         try:
-            fraction = 1 - value / self._target_count
+            fraction = 1 - value / self.target
         except ZeroDivisionError:
             fraction = 0
             time_remaining = 0
         except Exception as e:
             fraction = None
             time_remaining = None
-            self.set_exception(e)
-            self.clean_up()
+            error = e
         else:
-            time_remaining = time_elapsed / fraction
-        for watcher in self._watchers:
+            self._update_image_rate(value, now)
+            self._notified_count = value
+            time_remaining = (
+                max(self.target - value, 0) / self._image_rate
+                if self._image_rate
+                else None
+            )
+        self._notified_ts = now
+        for watcher in self.watchers:
             watcher(
-                name=self._name,
+                name=self.name,
                 current=value,
                 initial=0,
-                target=self._target_count,
+                target=self.target,
                 unit="images",
                 precision=0,
                 fraction=fraction,
                 time_elapsed=time_elapsed,
                 time_remaining=time_remaining,
             )
+        if error is not None:
+            raise error
+
+
+class GridScanCompleteStatus(DeviceStatus):
+    """
+    A Status for the grid scan completion
+    A special status object that notifies watchers (progress bars)
+    based on comparing device.expected_images to device.position_counter.
+
+    Progress is reported through an `ImageProgressReporter`, so watchers are
+    notified at most notify_rate times a second and the latest count is flushed to
+    them when the scan finishes.
+    """
+
+    def __init__(self, *args, notify_rate: Optional[float] = 10.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._progress = ImageProgressReporter(
+            self.device.name,
+            self.device.expected_images.get(),
+            self._watchers,
+            notify_rate,
+        )
+        self.start_ts = self._progress.start_ts
+
+        self.device.position_counter.subscribe(self._notify_watchers)
+        self.device.status.subscribe(self._running_changed)
+
+    def _notify_watchers(self, value, *args, **kwargs):
+        try:
+            self._progress.update(value)
+        except Exception as e:
+            self.set_exception(e)
+            self.clean_up()
 
     def _running_changed(self, value=None, old_value=None, **kwargs):
         if (old_value == 1) and (value == 0):
-            self.set_finished()
+            try:
+                self._progress.flush()
+            except Exception as e:
+                if not self.done:
+                    self.set_exception(e)
+            if not self.done:
+                self.set_finished()
             self.clean_up()
 
     def clean_up(self):
@@ -206,6 +375,10 @@ class GridScanCompleteStatus(DeviceStatus):
 
 
 class FastGridScan(Device):
+    class ParameterUploadSignal(Signal):
+        def set(self, value, *, timeout=None, settle_time=None, **kwargs):
+            return self.parent.upload_parameters(value)
+
     x_steps: EpicsSignalWithRBV = Component(EpicsSignalWithRBV, "X_NUM_STEPS")
     y_steps: EpicsSignalWithRBV = Component(EpicsSignalWithRBV, "Y_NUM_STEPS")
     z_steps: EpicsSignalWithRBV = Component(EpicsSignalWithRBV, "Z_NUM_STEPS")
@@ -235,9 +408,35 @@ class FastGridScan(Device):
 
     expected_images: Signal = Component(Signal)
 
+    upload_params: ParameterUploadSignal = Component(ParameterUploadSignal)
+
     # Kickoff timeout in seconds
     KICKOFF_TIMEOUT: float = 5.0
 
+    # Maximum rate at which complete notifies watchers of progress, in Hz
+    PROGRESS_NOTIFY_RATE: float = 10.0
+
+    # Timeout in seconds for parameters to be written and the scan revalidated
+    UPLOAD_TIMEOUT: float = 10.0
+
+    # Readbacks within this of a new parameter value are considered unchanged
+    PARAMETER_TOLERANCE: float = 1e-9
+
+    PARAMETER_NAMES = [
+        "x_steps",
+        "y_steps",
+        "z_steps",
+        "x_step_size",
+        "y_step_size",
+        "z_step_size",
+        "dwell_time",
+        "x_start",
+        "y1_start",
+        "y2_start",
+        "z1_start",
+        "z2_start",
+    ]
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -251,6 +450,66 @@ class FastGridScan(Device):
         self.y_steps.subscribe(set_expected_images)
         self.z_steps.subscribe(set_expected_images)
 
+        self._readbacks: Dict[str, Any] = {}
+        for name in self.PARAMETER_NAMES + ["position_counter"]:
+            getattr(self, name).subscribe(partial(self._update_readback, name))
+
+    def _update_readback(self, name: str, value=None, **kwargs):
+        self._readbacks[name] = value
+
+    def cached_readback(self, name: str) -> Any:
+        """Gets the monitored readback of a parameter, only reading from EPICS if no
+        monitor update has been received yet."""
+        if self._readbacks.get(name) is None:
+            self._readbacks[name] = getattr(self, name).get()
+        return self._readbacks[name]
+
+    def changed_parameters(self, params: GridScanParams) -> Dict[str, Any]:
+        """Gives the parameters whose values differ from their monitored readbacks.
+
+        :param params: The new parameters of the scan
+        :return: The names and new values of the changed parameters"""
+        return {
+            name: getattr(params, name)
+            for name in self.PARAMETER_NAMES
+            if not np.isclose(
+                self.cached_readback(name),
+                getattr(params, name),
+                rtol=0,
+                atol=self.PARAMETER_TOLERANCE,
+            )
+        }
+
+    def upload_parameters(self, params: GridScanParams) -> StatusBase:
+        """Writes only the parameters that have changed, and resets the position
+        counter if it is not already zero.
+
+        :param params: The new parameters of the scan
+        :return: A status that completes once the readbacks of every write have
+                 updated and the scan is valid"""
+        changed = self.changed_parameters(params)
+        self.log.debug(f"Uploading changed grid scan parameters {changed}")
+
+        def write_changed() -> StatusBase:
+            status = Status()
+            status.set_finished()
+            for name, value in changed.items():
+                status &= getattr(self, name).set(value)
+            if self.cached_readback("position_counter") != 0:
+                status &= self.position_counter.set(0)
+            return status
+
+        def scan_valid() -> StatusBase:
+            if not self.is_invalid():
+                status = Status()
+                status.set_finished()
+                return status
+            return await_value(self.scan_invalid, 0)
+
+        return run_functions_without_blocking(
+            [write_changed, scan_valid], timeout=self.UPLOAD_TIMEOUT
+        )
+
     def is_invalid(self) -> bool:
         if "GONP" in self.scan_invalid.pvname:
             return False
@@ -265,16 +524,19 @@ class FastGridScan(Device):
                 self.log.debug("Running scan")
                 self.run_cmd.put(1)
                 self.log.debug("Waiting for scan to start")
-                await_value(self.status, 1).wait()
+                await_value(self.status, 1).wait(self.KICKOFF_TIMEOUT)
                 st.set_finished()
             except Exception as e:
                 st.set_exception(e)
 
-        threading.Thread(target=scan, daemon=True).start()
+        try:
+            get_device_executor().submit(scan, task_name=f"{self.name} kickoff")
+        except ExecutorFullError as e:
+            st.set_exception(e)
         return st
 
     def complete(self) -> DeviceStatus:
-        return GridScanCompleteStatus(self)
+        return GridScanCompleteStatus(self, notify_rate=self.PROGRESS_NOTIFY_RATE)
 
     def collect(self):
         return {}
@@ -312,3 +574,9 @@ def set_fast_grid_scan_params(scan: FastGridScan, params: GridScanParams):
         scan.position_counter,
         0,
     )
+
+
+def set_fast_grid_scan_params_if_changed(scan: FastGridScan, params: GridScanParams):
+    """Sets the parameters of the scan, only writing those that differ from the
+    monitored readbacks, then waits for the scan to be valid."""
+    yield from mv(scan.upload_params, params)
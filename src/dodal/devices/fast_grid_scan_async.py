@@ -0,0 +1,198 @@
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+from bluesky.protocols import Descriptor, Flyable, Preparable, Reading
+from ophyd.v2.core import (
+    AsyncStatus,
+    Device,
+    ReadingValueCallback,
+    SignalBackend,
+    SignalR,
+    SignalRW,
+    observe_value,
+    wait_for_value,
+)
+from ophyd.v2.epics import epics_signal_r, epics_signal_rw, epics_signal_w
+
+from dodal.devices.fast_grid_scan import (
+    FastGridScan,
+    GridScanParams,
+    ImageProgressReporter,
+)
+from dodal.log import LOGGER
+
+
+class _ExpectedImagesBackend(SignalBackend[int]):
+    """Derives the number of images in both grids from the step count signals."""
+
+    datatype = int
+
+    def __init__(
+        self, x_steps: SignalR[int], y_steps: SignalR[int], z_steps: SignalR[int]
+    ):
+        self.steps = [x_steps, y_steps, z_steps]
+        self.source = "derived://expected_images"
+        self._callback: Optional[ReadingValueCallback[int]] = None
+        self._latest_steps: List[Optional[int]] = [None, None, None]
+        self._step_callbacks: List[Callable[[int], None]] = []
+
+    @staticmethod
+    def _expected_images(x: int, y: int, z: int) -> int:
+        return x * y + x * z
+
+    @staticmethod
+    def _reading(value: int) -> Reading:
+        return {"value": value, "timestamp": time.time(), "alarm_severity": 0}
+
+    async def connect(self):
+        pass
+
+    async def put(self, value: Optional[int], wait=True, timeout=None):
+        raise TypeError("expected_images is derived from the step counts")
+
+    async def get_descriptor(self) -> Descriptor:
+        return {"source": self.source, "dtype": "integer", "shape": []}
+
+    async def get_value(self) -> int:
+        x, y, z = await asyncio.gather(*(steps.get_value() for steps in self.steps))
+        return self._expected_images(x, y, z)
+
+    async def get_reading(self) -> Reading:
+        return self._reading(await self.get_value())
+
+    def _step_changed(self, axis: int, value: int):
+        self._latest_steps[axis] = value
+        if self._callback is not None and None not in self._latest_steps:
+            expected = self._expected_images(*self._latest_steps)  # type: ignore
+            self._callback(self._reading(expected), expected)
+
+    def set_callback(self, callback: Optional[ReadingValueCallback[int]]) -> None:
+        for steps, step_callback in zip(self.steps, self._step_callbacks):
+            steps.clear_sub(step_callback)
+        self._step_callbacks = []
+        self._latest_steps = [None, None, None]
+        self._callback = callback
+        if callback is not None:
+            for axis, steps in enumerate(self.steps):
+                self._step_callbacks.append(
+                    lambda value, axis=axis: self._step_changed(axis, value)
+                )
+                steps.subscribe_value(self._step_callbacks[-1])
+
+
+class ExpectedImagesSignal(SignalR[int]):
+    """The number of images in both grids, derived from the step count signals."""
+
+    def __init__(
+        self, x_steps: SignalR[int], y_steps: SignalR[int], z_steps: SignalR[int]
+    ):
+        super().__init__(_ExpectedImagesBackend(x_steps, y_steps, z_steps))
+
+    async def connect(self, sim=False):
+        # The step counts are connected, or simulated, by the parent device
+        await self._backend.connect()
+
+
+class FastGridScanAsync(Device, Flyable, Preparable):
+    """An ophyd v2 version of `FastGridScan`.
+
+    `prepare` writes all of the scan parameters concurrently and waits for the motion
+    program to validate the scan, `kickoff` starts the scan and `complete` waits for
+    it to finish, reporting the number of images taken to any watchers.
+    """
+
+    KICKOFF_TIMEOUT: float = 5.0
+    SCAN_VALID_TIMEOUT: float = 10.0
+
+    def __init__(self, prefix: str, name: str = ""):
+        def rw(datatype, suffix: str) -> SignalRW:
+            return epics_signal_rw(
+                datatype, f"{prefix}{suffix}_RBV", f"{prefix}{suffix}"
+            )
+
+        self.x_steps = rw(int, "X_NUM_STEPS")
+        self.y_steps = rw(int, "Y_NUM_STEPS")
+        self.z_steps = rw(int, "Z_NUM_STEPS")
+
+        self.x_step_size = rw(float, "X_STEP_SIZE")
+        self.y_step_size = rw(float, "Y_STEP_SIZE")
+        self.z_step_size = rw(float, "Z_STEP_SIZE")
+
+        self.dwell_time = rw(float, "DWELL_TIME")
+
+        self.x_start = rw(float, "X_START")
+        self.y1_start = rw(float, "Y_START")
+        self.y2_start = rw(float, "Y2_START")
+        self.z1_start = rw(float, "Z_START")
+        self.z2_start = rw(float, "Z2_START")
+
+        self.position_counter = epics_signal_rw(
+            int, prefix + "POS_COUNTER", prefix + "POS_COUNTER_WRITE"
+        )
+        self.x_counter = epics_signal_r(int, prefix + "X_COUNTER")
+        self.y_counter = epics_signal_r(int, prefix + "Y_COUNTER")
+        self.scan_invalid = epics_signal_r(int, prefix + "SCAN_INVALID")
+
+        self.run_cmd = epics_signal_w(int, prefix + "RUN.PROC")
+        self.stop_cmd = epics_signal_w(int, prefix + "STOP.PROC")
+        self.status = epics_signal_r(int, prefix + "SCAN_STATUS")
+
+        self.expected_images = ExpectedImagesSignal(
+            self.x_steps, self.y_steps, self.z_steps
+        )
+        super().__init__(name)
+
+    async def is_invalid(self) -> bool:
+        if "GONP" in self.scan_invalid.source:
+            return False
+        return bool(await self.scan_invalid.get_value())
+
+    def prepare(self, value: GridScanParams) -> AsyncStatus:
+        """Writes the scan parameters and resets the position counter, completing
+        once the scan is valid."""
+        return AsyncStatus(self._prepare(value))
+
+    async def _prepare(self, params: GridScanParams):
+        await asyncio.gather(
+            *(
+                getattr(self, name).set(getattr(params, name))
+                for name in FastGridScan.PARAMETER_NAMES
+            ),
+            self.position_counter.set(0),
+        )
+        if await self.is_invalid():
+            LOGGER.debug("Waiting for grid scan to be validated")
+            await wait_for_value(self.scan_invalid, 0, self.SCAN_VALID_TIMEOUT)
+
+    @AsyncStatus.wrap
+    async def kickoff(self):
+        LOGGER.debug("Running scan")
+        await self.run_cmd.set(1)
+        LOGGER.debug("Waiting for scan to start")
+        await wait_for_value(self.status, 1, self.KICKOFF_TIMEOUT)
+
+    def complete(self) -> AsyncStatus:
+        """Waits for the running scan to finish, notifying watchers of the number of
+        images taken so far, throttled as for `FastGridScan.complete`."""
+        watchers: List[Callable] = []
+        return AsyncStatus(self._complete(watchers), watchers)
+
+    async def _complete(self, watchers: List[Callable]):
+        progress = ImageProgressReporter(
+            self.name, await self.expected_images.get_value(), watchers
+        )
+        updates = asyncio.ensure_future(self._report_progress(progress))
+        try:
+            await wait_for_value(self.status, 0, None)
+        finally:
+            updates.cancel()
+        progress.flush()
+
+    async def _report_progress(self, progress: ImageProgressReporter):
+        async for current in observe_value(self.position_counter):
+            progress.update(current)
+
+    @AsyncStatus.wrap
+    async def stop(self):
+        await self.stop_cmd.set(1)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from ophyd import Component as Cpt
 from ophyd import EpicsMotor
 from ophyd.epics_motor import MotorBundle
@@ -13,17 +15,22 @@ class Gonio(MotorBundle):
     phi: EpicsMotor = Cpt(EpicsMotor, "PHI")
     omega: EpicsMotor = Cpt(EpicsMotor, "OMEGA")
 
+    _xyz_limits: Optional[XYZLimitBundle] = None
+
     def get_xyz_limits(self) -> XYZLimitBundle:
         """Get the limits for the x, y and z axes.
 
         Note that these limits may not yet be valid until wait_for_connection is called
-        on this MotorBundle.
+        on this MotorBundle. The same bundle, which monitors the limits, is returned on
+        every call.
 
         Returns:
             XYZLimitBundle: The limits for the underlying motors.
         """
-        return XYZLimitBundle(
-            MotorLimitHelper(self.x),
-            MotorLimitHelper(self.y),
-            MotorLimitHelper(self.z),
-        )
+        if self._xyz_limits is None:
+            self._xyz_limits = XYZLimitBundle(
+                MotorLimitHelper(self.x),
+                MotorLimitHelper(self.y),
+                MotorLimitHelper(self.z),
+            )
+        return self._xyz_limits
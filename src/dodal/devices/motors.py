@@ -1,16 +1,60 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 
 import numpy as np
-from ophyd import EpicsMotor
+from numpy import ndarray
+from numpy.typing import ArrayLike
+from ophyd import EpicsMotor, EpicsSignal
 
 
 @dataclass
 class MotorLimitHelper:
     """
     Represents motor limit(s)
+
+    The limits are cached and kept up to date by monitoring the limit signals, so
+    checking positions against them does not read from EPICS. They are only read
+    directly if no monitor update has been received yet, or on `refresh`. Call
+    `close` to remove the monitors once the helper is no longer needed.
     """
 
     motor: EpicsMotor
+    _low: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _high: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    _subscriptions: List[Tuple[EpicsSignal, int]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        for signal, callback in [
+            (self.motor.low_limit_travel, self._update_low),
+            (self.motor.high_limit_travel, self._update_high),
+        ]:
+            self._subscriptions.append((signal, signal.subscribe(callback)))
+
+    def close(self):
+        """Removes the monitors on the limit signals."""
+        for signal, subscription_id in self._subscriptions:
+            signal.unsubscribe(subscription_id)
+        self._subscriptions = []
+
+    def _update_low(self, value=None, **kwargs):
+        self._low = value
+
+    def _update_high(self, value=None, **kwargs):
+        self._high = value
+
+    def refresh(self):
+        """Reads the limits from EPICS, replacing the cached limits."""
+        self._low = self.motor.low_limit_travel.get()
+        self._high = self.motor.high_limit_travel.get()
+
+    @property
+    def limits(self) -> Tuple[float, float]:
+        """The cached low and high limits of the motor."""
+        if self._low is None or self._high is None:
+            self.refresh()
+        return self._low, self._high  # type: ignore
 
     def is_within(self, position: float) -> bool:
         """Checks position against limits
@@ -18,8 +62,7 @@ class MotorLimitHelper:
         :param position: The position to check
         :return: True if position is within the limits
         """
-        low = self.motor.low_limit_travel.get()
-        high = self.motor.high_limit_travel.get()
+        low, high = self.limits
         return low <= position <= high
 
 
@@ -33,6 +76,16 @@ class XYZLimitBundle:
     y: MotorLimitHelper
     z: MotorLimitHelper
 
+    def refresh(self):
+        """Reads the limits of all three axes from EPICS."""
+        for axis in (self.x, self.y, self.z):
+            axis.refresh()
+
+    def close(self):
+        """Removes the monitors on the limits of all three axes."""
+        for axis in (self.x, self.y, self.z):
+            axis.close()
+
     def position_valid(self, position: np.ndarray):
         if len(position) != 3:
             raise ValueError(
@@ -43,3 +96,49 @@ class XYZLimitBundle:
             & self.y.is_within(position[1])
             & self.z.is_within(position[2])
         )
+
+    @property
+    def limits(self) -> Tuple[ndarray, ndarray]:
+        """The cached low and high limits of the x, y and z axes, each as an x, y, z
+        3-vector."""
+        low, high = np.array([axis.limits for axis in (self.x, self.y, self.z)]).T
+        return low, high
+
+    @staticmethod
+    def _as_positions(positions: ArrayLike) -> ndarray:
+        positions = np.asarray(positions, dtype=float)
+        if positions.ndim != 2 or positions.shape[1] != 3:
+            raise ValueError(
+                f"Expected an (N, 3) array of positions, got {positions.shape}"
+            )
+        return positions
+
+    def limit_violations(self, positions: ArrayLike) -> ndarray:
+        """Gives how far each of many positions is outside the limits of each axis.
+
+        :param positions: An (N, 3) array of x, y, z positions
+        :return: An (N, 3) array that is negative where a position is below the low
+                 limit of an axis, positive where it is above the high limit and zero
+                 where it is within the limits"""
+        positions = self._as_positions(positions)
+        low, high = self.limits
+        return np.minimum(positions - low, 0) + np.maximum(positions - high, 0)
+
+    def positions_valid(self, positions: ArrayLike) -> ndarray:
+        """Checks many positions against the limits at once.
+
+        :param positions: An (N, 3) array of x, y, z positions
+        :return: An (N,) mask that is True where a position is within the limits of
+                 all three axes"""
+        positions = self._as_positions(positions)
+        low, high = self.limits
+        return ((positions >= low) & (positions <= high)).all(axis=1)
+
+    def clip_to_limits(self, positions: ArrayLike) -> ndarray:
+        """Moves each of many positions to the nearest position within the limits.
+
+        :param positions: An (N, 3) array of x, y, z positions
+        :return: An (N, 3) array of the clipped positions"""
+        positions = self._as_positions(positions)
+        low, high = self.limits
+        return np.clip(positions, low, high)
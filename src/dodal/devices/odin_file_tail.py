@@ -0,0 +1,186 @@
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import h5py
+import numpy as np
+from ophyd import Signal
+
+from dodal.devices.eiger_odin import EigerOdin
+from dodal.log import LOGGER
+
+
+class OdinFileTail:
+    """Reads frames from an HDF5 file, or a VDS over several files, whilst Odin is
+    still writing it.
+
+    The file is opened in SWMR mode and frames are read as they become visible in
+    the file. If `follow` has been given Odin's `num_captured` only frames that Odin
+    has reported as captured are read. Frames are read in chunks of up to
+    `chunk_size` frames into a single buffer, and each chunk is yielded as a view of
+    that buffer, so a chunk is only valid until the next one is requested.
+
+    Reading stops when the requested number of frames have been read, when `stop` is
+    called or with a TimeoutError when no new frames arrive within `timeout`.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        dataset_name: str = "data",
+        chunk_size: int = 1,
+        timeout: float = 30.0,
+        poll_period: float = 0.1,
+    ):
+        self.file_path = Path(file_path)
+        self.dataset_name = dataset_name
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.poll_period = poll_period
+        self.frames_read = 0
+
+        self._file: Optional[h5py.File] = None
+        self._dataset: Optional[h5py.Dataset] = None
+        self._buffer: Optional[np.ndarray] = None
+        self._num_captured: Optional[int] = None
+        self._followed: Optional[Signal] = None
+        self._stopped = False
+        self._new_frames = threading.Condition()
+
+    @classmethod
+    def for_odin_node(
+        cls, odin: EigerOdin, node_number: int = 0, **kwargs
+    ) -> "OdinFileTail":
+        """Creates a tail of the file that one Odin filewriter node is writing,
+        following the number of frames that node has captured. Each node writes its
+        own file, named with the node number from _000001.h5.
+
+        Args:
+            odin (EigerOdin): The Odin filewriters.
+            node_number (int, optional): The node to follow, counting from 0.
+            **kwargs: Passed on to the `OdinFileTail`.
+        """
+        node = odin.nodes.nodes[node_number]
+        file_path = Path(odin.file_writer.file_path.get()) / (
+            f"{odin.file_writer.file_name.get()}_{node_number + 1:06d}.h5"
+        )
+        tail = cls(file_path, **kwargs)
+        tail.follow(node.num_captured)
+        return tail
+
+    def follow(self, num_captured: Signal):
+        """Only read frames once num_captured reports them as captured."""
+        self._followed = num_captured
+        num_captured.subscribe(self._num_captured_changed)
+
+    def _num_captured_changed(self, value=None, **kwargs):
+        if value is None:
+            return
+        with self._new_frames:
+            self._num_captured = value
+            self._new_frames.notify_all()
+
+    def stop(self):
+        """Stops reading once the frames that are already available are read."""
+        with self._new_frames:
+            self._stopped = True
+            self._new_frames.notify_all()
+
+    def close(self):
+        self.stop()
+        if self._followed is not None:
+            self._followed.clear_sub(self._num_captured_changed)
+            self._followed = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._dataset = None
+
+    def __enter__(self) -> "OdinFileTail":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open(self) -> bool:
+        try:
+            self._file = h5py.File(self.file_path, "r", libver="latest", swmr=True)
+        except (FileNotFoundError, OSError):
+            # Not created, or not yet switched to SWMR mode, by the writer
+            return False
+        try:
+            self._dataset = self._file[self.dataset_name]
+        except KeyError:
+            LOGGER.debug(f"No {self.dataset_name} in {self.file_path} yet")
+            self._file.close()
+            self._file = None
+            return False
+        self._buffer = np.empty(
+            (self.chunk_size,) + self._dataset.shape[1:], dtype=self._dataset.dtype
+        )
+        LOGGER.info(f"Tailing {self.file_path}/{self.dataset_name}")
+        return True
+
+    def _frames_available(self) -> int:
+        if self._dataset is None and not self._open():
+            return 0
+        assert self._dataset is not None
+        self._dataset.refresh()
+        visible = self._dataset.shape[0]
+        if self._num_captured is None:
+            return visible
+        return min(visible, self._num_captured)
+
+    def _wait_for_frames(self, num_frames: Optional[int]) -> int:
+        last_progress = time.monotonic()
+        while True:
+            available = self._frames_available()
+            if num_frames is not None:
+                available = min(available, num_frames)
+            if available > self.frames_read or self._stopped:
+                return available
+            if time.monotonic() - last_progress > self.timeout:
+                raise TimeoutError(
+                    f"No new frames in {self.file_path} after {self.frames_read} "
+                    f"frames in {self.timeout}s"
+                )
+            with self._new_frames:
+                self._new_frames.wait(self.poll_period)
+
+    def chunks(self, num_frames: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yields chunks of new frames, as views of a buffer that is reused for each
+        chunk.
+
+        Args:
+            num_frames (int, optional): The total number of frames to read, if not
+                given reads until stopped.
+        """
+        while num_frames is None or self.frames_read < num_frames:
+            available = self._wait_for_frames(num_frames)
+            if available <= self.frames_read:
+                return
+            assert self._dataset is not None and self._buffer is not None
+            while self.frames_read < available:
+                chunk_frames = min(self.chunk_size, available - self.frames_read)
+                self._dataset.read_direct(
+                    self._buffer,
+                    np.s_[self.frames_read : self.frames_read + chunk_frames],
+                    np.s_[0:chunk_frames],
+                )
+                self.frames_read += chunk_frames
+                yield self._buffer[:chunk_frames]
+
+    def frames(self, num_frames: Optional[int] = None) -> Iterator[np.ndarray]:
+        """Yields each new frame, as a view that is only valid until the next frame."""
+        for chunk in self.chunks(num_frames):
+            yield from chunk
+
+
+def summed_intensities(
+    tail: OdinFileTail, num_frames: Optional[int] = None
+) -> Iterator[float]:
+    """An example consumer of an `OdinFileTail`, yielding the summed intensity of
+    each frame as it is written."""
+    for chunk in tail.chunks(num_frames):
+        yield from chunk.sum(axis=tuple(range(1, chunk.ndim)))
@@ -0,0 +1,205 @@
+import math
+import threading
+import time
+from collections import deque
+from functools import partial
+from typing import Deque, List, Optional, Tuple
+
+from ophyd import Component, Device, Kind, Signal
+
+from dodal.devices.eiger_odin import EigerOdin
+from dodal.log import LOGGER
+
+
+class FrameRateTracker:
+    """Calculates the rate of a frame counter over a sliding window of updates."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._samples: Deque[Tuple[float, float]] = deque()
+
+    def add(self, count: float, timestamp: float):
+        if self._samples and count < self._samples[-1][0]:
+            # The counter has been reset for a new acquisition
+            self._samples.clear()
+        self._samples.append((count, timestamp))
+        while len(self._samples) > 2 and timestamp - self._samples[0][1] > self.window:
+            self._samples.popleft()
+
+    def reset(self):
+        self._samples.clear()
+
+    @property
+    def count(self) -> float:
+        return self._samples[-1][0] if self._samples else 0
+
+    @property
+    def rate(self) -> float:
+        if len(self._samples) < 2:
+            return 0.0
+        (first_count, first_time), (last_count, last_time) = (
+            self._samples[0],
+            self._samples[-1],
+        )
+        if last_time <= first_time:
+            return 0.0
+        return (last_count - first_count) / (last_time - first_time)
+
+
+class OdinThroughputMonitor(Device):
+    """Monitors how well the Odin filewriters are keeping up with the frames sent by
+    the fan, using monitors on the frame counters of the fan and each node.
+
+    Frame rates are in Hz and are calculated over the last `RATE_WINDOW` seconds.
+    The lag of a node is how many frames it has captured fewer than its share of the
+    frames sent by the fan. A warning is logged when a node falls more than
+    `lag_warning_frames` behind, or when a node drops or times out frames, and
+    `nodes_behind` can be subscribed to in order to stop a collection early.
+    """
+
+    aggregate_frame_rate: Signal = Component(Signal, kind=Kind.hinted)
+    fan_frame_rate: Signal = Component(Signal)
+    node_frame_rates: Signal = Component(Signal)
+    lag_frames: Signal = Component(Signal, kind=Kind.hinted)
+    node_lag_frames: Signal = Component(Signal)
+    nodes_behind: Signal = Component(Signal)
+    frames_dropped: Signal = Component(Signal)
+    frames_timed_out: Signal = Component(Signal)
+    time_remaining: Signal = Component(Signal)
+    projected_completion_time: Signal = Component(Signal)
+
+    RATE_WINDOW = 2.0
+    LAG_WARNING_FRAMES = 1000
+
+    def __init__(
+        self,
+        odin: EigerOdin,
+        *args,
+        lag_warning_frames: Optional[int] = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.odin = odin
+        self.lag_warning_frames = (
+            self.LAG_WARNING_FRAMES
+            if lag_warning_frames is None
+            else lag_warning_frames
+        )
+        self._lock = threading.RLock()
+        nodes = odin.nodes.nodes
+        self._fan_tracker = FrameRateTracker(self.RATE_WINDOW)
+        self._node_trackers = [FrameRateTracker(self.RATE_WINDOW) for _ in nodes]
+        self._dropped = [0] * len(nodes)
+        self._timed_out = [0] * len(nodes)
+        self._behind = [False] * len(nodes)
+        self._target_frames = 0
+
+        self._subscriptions = [
+            (odin.fan.frames_sent, odin.fan.frames_sent.subscribe(self._fan_updated)),
+            (
+                odin.file_writer.num_capture,
+                odin.file_writer.num_capture.subscribe(self._target_updated),
+            ),
+        ]
+        for node_number, node in enumerate(nodes):
+            for signal, callback in [
+                (node.num_captured, self._node_captured_updated),
+                (node.frames_dropped, self._node_dropped_updated),
+                (node.frames_timed_out, self._node_timed_out_updated),
+            ]:
+                self._subscriptions.append(
+                    (signal, signal.subscribe(partial(callback, node_number)))
+                )
+        self.reset()
+
+    def reset(self):
+        """Clears the rates, lags, frame totals and target, e.g. at the start of a
+        collection."""
+        with self._lock:
+            self._fan_tracker.reset()
+            for tracker in self._node_trackers:
+                tracker.reset()
+            num_nodes = len(self._node_trackers)
+            self._dropped = [0] * num_nodes
+            self._timed_out = [0] * num_nodes
+            self._behind = [False] * num_nodes
+            self._target_frames = 0
+            self._publish()
+
+    def stop_monitoring(self):
+        """Removes the monitors on the Odin frame counters."""
+        for signal, subscription_id in self._subscriptions:
+            signal.unsubscribe(subscription_id)
+        self._subscriptions = []
+
+    @staticmethod
+    def _timestamp(kwargs) -> float:
+        return kwargs.get("timestamp") or time.time()
+
+    def _fan_updated(self, value=None, **kwargs):
+        with self._lock:
+            self._fan_tracker.add(value or 0, self._timestamp(kwargs))
+            self._publish()
+
+    def _target_updated(self, value=None, **kwargs):
+        with self._lock:
+            self._target_frames = value or 0
+            self._publish()
+
+    def _node_captured_updated(self, node_number: int, value=None, **kwargs):
+        with self._lock:
+            self._node_trackers[node_number].add(value or 0, self._timestamp(kwargs))
+            self._publish()
+
+    def _node_dropped_updated(self, node_number: int, value=None, **kwargs):
+        with self._lock:
+            self._warn_if_increased(self._dropped, node_number, value, "dropped")
+            self._publish()
+
+    def _node_timed_out_updated(self, node_number: int, value=None, **kwargs):
+        with self._lock:
+            self._warn_if_increased(self._timed_out, node_number, value, "timed out")
+            self._publish()
+
+    def _warn_if_increased(self, counts: List[int], node_number: int, value, verb):
+        value = value or 0
+        if value > counts[node_number]:
+            LOGGER.warning(f"Odin filewriter {node_number} has {verb} {value} frames")
+        counts[node_number] = value
+
+    def _publish(self):
+        num_nodes = len(self._node_trackers)
+        frames_sent = self._fan_tracker.count
+        node_captured = [tracker.count for tracker in self._node_trackers]
+        total_captured = sum(node_captured)
+        node_rates = [tracker.rate for tracker in self._node_trackers]
+        aggregate_rate = sum(node_rates)
+        node_lags = [frames_sent / num_nodes - captured for captured in node_captured]
+
+        for node_number, lag in enumerate(node_lags):
+            behind = lag > self.lag_warning_frames
+            if behind and not self._behind[node_number]:
+                LOGGER.warning(
+                    f"Odin filewriter {node_number} is {lag:.0f} frames behind the fan"
+                )
+            self._behind[node_number] = behind
+
+        remaining_frames = self._target_frames - total_captured
+        if self._target_frames and aggregate_rate > 0:
+            time_remaining = max(remaining_frames, 0) / aggregate_rate
+        else:
+            time_remaining = math.nan
+
+        self.fan_frame_rate.put(self._fan_tracker.rate)
+        self.node_frame_rates.put(node_rates)
+        self.aggregate_frame_rate.put(aggregate_rate)
+        self.node_lag_frames.put(node_lags)
+        self.lag_frames.put(frames_sent - total_captured)
+        self.nodes_behind.put(list(self._behind))
+        self.frames_dropped.put(sum(self._dropped))
+        self.frames_timed_out.put(sum(self._timed_out))
+        self.time_remaining.put(time_remaining)
+        self.projected_completion_time.put(time.time() + time_remaining)
+
+    def any_node_behind(self) -> bool:
+        return any(self.nodes_behind.get())
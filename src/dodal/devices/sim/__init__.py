@@ -0,0 +1,42 @@
+from .benchmark import (
+    BENCHMARK_GRIDS,
+    TimingResult,
+    benchmark_consecutive_collections,
+    benchmark_detector_params_copies,
+    benchmark_eiger,
+    benchmark_eiger_async,
+    benchmark_fast_grid_scan,
+    format_report,
+)
+from .eiger import (
+    EigerSimLatencies,
+    SimulatedEigerIOC,
+    SimulatedOdinIOC,
+    make_simulated_eiger,
+)
+from .eiger_async import SimulatedEigerAsyncIOC, make_simulated_eiger_async
+from .fast_grid_scan import (
+    FastGridScanSimLatencies,
+    SimulatedFastGridScanIOC,
+    make_simulated_fast_grid_scan,
+)
+
+__all__ = [
+    "EigerSimLatencies",
+    "SimulatedEigerIOC",
+    "SimulatedOdinIOC",
+    "make_simulated_eiger",
+    "SimulatedEigerAsyncIOC",
+    "make_simulated_eiger_async",
+    "FastGridScanSimLatencies",
+    "SimulatedFastGridScanIOC",
+    "make_simulated_fast_grid_scan",
+    "TimingResult",
+    "benchmark_eiger",
+    "benchmark_eiger_async",
+    "benchmark_consecutive_collections",
+    "benchmark_detector_params_copies",
+    "benchmark_fast_grid_scan",
+    "BENCHMARK_GRIDS",
+    "format_report",
+]
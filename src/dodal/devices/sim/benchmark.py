@@ -0,0 +1,299 @@
+import asyncio
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from dodal.devices.detector import DetectorParams
+from dodal.devices.fast_grid_scan import GridScanParams
+from dodal.devices.motors import XYZLimitBundle
+from dodal.devices.sim.eiger import EigerSimLatencies, make_simulated_eiger
+from dodal.devices.sim.eiger_async import make_simulated_eiger_async
+from dodal.devices.sim.fast_grid_scan import (
+    FastGridScanSimLatencies,
+    make_simulated_fast_grid_scan,
+)
+
+
+@dataclass
+class TimingResult:
+    """The wall-clock timings, in seconds, of repeated runs of one operation."""
+
+    name: str
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def mean(self) -> float:
+        return statistics.mean(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def min(self) -> float:
+        return min(self.samples)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples)
+
+    def time(self, func: Callable[[], object]):
+        """Runs func and records how long it took."""
+        start = time.perf_counter()
+        func()
+        self.samples.append(time.perf_counter() - start)
+
+    async def time_async(self, func: Callable[[], Awaitable], timeout: float):
+        """Awaits func and records how long it took."""
+        start = time.perf_counter()
+        await asyncio.wait_for(func(), timeout)
+        self.samples.append(time.perf_counter() - start)
+
+
+def format_report(results: Dict[str, TimingResult]) -> str:
+    """Formats timing results as a table with one row per operation, in ms."""
+    lines = [f"{'operation':<12}{'mean':>10}{'median':>10}{'min':>10}{'max':>10}"]
+    for result in results.values():
+        lines.append(
+            f"{result.name:<12}"
+            + "".join(
+                f"{value * 1000:>10.1f}"
+                for value in [result.mean, result.median, result.min, result.max]
+            )
+        )
+    return "\n".join(lines)
+
+
+def benchmark_eiger(
+    params: DetectorParams,
+    latencies: Optional[EigerSimLatencies] = None,
+    repeats: int = 5,
+    timeout: float = 30.0,
+) -> Dict[str, TimingResult]:
+    """Times arming, staging, unstaging and stopping an `EigerDetector` against a
+    simulated IOC.
+
+    Each repeat arms through `async_stage`, collects all frames and unstages, then
+    stages through `stage` and stops. The simulated IOC is settled between
+    operations so each is timed from a quiescent detector.
+
+    Args:
+        params (DetectorParams): The parameters to collect with.
+        latencies (EigerSimLatencies, optional): The latencies to simulate.
+        repeats (int, optional): How many times to time each operation.
+        timeout (float, optional): The timeout for each operation.
+
+    Returns:
+        Dict[str, TimingResult]: The timings for "arm", "unstage", "stage" and "stop".
+    """
+    eiger, sim = make_simulated_eiger(params, latencies)
+    results = {name: TimingResult(name) for name in ["arm", "unstage", "stage", "stop"]}
+    try:
+        for _ in range(repeats):
+            results["arm"].time(lambda: eiger.async_stage().wait(timeout))
+            sim.acquire_frames(params.full_number_of_images)
+            results["unstage"].time(eiger.unstage)
+            sim.settle(timeout)
+
+            results["stage"].time(eiger.stage)
+            results["stop"].time(eiger.stop)
+            sim.settle(timeout)
+            sim.reset()
+    finally:
+        sim.close()
+    return results
+
+
+def benchmark_consecutive_collections(
+    params: DetectorParams,
+    latencies: Optional[EigerSimLatencies] = None,
+    num_collections: int = 5,
+    keep_armed: bool = False,
+    timeout: float = 30.0,
+) -> Dict[str, TimingResult]:
+    """Times staging and unstaging an `EigerDetector` for consecutive collections
+    that differ only in run number and omega start, as in a sequence of gridscans
+    and rotations on one sample.
+
+    Args:
+        params (DetectorParams): The parameters for the first collection.
+        latencies (EigerSimLatencies, optional): The latencies to simulate.
+        num_collections (int, optional): How many collections to time.
+        keep_armed (bool, optional): Whether to keep the detector armed between
+            collections.
+        timeout (float, optional): The timeout for each operation.
+
+    Returns:
+        Dict[str, TimingResult]: The timings for "stage" and "unstage".
+    """
+    eiger, sim = make_simulated_eiger(params, latencies)
+    eiger.keep_armed = keep_armed
+    results = {name: TimingResult(name) for name in ["stage", "unstage"]}
+    try:
+        for collection in range(num_collections):
+            eiger.set_detector_parameters(
+                params.evolve(
+                    run_number=params.run_number + collection,
+                    omega_start=params.omega_start + 90 * collection,
+                )
+            )
+            results["stage"].time(eiger.stage)
+            sim.acquire_frames(params.full_number_of_images)
+            results["unstage"].time(eiger.unstage)
+            sim.settle(timeout)
+        eiger.stop()
+    finally:
+        sim.close()
+    return results
+
+
+def benchmark_detector_params_copies(
+    params: DetectorParams,
+    changes: Optional[Dict[str, Any]] = None,
+    repeats: int = 5,
+    copies_per_repeat: int = 100,
+) -> Dict[str, TimingResult]:
+    """Times making copies of `DetectorParams` with a few fields changed, by full
+    construction from the serialised parameters and by `DetectorParams.evolve`.
+
+    Args:
+        params (DetectorParams): The parameters to copy.
+        changes (Dict[str, Any], optional): The fields to change in each copy,
+            defaults to a new run number and omega start.
+        repeats (int, optional): How many times to time each way of copying.
+        copies_per_repeat (int, optional): How many copies each timing makes.
+
+    Returns:
+        Dict[str, TimingResult]: The timings for "construct" and "evolve".
+    """
+    if changes is None:
+        changes = {
+            "run_number": params.run_number + 1,
+            "omega_start": params.omega_start + 90,
+        }
+    serialised = json.loads(params.json())
+    serialised.pop("beam_xy_converter")
+    serialised.update(changes)
+
+    def construct():
+        for _ in range(copies_per_repeat):
+            DetectorParams(**serialised)
+
+    def evolve():
+        for _ in range(copies_per_repeat):
+            params.evolve(**changes)
+
+    results = {name: TimingResult(name) for name in ["construct", "evolve"]}
+    for _ in range(repeats):
+        results["construct"].time(construct)
+        results["evolve"].time(evolve)
+    return results
+
+
+def benchmark_eiger_async(
+    params: DetectorParams,
+    latencies: Optional[EigerSimLatencies] = None,
+    repeats: int = 5,
+    timeout: float = 30.0,
+) -> Dict[str, TimingResult]:
+    """Times the same operations as `benchmark_eiger` on an `EigerDetectorAsync`,
+    in a new event loop.
+
+    Args:
+        params (DetectorParams): The parameters to collect with.
+        latencies (EigerSimLatencies, optional): The latencies to simulate.
+        repeats (int, optional): How many times to time each operation.
+        timeout (float, optional): The timeout for each operation.
+
+    Returns:
+        Dict[str, TimingResult]: The timings for "arm", "unstage", "stage" and "stop".
+    """
+
+    async def run_benchmark() -> Dict[str, TimingResult]:
+        eiger, sim = await make_simulated_eiger_async(params, latencies)
+        results = {
+            name: TimingResult(name) for name in ["arm", "unstage", "stage", "stop"]
+        }
+        try:
+            for _ in range(repeats):
+                await results["arm"].time_async(eiger.arm, timeout)
+                sim.acquire_frames(params.full_number_of_images)
+                await results["unstage"].time_async(eiger.unstage, timeout)
+                await sim.settle(timeout)
+
+                await results["stage"].time_async(eiger.stage, timeout)
+                await results["stop"].time_async(eiger.stop, timeout)
+                await sim.settle(timeout)
+                sim.reset()
+        finally:
+            sim.close()
+        return results
+
+    return asyncio.run(run_benchmark())
+
+
+# Grids of up to 100k frames with no dwell time, to run the motion as fast as the
+# callbacks allow
+BENCHMARK_GRIDS: Dict[str, GridScanParams] = {
+    "2d_1k": GridScanParams(x_steps=40, y_steps=25, dwell_time=0),
+    "2d_10k": GridScanParams(x_steps=125, y_steps=80, dwell_time=0),
+    "2d_100k": GridScanParams(x_steps=400, y_steps=250, dwell_time=0),
+    "3d_10k": GridScanParams(x_steps=100, y_steps=50, z_steps=50, dwell_time=0),
+    "3d_100k": GridScanParams(x_steps=400, y_steps=125, z_steps=125, dwell_time=0),
+}
+
+
+def benchmark_fast_grid_scan(
+    params: GridScanParams,
+    limits: Optional[XYZLimitBundle] = None,
+    latencies: Optional[FastGridScanSimLatencies] = None,
+    repeats: int = 3,
+    timeout: float = 120.0,
+) -> Dict[str, TimingResult]:
+    """Times uploading, kicking off and completing a `FastGridScan` against a
+    simulated motion program, with a watcher on the completion status as a progress
+    bar would have.
+
+    Args:
+        params (GridScanParams): The scan to run, see `BENCHMARK_GRIDS`.
+        limits (XYZLimitBundle, optional): The limits to validate the scan against.
+        latencies (FastGridScanSimLatencies, optional): The latencies to simulate.
+        repeats (int, optional): How many times to run the scan.
+        timeout (float, optional): The timeout for each operation.
+
+    Returns:
+        Dict[str, TimingResult]: The timings for "upload", "kickoff" and "scan", the
+            total time spent in position counter callbacks during each scan as
+            "callbacks" and the time from the motion finishing to the completion
+            status finishing as "completion".
+    """
+    fast_grid_scan, sim = make_simulated_fast_grid_scan(limits, latencies)
+    results = {
+        name: TimingResult(name)
+        for name in ["upload", "kickoff", "scan", "callbacks", "completion"]
+    }
+    notifications: List[Dict[str, Any]] = []
+    try:
+        for _ in range(repeats):
+            results["upload"].time(
+                lambda: fast_grid_scan.upload_params.set(params).wait(timeout)
+            )
+            # Watch for completion before kicking off in case the scan is quicker
+            # than the kickoff
+            complete = fast_grid_scan.complete()
+            complete.watch(lambda **kwargs: notifications.append(kwargs))
+            results["kickoff"].time(lambda: fast_grid_scan.kickoff().wait(timeout))
+            results["scan"].time(lambda: complete.wait(timeout))
+            completed_at = time.perf_counter()
+            sim.wait_for_motion(timeout)
+
+            results["callbacks"].samples.append(sim.callback_time)
+            if sim.finished_at is None:
+                raise RuntimeError("Simulated grid scan finished without moving")
+            results["completion"].samples.append(completed_at - sim.finished_at)
+            sim.reset()
+    finally:
+        sim.close()
+    return results
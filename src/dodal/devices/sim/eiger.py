@@ -0,0 +1,370 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ophyd import Device
+from ophyd.sim import FakeEpicsSignal, make_fake_device
+
+from dodal.devices.detector import DetectorParams
+from dodal.devices.eiger import EigerDetector
+from dodal.devices.eiger_odin import EigerOdin, OdinNode
+from dodal.log import LOGGER
+
+
+@dataclass
+class EigerSimLatencies:
+    """The latencies, in seconds, modelled by the simulated Eiger and Odin IOCs.
+
+    Attributes:
+        put: The time taken for the IOC to process any put.
+        overrides: Per-signal put latencies keyed by the dotted name of the signal
+            within the simulated device e.g. "cam.acquire_time".
+        threshold_change: The time taken to change the photon energy threshold.
+        stale_parameters: How long StaleParameters_RBV stays high after the last
+            write to a cam parameter.
+        odin_file_name: How long a new file name takes to reach the meta listener
+            and the filewriter acquisition ID.
+        odin_writer_start: How long the writers take to start after capture.
+        fan_ready: How long the fan takes to become ready after the detector arms.
+        writer_close: How long the writers take to finish after the last frame.
+    """
+
+    put: float = 0.0
+    overrides: Dict[str, float] = field(default_factory=dict)
+    threshold_change: float = 0.0
+    stale_parameters: float = 0.0
+    odin_file_name: float = 0.0
+    odin_writer_start: float = 0.0
+    fan_ready: float = 0.0
+    writer_close: float = 0.0
+
+    def for_signal(self, dotted_name: str) -> float:
+        if dotted_name in self.overrides:
+            return self.overrides[dotted_name]
+        if dotted_name.endswith("cam.photon_energy"):
+            return self.threshold_change
+        return self.put
+
+
+class _SimulatedIOC:
+    """Emulates IOC behaviour on a device made with `make_fake_device`.
+
+    Puts are processed after a configurable latency. A put made through `set` blocks
+    its set thread for the latency, as put completion would, whilst a plain `put`
+    returns immediately and is processed in the background.
+    """
+
+    def __init__(self, device: Device, latencies: Optional[EigerSimLatencies] = None):
+        self.device = device
+        self.latencies = latencies or EigerSimLatencies()
+        self._reactions: Dict[str, Callable] = {}
+        self._timers: List[threading.Timer] = []
+        self._lock = threading.RLock()
+        for walk in device.walk_signals(include_lazy=True):
+            signal = walk.item
+            if isinstance(signal, FakeEpicsSignal):
+                signal.sim_set_putter(self._make_putter(signal))
+
+    def _make_putter(self, signal: FakeEpicsSignal):
+        def putter(value, *args, **kwargs):
+            def process_put():
+                signal.sim_put(value)
+                reaction = self._reactions.get(signal.dotted_name)
+                if reaction is not None:
+                    reaction(value)
+
+            latency = self.latencies.for_signal(signal.dotted_name)
+            if latency <= 0:
+                process_put()
+            elif threading.current_thread() is signal._set_thread:
+                time.sleep(latency)
+                process_put()
+            else:
+                self.schedule(latency, process_put)
+
+        return putter
+
+    def on_put(self, signal: FakeEpicsSignal, reaction: Callable):
+        """Run reaction with the new value whenever the IOC processes a put to signal"""
+        self._reactions[signal.dotted_name] = reaction
+
+    def schedule(
+        self, delay: float, func: Callable[[], None]
+    ) -> Optional[threading.Timer]:
+        """Runs func after delay seconds, or immediately if there is no delay.
+
+        Returns:
+            Optional[threading.Timer]: The timer that will run func, if delayed.
+        """
+        if delay <= 0:
+            func()
+            return None
+        timer = threading.Timer(delay, func)
+        timer.daemon = True
+        with self._lock:
+            self._timers = [t for t in self._timers if t.is_alive()]
+            self._timers.append(timer)
+        timer.start()
+        return timer
+
+    def settle(self, timeout: float = 10.0):
+        """Waits for all scheduled IOC processing to complete."""
+        end_time = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = [t for t in self._timers if t.is_alive()]
+            if not pending:
+                return
+            remaining = end_time - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Simulated IOC did not settle in {timeout}s")
+            pending[0].join(remaining)
+
+    def close(self):
+        """Cancels all pending IOC processing."""
+        with self._lock:
+            for timer in self._timers:
+                timer.cancel()
+            self._timers = []
+
+
+class SimulatedOdinIOC(_SimulatedIOC):
+    """Simulates the Odin IOCs behind an `EigerOdin` made with `make_fake_device`.
+
+    Models the propagation of file names to the meta listener, writers starting and
+    stopping on capture, fan readiness and per-node frame counts as frames arrive.
+    """
+
+    def __init__(self, odin: EigerOdin, latencies: Optional[EigerSimLatencies] = None):
+        super().__init__(odin, latencies)
+        self.odin = odin
+        self._detector_armed = False
+        self._frame_lock = threading.Lock()
+
+        self.on_put(odin.file_writer.file_name, self._file_name_changed)
+        self.on_put(odin.file_writer.capture, self._capture_changed)
+        self.on_put(odin.meta.stop_writing, lambda _: self._stop_writing())
+        for node in odin.nodes.nodes:
+            self.on_put(node.clear_errors, self._make_clear_errors(node))
+
+        self.reset()
+
+    def reset(self):
+        """Puts the simulated Odin into a connected, initialised and idle state."""
+        odin = self.odin
+        for signal in [odin.fan.on, odin.fan.connected, odin.meta.initialised]:
+            signal.sim_put(1)
+        for signal in [
+            odin.fan.ready,
+            odin.fan.frames_sent,
+            odin.meta.ready,
+            odin.file_writer.capture,
+            odin.file_writer.num_captured,
+        ]:
+            signal.sim_put(0)
+        for node in odin.nodes.nodes:
+            node.fp_initialised.sim_put(1)
+            node.fr_initialised.sim_put(1)
+            for signal in [
+                node.writing,
+                node.error_status,
+                node.frames_dropped,
+                node.frames_timed_out,
+                node.num_captured,
+            ]:
+                signal.sim_put(0)
+            node.error_message.sim_put("")
+
+    def _file_name_changed(self, file_name):
+        def propagate():
+            self.odin.meta.file_name.sim_put(file_name)
+            self.odin.file_writer.id.sim_put(file_name)
+
+        self.schedule(self.latencies.odin_file_name, propagate)
+
+    def _capture_changed(self, capture):
+        if capture:
+            self.schedule(self.latencies.odin_writer_start, self._start_writing)
+        else:
+            self._stop_writing()
+
+    def _start_writing(self):
+        odin = self.odin
+        odin.file_writer.num_captured.sim_put(0)
+        odin.fan.frames_sent.sim_put(0)
+        for node in odin.nodes.nodes:
+            node.num_captured.sim_put(0)
+            node.writing.sim_put(1)
+        odin.meta.ready.sim_put(1)
+
+    def _stop_writing(self):
+        odin = self.odin
+        odin.file_writer.capture.sim_put(0)
+        for node in odin.nodes.nodes:
+            node.writing.sim_put(0)
+        odin.meta.ready.sim_put(0)
+
+    def _make_clear_errors(self, node: OdinNode):
+        def clear_errors(_):
+            node.error_status.sim_put(0)
+            node.error_message.sim_put("")
+
+        return clear_errors
+
+    def detector_armed(self, armed: bool):
+        """Called when the detector arms or disarms, the fan follows the detector."""
+        self._detector_armed = armed
+        if armed:
+
+            def fan_ready():
+                if self._detector_armed:
+                    self.odin.fan.ready.sim_put(1)
+
+            self.schedule(self.latencies.fan_ready, fan_ready)
+        else:
+            self.odin.fan.ready.sim_put(0)
+
+    def inject_node_error(self, node_number: int, message: str):
+        node = self.odin.nodes.nodes[node_number]
+        node.error_status.sim_put(1)
+        node.error_message.sim_put(message)
+
+    def _receive_frame(self):
+        odin = self.odin
+        nodes = odin.nodes.nodes
+        with self._frame_lock:
+            frames_sent = odin.fan.frames_sent.get() + 1
+            odin.fan.frames_sent.sim_put(frames_sent)
+            node = nodes[(frames_sent - 1) % len(nodes)]
+            if not odin.meta.ready.get():
+                node.frames_dropped.sim_put(node.frames_dropped.get() + 1)
+                return
+            node.num_captured.sim_put(node.num_captured.get() + 1)
+            captured = odin.file_writer.num_captured.get() + 1
+            odin.file_writer.num_captured.sim_put(captured)
+        frames_to_capture = odin.file_writer.num_capture.get()
+        if frames_to_capture and captured == frames_to_capture:
+            self.schedule(self.latencies.writer_close, self._stop_writing)
+
+    def acquire_frames(
+        self, num_frames: int, frame_rate: Optional[float] = None
+    ) -> threading.Thread:
+        """Sends frames through the fan to the writers.
+
+        Args:
+            num_frames (int): The number of frames to send.
+            frame_rate (float, optional): The rate to send frames at, in Hz. If not
+                given all frames are sent immediately.
+
+        Returns:
+            threading.Thread: The thread sending the frames, which has already
+                finished if no frame rate is given.
+        """
+        period = 1 / frame_rate if frame_rate else 0
+
+        def send_frames():
+            start = time.monotonic()
+            for frame in range(num_frames):
+                if period:
+                    delay = start + (frame + 1) * period - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                self._receive_frame()
+
+        thread = threading.Thread(target=send_frames, daemon=True)
+        thread.start()
+        if not period:
+            thread.join()
+        return thread
+
+
+class SimulatedEigerIOC(_SimulatedIOC):
+    """Simulates the Eiger and Odin IOCs behind an `EigerDetector` made with
+    `make_fake_device`.
+
+    On top of `SimulatedOdinIOC` this models StaleParameters_RBV going high whilst
+    cam parameters are processed and the fan following the detector arming.
+    """
+
+    def __init__(
+        self, eiger: EigerDetector, latencies: Optional[EigerSimLatencies] = None
+    ):
+        super().__init__(eiger, latencies)
+        # The Odin simulation takes over the puts to the Odin signals
+        self.odin = SimulatedOdinIOC(eiger.odin, self.latencies)
+        self.eiger = eiger
+        self._stale_timer: Optional[threading.Timer] = None
+
+        for walk in eiger.cam.walk_signals(include_lazy=True):
+            if isinstance(walk.item, FakeEpicsSignal):
+                self.on_put(walk.item, self._make_cam_reaction(walk.item))
+
+        self.reset()
+
+    def reset(self):
+        """Puts the simulated detector into a disarmed state with fresh parameters."""
+        self.odin.reset()
+        self.eiger.cam.acquire.sim_put(0)
+        self.eiger.stale_params.sim_put(0)
+        self.eiger.bit_depth.sim_put(16)
+
+    def _make_cam_reaction(self, signal: FakeEpicsSignal):
+        acquire = signal is self.eiger.cam.acquire
+
+        def cam_parameter_changed(value):
+            if acquire:
+                self.odin.detector_armed(bool(value))
+            else:
+                self._mark_parameters_stale()
+
+        return cam_parameter_changed
+
+    def _mark_parameters_stale(self):
+        with self._lock:
+            if self._stale_timer is not None:
+                self._stale_timer.cancel()
+            self.eiger.stale_params.sim_put(1)
+            self._stale_timer = self.schedule(
+                self.latencies.stale_parameters,
+                lambda: self.eiger.stale_params.sim_put(0),
+            )
+
+    def acquire_frames(
+        self, num_frames: int, frame_rate: Optional[float] = None
+    ) -> threading.Thread:
+        """Simulates the detector being triggered for num_frames, see
+        `SimulatedOdinIOC.acquire_frames`."""
+        return self.odin.acquire_frames(num_frames, frame_rate)
+
+    def settle(self, timeout: float = 10.0):
+        super().settle(timeout)
+        self.odin.settle(timeout)
+
+    def close(self):
+        super().close()
+        self.odin.close()
+
+
+def make_simulated_eiger(
+    params: DetectorParams,
+    latencies: Optional[EigerSimLatencies] = None,
+    name: str = "sim_eiger",
+    num_odin_nodes: int = 4,
+) -> Tuple[EigerDetector, SimulatedEigerIOC]:
+    """Creates a fake `EigerDetector` backed by a simulated IOC.
+
+    Args:
+        params (DetectorParams): The parameters to give the detector.
+        latencies (EigerSimLatencies, optional): The latencies to simulate.
+        name (str, optional): The name of the detector.
+        num_odin_nodes (int, optional): The number of Odin filewriter nodes.
+
+    Returns:
+        Tuple[EigerDetector, SimulatedEigerIOC]: The detector and its simulated IOC.
+    """
+    FakeEigerDetector = make_fake_device(EigerDetector.with_odin_nodes(num_odin_nodes))
+    eiger: EigerDetector = FakeEigerDetector.with_params(params=params, name=name)
+    sim = SimulatedEigerIOC(eiger, latencies)
+    LOGGER.debug(f"Created simulated Eiger {name} with latencies {sim.latencies}")
+    return eiger, sim
@@ -0,0 +1,302 @@
+import asyncio
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from ophyd.v2.core import (
+    Device,
+    DeviceVector,
+    Signal,
+    SignalW,
+    SimSignalBackend,
+    get_device_children,
+    set_sim_value,
+)
+
+from dodal.devices.detector import DetectorParams
+from dodal.devices.eiger_async import EigerDetectorAsync
+from dodal.devices.sim.eiger import EigerSimLatencies
+from dodal.log import LOGGER
+
+
+def _walk_signals(
+    device: Device, dotted_name: str = ""
+) -> Iterator[Tuple[str, Signal]]:
+    children = (
+        device.items()
+        if isinstance(device, DeviceVector)
+        else get_device_children(device)
+    )
+    for name, child in children:
+        child_name = f"{dotted_name}.{name}" if dotted_name else str(name)
+        if isinstance(child, Signal):
+            yield child_name, child
+        else:
+            yield from _walk_signals(child, child_name)
+
+
+class SimulatedEigerAsyncIOC:
+    """Simulates the Eiger and Odin IOCs behind an `EigerDetectorAsync` connected
+    with `connect(sim=True)`, modelling the same behaviour and latencies as
+    `SimulatedEigerIOC`.
+
+    A put waited on by the caller takes the put latency to complete, whilst a put
+    that is not waited on is processed in the background. Must be created and used
+    within the event loop the detector runs in.
+    """
+
+    def __init__(
+        self, eiger: EigerDetectorAsync, latencies: Optional[EigerSimLatencies] = None
+    ):
+        self.eiger = eiger
+        self.latencies = latencies or EigerSimLatencies()
+        self._reactions: Dict[str, Callable[[Any], None]] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._stale_task: Optional[asyncio.Task] = None
+        self._writing = False
+        self._detector_armed = False
+        self._num_capture = 0
+        self._frames_sent = 0
+        self._frames_captured = 0
+        self._node_frames: List[int] = []
+        # How many puts waited on by the caller are being processed, and the most
+        # there have been at once
+        self.puts_in_progress = 0
+        self.max_puts_in_progress = 0
+
+        for dotted_name, signal in _walk_signals(eiger):
+            if isinstance(signal, SignalW):
+                self._wrap_put(dotted_name, signal)
+
+        odin = eiger.odin
+        self._reactions["odin.file_writer.file_name"] = self._file_name_changed
+        self._reactions["odin.file_writer.capture"] = self._capture_changed
+        self._reactions["odin.file_writer.num_capture"] = self._num_capture_changed
+        self._reactions["odin.meta.stop_writing"] = lambda _: self._stop_writing()
+        for node_number in odin.nodes.keys():
+            self._reactions[f"odin.nodes.{node_number}.clear_errors"] = (
+                self._make_clear_errors(node_number)
+            )
+        for dotted_name, _ in _walk_signals(eiger.cam, "cam"):
+            if dotted_name == "cam.acquire":
+                self._reactions[dotted_name] = self._acquire_changed
+            else:
+                self._reactions[dotted_name] = lambda _: self._mark_parameters_stale()
+
+        self.reset()
+
+    def _wrap_put(self, dotted_name: str, signal: SignalW):
+        backend = signal._backend
+        if not isinstance(backend, SimSignalBackend):
+            raise TypeError(f"{signal.name} must be connected with sim=True")
+
+        def process_put(value):
+            set_sim_value(signal, value)
+            reaction = self._reactions.get(dotted_name)
+            if reaction is not None:
+                reaction(value)
+
+        async def put(value, wait=True, timeout=None):
+            latency = self.latencies.for_signal(dotted_name)
+            if latency <= 0:
+                process_put(value)
+            elif wait:
+                self.puts_in_progress += 1
+                self.max_puts_in_progress = max(
+                    self.max_puts_in_progress, self.puts_in_progress
+                )
+                try:
+                    await asyncio.sleep(latency)
+                finally:
+                    self.puts_in_progress -= 1
+                process_put(value)
+            else:
+                self.schedule(latency, lambda: process_put(value))
+
+        backend.put = put  # type: ignore
+
+    def schedule(
+        self, delay: float, func: Callable[[], None]
+    ) -> Optional[asyncio.Task]:
+        """Runs func after delay seconds, or immediately if there is no delay.
+
+        Returns:
+            Optional[asyncio.Task]: The task that will run func, if delayed.
+        """
+        if delay <= 0:
+            func()
+            return None
+
+        async def run_later():
+            await asyncio.sleep(delay)
+            func()
+
+        task = asyncio.ensure_future(run_later())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def settle(self, timeout: float = 10.0):
+        """Waits for all scheduled IOC processing to complete."""
+        while self._pending:
+            await asyncio.wait_for(
+                asyncio.gather(*self._pending, return_exceptions=True), timeout
+            )
+
+    def close(self):
+        """Cancels all pending IOC processing."""
+        for task in list(self._pending):
+            task.cancel()
+
+    def reset(self):
+        """Puts the simulated detector into a disarmed, idle state with connected and
+        initialised filewriters."""
+        eiger, odin = self.eiger, self.eiger.odin
+        for signal in [odin.fan.on, odin.fan.connected, odin.meta.initialised]:
+            set_sim_value(signal, 1)
+        for signal in [
+            odin.fan.ready,
+            odin.fan.frames_sent,
+            odin.meta.ready,
+            odin.file_writer.capture,
+            odin.file_writer.num_captured,
+            eiger.cam.acquire,
+            eiger.stale_params,
+        ]:
+            set_sim_value(signal, 0)
+        set_sim_value(eiger.bit_depth, 16)
+        for node in odin.nodes.values():
+            set_sim_value(node.fp_initialised, 1)
+            set_sim_value(node.fr_initialised, 1)
+            for signal in [
+                node.writing,
+                node.error_status,
+                node.frames_dropped,
+                node.frames_timed_out,
+                node.num_captured,
+            ]:
+                set_sim_value(signal, 0)
+            set_sim_value(node.error_message, "")
+        self._writing = False
+        self._detector_armed = False
+        self._reset_frame_counts()
+
+    def _reset_frame_counts(self):
+        self._frames_sent = 0
+        self._frames_captured = 0
+        self._node_frames = [0] * len(self.eiger.odin.nodes)
+
+    def _file_name_changed(self, file_name):
+        def propagate():
+            set_sim_value(self.eiger.odin.meta.file_name, file_name)
+            set_sim_value(self.eiger.odin.file_writer.id, file_name)
+
+        self.schedule(self.latencies.odin_file_name, propagate)
+
+    def _num_capture_changed(self, num_capture):
+        self._num_capture = num_capture
+
+    def _capture_changed(self, capture):
+        if capture:
+            self.schedule(self.latencies.odin_writer_start, self._start_writing)
+        else:
+            self._stop_writing()
+
+    def _start_writing(self):
+        odin = self.eiger.odin
+        self._reset_frame_counts()
+        set_sim_value(odin.file_writer.num_captured, 0)
+        set_sim_value(odin.fan.frames_sent, 0)
+        for node in odin.nodes.values():
+            set_sim_value(node.num_captured, 0)
+            set_sim_value(node.writing, 1)
+        self._writing = True
+        set_sim_value(odin.meta.ready, 1)
+
+    def _stop_writing(self):
+        odin = self.eiger.odin
+        self._writing = False
+        set_sim_value(odin.file_writer.capture, 0)
+        for node in odin.nodes.values():
+            set_sim_value(node.writing, 0)
+        set_sim_value(odin.meta.ready, 0)
+
+    def _make_clear_errors(self, node_number: int):
+        node = self.eiger.odin.nodes[node_number]
+
+        def clear_errors(_):
+            set_sim_value(node.error_status, 0)
+            set_sim_value(node.error_message, "")
+
+        return clear_errors
+
+    def _acquire_changed(self, acquire):
+        self._detector_armed = bool(acquire)
+        fan_ready = self.eiger.odin.fan.ready
+        if acquire:
+
+            def become_ready():
+                if self._detector_armed:
+                    set_sim_value(fan_ready, 1)
+
+            self.schedule(self.latencies.fan_ready, become_ready)
+        else:
+            set_sim_value(fan_ready, 0)
+
+    def _mark_parameters_stale(self):
+        if self._stale_task is not None:
+            self._stale_task.cancel()
+        set_sim_value(self.eiger.stale_params, 1)
+        self._stale_task = self.schedule(
+            self.latencies.stale_parameters,
+            lambda: set_sim_value(self.eiger.stale_params, 0),
+        )
+
+    def inject_node_error(self, node_number: int, message: str):
+        node = self.eiger.odin.nodes[node_number]
+        set_sim_value(node.error_status, 1)
+        set_sim_value(node.error_message, message)
+
+    def acquire_frames(self, num_frames: int):
+        """Sends num_frames frames through the fan to the writers, round-robin."""
+        odin = self.eiger.odin
+        nodes = list(odin.nodes.values())
+        for _ in range(num_frames):
+            self._frames_sent += 1
+            set_sim_value(odin.fan.frames_sent, self._frames_sent)
+            node_number = (self._frames_sent - 1) % len(nodes)
+            if not self._writing:
+                continue
+            self._node_frames[node_number] += 1
+            set_sim_value(
+                nodes[node_number].num_captured, self._node_frames[node_number]
+            )
+            self._frames_captured += 1
+            set_sim_value(odin.file_writer.num_captured, self._frames_captured)
+            if self._num_capture and self._frames_captured == self._num_capture:
+                self.schedule(self.latencies.writer_close, self._stop_writing)
+
+
+async def make_simulated_eiger_async(
+    params: DetectorParams,
+    latencies: Optional[EigerSimLatencies] = None,
+    name: str = "sim_eiger_async",
+    num_odin_nodes: int = 4,
+) -> Tuple[EigerDetectorAsync, SimulatedEigerAsyncIOC]:
+    """Creates and connects an `EigerDetectorAsync` backed by a simulated IOC.
+
+    Args:
+        params (DetectorParams): The parameters to give the detector.
+        latencies (EigerSimLatencies, optional): The latencies to simulate.
+        name (str, optional): The name of the detector.
+        num_odin_nodes (int, optional): The number of Odin filewriter nodes.
+
+    Returns:
+        Tuple[EigerDetectorAsync, SimulatedEigerAsyncIOC]: The detector and its
+            simulated IOC.
+    """
+    eiger = EigerDetectorAsync.with_params(
+        params, name=name, prefix="SIM-EA-EIGER-01:", num_odin_nodes=num_odin_nodes
+    )
+    await eiger.connect(sim=True)
+    sim = SimulatedEigerAsyncIOC(eiger, latencies)
+    LOGGER.debug(f"Created simulated Eiger {name} with latencies {sim.latencies}")
+    return eiger, sim
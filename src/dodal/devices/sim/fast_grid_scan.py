@@ -0,0 +1,187 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from ophyd.sim import make_fake_device
+
+from dodal.devices.fast_grid_scan import FastGridScan, GridScanParams
+from dodal.devices.motors import XYZLimitBundle
+from dodal.devices.sim.eiger import _SimulatedIOC
+from dodal.log import LOGGER
+
+
+@dataclass
+class FastGridScanSimLatencies:
+    """The latencies, in seconds, modelled by the simulated fast grid scan IOC.
+
+    Attributes:
+        put: The time taken for the IOC to process any put.
+        overrides: Per-signal put latencies keyed by the dotted name of the signal
+            within the simulated device e.g. "dwell_time".
+        validate: How long the motion program takes to revalidate the scan after a
+            parameter changes.
+        start: How long the motion program takes to start after a run request.
+    """
+
+    put: float = 0.0
+    overrides: Dict[str, float] = field(default_factory=dict)
+    validate: float = 0.0
+    start: float = 0.0
+
+    def for_signal(self, dotted_name: str) -> float:
+        return self.overrides.get(dotted_name, self.put)
+
+
+class SimulatedFastGridScanIOC(_SimulatedIOC):
+    """Emulates the PMAC motion program behind a `FastGridScan` made with
+    `make_fake_device`.
+
+    The scan is revalidated against the motor limits whenever a parameter changes. A
+    run request on a valid scan moves through every frame of both grids at the
+    uploaded dwell time, driving `position_counter`, `x_counter` and `y_counter`,
+    with `status` high whilst the scan runs.
+    """
+
+    # Seconds per unit of the dwell time, which the motion program takes in ms
+    DWELL_TIME_UNITS: float = 1e-3
+
+    def __init__(
+        self,
+        fast_grid_scan: FastGridScan,
+        limits: Optional[XYZLimitBundle] = None,
+        latencies: Optional[FastGridScanSimLatencies] = None,
+    ):
+        super().__init__(fast_grid_scan, latencies or FastGridScanSimLatencies())
+        self.fast_grid_scan = fast_grid_scan
+        self.limits = limits
+        self.callback_time = 0.0
+        # When the last scan finished moving, from time.perf_counter
+        self.finished_at: Optional[float] = None
+        self._stop_requested = threading.Event()
+        self._motion: Optional[threading.Thread] = None
+
+        for name in FastGridScan.PARAMETER_NAMES:
+            self.on_put(getattr(fast_grid_scan, name), self._parameter_changed)
+        self.on_put(fast_grid_scan.run_cmd, self._run_requested)
+        self.on_put(fast_grid_scan.stop_cmd, lambda _: self._stop_requested.set())
+
+        self.reset()
+
+    def reset(self):
+        """Puts the simulated motion program into an idle state with the default
+        scan parameters."""
+        fgs = self.fast_grid_scan
+        defaults = GridScanParams()
+        for name in FastGridScan.PARAMETER_NAMES:
+            getattr(fgs, name).sim_put(getattr(defaults, name))
+        for signal in [fgs.position_counter, fgs.x_counter, fgs.y_counter, fgs.status]:
+            signal.sim_put(0)
+        self.finished_at = None
+        self._validate()
+
+    def current_params(self) -> GridScanParams:
+        """Gets the scan parameters as currently held by the motion program."""
+        return GridScanParams(
+            **{
+                name: getattr(self.fast_grid_scan, name).get()
+                for name in FastGridScan.PARAMETER_NAMES
+            }
+        )
+
+    def _validate(self):
+        valid = self.limits is None or self.current_params().is_valid(self.limits)
+        self.fast_grid_scan.scan_invalid.sim_put(0 if valid else 1)
+
+    def _parameter_changed(self, _):
+        self.schedule(self.latencies.validate, self._validate)
+
+    def _run_requested(self, value):
+        fgs = self.fast_grid_scan
+        if not value:
+            return
+        if fgs.status.get() == 1:
+            LOGGER.warning("Simulated grid scan already running, ignoring run")
+            return
+        if fgs.scan_invalid.get():
+            LOGGER.warning("Simulated grid scan is invalid, ignoring run")
+            return
+        self._stop_requested.clear()
+        self.schedule(self.latencies.start, self._start_motion)
+
+    def _start_motion(self):
+        self._motion = threading.Thread(
+            target=self._move, args=(self.current_params(),), daemon=True
+        )
+        self.fast_grid_scan.status.sim_put(1)
+        self._motion.start()
+
+    def _move(self, params: GridScanParams):
+        fgs = self.fast_grid_scan
+        x_steps = np.concatenate(
+            [
+                params.x_axis.snaked_steps(params.y_steps),
+                params.x_axis.snaked_steps(params.z_steps),
+            ]
+        ).tolist()
+        rows = np.concatenate(
+            [
+                np.repeat(np.arange(params.y_steps), params.x_steps),
+                np.repeat(np.arange(params.z_steps), params.x_steps),
+            ]
+        ).tolist()
+        period = params.dwell_time * self.DWELL_TIME_UNITS
+        self.callback_time = 0.0
+        start = time.monotonic()
+        for frame, (x_step, row) in enumerate(zip(x_steps, rows)):
+            if self._stop_requested.is_set():
+                break
+            if period:
+                delay = start + (frame + 1) * period - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            fgs.x_counter.sim_put(x_step)
+            fgs.y_counter.sim_put(row)
+            frame_posted = time.perf_counter()
+            fgs.position_counter.sim_put(frame + 1)
+            self.callback_time += time.perf_counter() - frame_posted
+        self.finished_at = time.perf_counter()
+        fgs.status.sim_put(0)
+
+    def wait_for_motion(self, timeout: Optional[float] = None):
+        """Waits for the current scan to finish moving."""
+        if self._motion is not None:
+            self._motion.join(timeout)
+            if self._motion.is_alive():
+                raise TimeoutError(f"Simulated grid scan did not finish in {timeout}s")
+
+    def close(self):
+        self._stop_requested.set()
+        super().close()
+
+
+def make_simulated_fast_grid_scan(
+    limits: Optional[XYZLimitBundle] = None,
+    latencies: Optional[FastGridScanSimLatencies] = None,
+    name: str = "sim_fgs",
+) -> Tuple[FastGridScan, SimulatedFastGridScanIOC]:
+    """Creates a fake `FastGridScan` backed by a simulated motion program.
+
+    Args:
+        limits (XYZLimitBundle, optional): The limits to validate scans against. If
+            not given every scan is valid.
+        latencies (FastGridScanSimLatencies, optional): The latencies to simulate.
+        name (str, optional): The name of the device.
+
+    Returns:
+        Tuple[FastGridScan, SimulatedFastGridScanIOC]: The device and its simulated
+            motion program.
+    """
+    FakeFastGridScan = make_fake_device(FastGridScan)
+    fast_grid_scan: FastGridScan = FakeFastGridScan("BL03S-MO-SGON-01:FGS:", name=name)
+    # Fake signals have no PV name, which is checked to see if the scan is validated
+    fast_grid_scan.scan_invalid.pvname = "BL03S-MO-SGON-01:FGS:SCAN_INVALID"
+    sim = SimulatedFastGridScanIOC(fast_grid_scan, limits, latencies)
+    LOGGER.debug(f"Created simulated grid scan {name} with latencies {sim.latencies}")
+    return fast_grid_scan, sim
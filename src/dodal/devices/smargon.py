@@ -1,3 +1,5 @@
+from typing import Optional
+
 from ophyd import Component as Cpt
 from ophyd import EpicsMotor, EpicsSignal
 from ophyd.epics_motor import MotorBundle
@@ -31,17 +33,22 @@ class Smargon(MotorBundle):
     real_phi: EpicsMotor = Cpt(EpicsMotor, "MOTOR_5")
     real_chi: EpicsMotor = Cpt(EpicsMotor, "MOTOR_6")
 
+    _xyz_limits: Optional[XYZLimitBundle] = None
+
     def get_xyz_limits(self) -> XYZLimitBundle:
         """Get the limits for the x, y and z axes.
 
         Note that these limits may not yet be valid until wait_for_connection is called
-        on this MotorBundle.
+        on this MotorBundle. The same bundle, which monitors the limits, is returned on
+        every call.
 
         Returns:
             XYZLimitBundle: The limits for the underlying motors.
         """
-        return XYZLimitBundle(
-            MotorLimitHelper(self.x),
-            MotorLimitHelper(self.y),
-            MotorLimitHelper(self.z),
-        )
+        if self._xyz_limits is None:
+            self._xyz_limits = XYZLimitBundle(
+                MotorLimitHelper(self.x),
+                MotorLimitHelper(self.y),
+                MotorLimitHelper(self.z),
+            )
+        return self._xyz_limits
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from enum import Enum, IntEnum
-from functools import partialmethod
-from typing import List
+from functools import partial, partialmethod
+from numbers import Integral, Number
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from ophyd import Component, Device, EpicsSignal, StatusBase
+import numpy as np
+from numpy import ndarray
+from ophyd import Component, Device, EpicsSignal, EpicsSignalRO, Signal, StatusBase
+from ophyd.status import Status
 
+from dodal.devices.device_executor import get_device_executor
 from dodal.devices.status import await_value
 from dodal.devices.utils import epics_signal_put_wait
 
@@ -195,17 +201,42 @@ class LogicGateConfigurer(Device):
         """
         gate: GateControl = self.all_gates[type][gate_number - 1]
 
-        gate.enable.put(boolean_array_to_integer([True] * len(config.sources)))
+        gate.enable.put(config.enable_value)
 
         # Input Source
-        for source_number, source_pv in enumerate(gate.sources):
-            try:
-                source_pv.put(config.sources[source_number])
-            except IndexError:
-                source_pv.put(self.DEFAULT_SOURCE_IF_GATE_NOT_USED)
+        for source_pv, source in zip(gate.sources, config.padded_sources):
+            source_pv.put(source)
 
         # Invert
-        gate.invert.put(boolean_array_to_integer(config.invert))
+        gate.invert.put(config.invert_value)
+
+    def apply_gate_configs(
+        self, configs: Dict[Tuple[GateType, int], LogicGateConfiguration]
+    ) -> StatusBase:
+        """Configures many gates on the Zebra, with the enable, sources and invert of
+        every gate written at once rather than one blocking put at a time as in
+        `apply_logic_gate_config`.
+
+        Args:
+            configs (Dict[Tuple[GateType, int], LogicGateConfiguration]): The
+                configuration for each gate, keyed by the type and number of the gate.
+
+        Returns:
+            StatusBase: A status that completes once every write has completed.
+        """
+        status = Status()
+        status.set_finished()
+        for (type, gate_number), config in configs.items():
+            gate: GateControl = self.all_gates[type][gate_number - 1]
+            status &= gate.enable.set(config.enable_value)
+
+            # Input Source
+            for source_pv, source in zip(gate.sources, config.padded_sources):
+                status &= source_pv.set(source)
+
+            # Invert
+            status &= gate.invert.set(config.invert_value)
+        return status
 
     apply_and_gate_config = partialmethod(apply_logic_gate_config, GateType.AND)
     apply_or_gate_config = partialmethod(apply_logic_gate_config, GateType.OR)
@@ -239,6 +270,24 @@ class LogicGateConfiguration:
         self.invert.append(invert)
         return self
 
+    @property
+    def enable_value(self) -> int:
+        """The value of the gate enable PV, enabling each configured input."""
+        return boolean_array_to_integer([True] * len(self.sources))
+
+    @property
+    def padded_sources(self) -> List[int]:
+        """The source of every input of the gate, including those not used."""
+        unused = [LogicGateConfigurer.DEFAULT_SOURCE_IF_GATE_NOT_USED] * (
+            self.NUMBER_OF_INPUTS - len(self.sources)
+        )
+        return self.sources + unused
+
+    @property
+    def invert_value(self) -> int:
+        """The value of the gate invert PV."""
+        return boolean_array_to_integer(self.invert)
+
     def __str__(self) -> str:
         input_strings = []
         for input, (source, invert) in enumerate(zip(self.sources, self.invert)):
@@ -247,6 +296,82 @@ class LogicGateConfiguration:
         return ", ".join(input_strings)
 
 
+class ZebraConfiguration:
+    """A declarative description of Zebra settings, which can be applied as one
+    operation with `Zebra.apply_configuration`.
+
+    Settings are keyed by the dotted name of the signal within the `Zebra` e.g.
+    "pc.gate_start" or "output.out_1".
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        self.settings: Dict[str, Any] = dict(settings or {})
+
+    def with_setting(self, signal_name: str, value: Any) -> ZebraConfiguration:
+        """Add a setting to the configuration, replacing any existing value.
+
+        Args:
+            signal_name (str): The dotted name of the signal within the Zebra.
+            value (Any): The value to set it to.
+
+        Returns:
+            ZebraConfiguration: This configuration.
+        """
+        self.settings[signal_name] = value
+        return self
+
+    def with_output(self, ttl: int, source: int) -> ZebraConfiguration:
+        """Add a TTL output of the Zebra, see `ZebraOutputPanel.out_pvs`."""
+        assert 1 <= ttl <= 4
+        return self.with_setting(f"output.out_{ttl}", source)
+
+    def with_logic_gate(
+        self, type: GateType, gate_number: int, config: LogicGateConfiguration
+    ) -> ZebraConfiguration:
+        """Add the configuration of a logic gate, as would be applied by
+        `LogicGateConfigurer.apply_logic_gate_config`."""
+        assert 1 <= gate_number <= 4
+        gate = f"logic_gates.{type.value.lower()}_gate_{gate_number}"
+        self.with_setting(f"{gate}.enable", config.enable_value)
+        for source_number, source in enumerate(config.padded_sources, start=1):
+            self.with_setting(f"{gate}.source_{source_number}", source)
+        return self.with_setting(f"{gate}.invert", config.invert_value)
+
+    def __str__(self) -> str:
+        return ", ".join(f"{name}={value}" for name, value in self.settings.items())
+
+
+def settings_equal(
+    current: Any, demand: Any, enum_strs: Optional[Sequence[str]] = None
+) -> bool:
+    """Compares a readback with a demanded setting of a `ZebraConfiguration`.
+
+    Enum readbacks may be ints, which are compared as the matching string of
+    enum_strs if the demand is a string, or members of an Enum, which are compared
+    by their value. Numbers are compared to within `Zebra.SETTING_TOLERANCE`.
+
+    Args:
+        current (Any): The current value of the setting.
+        demand (Any): The demanded value of the setting.
+        enum_strs (Optional[Sequence[str]]): The choices of an enum setting.
+
+    Returns:
+        bool: True if the setting does not need to be written.
+    """
+    if isinstance(current, Enum) and not isinstance(current, Integral):
+        current = current.value
+    elif (
+        isinstance(demand, str)
+        and isinstance(current, Integral)
+        and enum_strs
+        and 0 <= current < len(enum_strs)
+    ):
+        current = enum_strs[current]
+    if isinstance(current, Number) and isinstance(demand, Number):
+        return bool(np.isclose(current, demand, rtol=0, atol=Zebra.SETTING_TOLERANCE))
+    return current == demand
+
+
 class SoftInputs(Device):
     soft_in_1: EpicsSignal = Component(EpicsSignal, "SOFT_IN:B0")
     soft_in_2: EpicsSignal = Component(EpicsSignal, "SOFT_IN:B1")
@@ -254,8 +379,238 @@ class SoftInputs(Device):
     soft_in_4: EpicsSignal = Component(EpicsSignal, "SOFT_IN:B3")
 
 
+@dataclass
+class PositionCompareCaptureData:
+    """Points captured by the Zebra during a position compare acquisition.
+
+    Attributes:
+        first_point: The index of the first of these points in the acquisition.
+        time: The time of each point, in the units of the position compare timestamps.
+        encoders: An (N, 4) array of the position of each encoder at each point.
+    """
+
+    first_point: int
+    time: ndarray
+    encoders: ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def positions(self, axis: Union[I03Axes, I24Axes]) -> ndarray:
+        """Gives the captured positions of the encoder for an axis e.g. I03Axes.OMEGA"""
+        return self.encoders[:, int(axis.value[-1]) - 1]
+
+
+class PositionCompareCapture(Device):
+    """The encoder positions and times captured by the Zebra on each position compare
+    pulse. These are downloaded from the Zebra into the waveforms as the acquisition
+    runs, so can be read in full at the end or streamed whilst it runs.
+    """
+
+    capture_select: EpicsSignal = epics_signal_put_wait("PC_BIT_CAP")
+    num_captured: EpicsSignalRO = Component(EpicsSignalRO, "PC_NUM_CAP")
+    num_downloaded: EpicsSignalRO = Component(EpicsSignalRO, "PC_NUM_DOWN")
+
+    time: EpicsSignalRO = Component(EpicsSignalRO, "PC_TIME")
+    enc_1: EpicsSignalRO = Component(EpicsSignalRO, "PC_ENC1")
+    enc_2: EpicsSignalRO = Component(EpicsSignalRO, "PC_ENC2")
+    enc_3: EpicsSignalRO = Component(EpicsSignalRO, "PC_ENC3")
+    enc_4: EpicsSignalRO = Component(EpicsSignalRO, "PC_ENC4")
+
+    @property
+    def encoders(self) -> List[EpicsSignalRO]:
+        return [self.enc_1, self.enc_2, self.enc_3, self.enc_4]
+
+    def _read_points(
+        self, first_point: int, end_point: int
+    ) -> PositionCompareCaptureData:
+        num_captured, time, *encoders = get_device_executor().map(
+            lambda signal: signal.get(),
+            [self.num_captured, self.time, *self.encoders],
+            task_name=f"read {self.name} points",
+        )
+        # The waveforms may still hold points of a previous acquisition
+        end_point = min(end_point, int(num_captured))
+
+        def points(waveform) -> ndarray:
+            return np.asarray(waveform, dtype=float)[first_point:end_point]
+
+        return PositionCompareCaptureData(
+            first_point,
+            points(time),
+            np.column_stack([points(encoder) for encoder in encoders]),
+        )
+
+    def read_captured(self) -> PositionCompareCaptureData:
+        """Reads every point downloaded from the Zebra so far.
+
+        Returns:
+            PositionCompareCaptureData: The time and encoder positions of each point.
+        """
+        return self._read_points(0, int(self.num_downloaded.get()))
+
+    def stream(
+        self, callback: Callable[[PositionCompareCaptureData], None]
+    ) -> Callable[[], None]:
+        """Streams points as they are downloaded from the Zebra, so that long
+        acquisitions can be processed whilst they run.
+
+        Args:
+            callback (Callable[[PositionCompareCaptureData], None]): Called with each
+                block of new points. If the Zebra is rearmed the points of the new
+                acquisition are streamed from the start.
+
+        Returns:
+            Callable[[], None]: A function that stops the streaming.
+        """
+        streamed = 0
+
+        def points_downloaded(value=None, **kwargs):
+            nonlocal streamed
+            if value is None:
+                return
+            downloaded = int(value)
+            if downloaded < streamed:
+                streamed = 0
+            if downloaded > streamed:
+                points = self._read_points(streamed, downloaded)
+                # The waveforms may not have caught up with the count yet
+                streamed += len(points)
+                if len(points):
+                    callback(points)
+
+        subscription = self.num_downloaded.subscribe(points_downloaded, run=False)
+        return lambda: self.num_downloaded.unsubscribe(subscription)
+
+
 class Zebra(Device):
+    class ConfigurationSignal(Signal):
+        def set(self, value, *, timeout=None, settle_time=None, **kwargs):
+            return self.parent.apply_configuration(value)
+
     pc: PositionCompare = Component(PositionCompare, "")
     output: ZebraOutputPanel = Component(ZebraOutputPanel, "")
     inputs: SoftInputs = Component(SoftInputs, "")
     logic_gates: LogicGateConfigurer = Component(LogicGateConfigurer, "")
+    capture: PositionCompareCapture = Component(PositionCompareCapture, "")
+
+    configuration: ConfigurationSignal = Component(ConfigurationSignal)
+
+    # Settings that are not part of a snapshot as they are commands or state
+    NOT_IN_SNAPSHOT = ["pc.reset", "pc.arm"]
+
+    # Timeout in seconds for all the writes of a configuration to complete
+    CONFIGURATION_TIMEOUT: float = 30.0
+
+    # Numeric readbacks within this of a new setting are considered unchanged
+    SETTING_TOLERANCE: float = 1e-9
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._readbacks: Dict[str, Any] = {}
+
+    def _update_readback(self, name: str, value=None, **kwargs):
+        self._readbacks[name] = value
+
+    def _monitor_readback(self, name: str):
+        if name not in self._readbacks:
+            self._readbacks[name] = None
+            signal: Signal = getattr(self, name)
+            signal.subscribe(partial(self._update_readback, name))
+
+    def cached_readback(self, name: str) -> Any:
+        """Gets the readback of a setting, monitoring it from the first time it is
+        needed so that it is only read from EPICS once.
+
+        Args:
+            name (str): The dotted name of the signal within the Zebra.
+        """
+        self._monitor_readback(name)
+        if self._readbacks[name] is None:
+            self._readbacks[name] = getattr(self, name).get()
+        return self._readbacks[name]
+
+    def changed_settings(self, config: ZebraConfiguration) -> Dict[str, Any]:
+        """Gives the settings of a configuration that differ from the current readbacks.
+
+        Args:
+            config (ZebraConfiguration): The configuration to compare against.
+
+        Returns:
+            Dict[str, Any]: The dotted names and new values of the changed settings.
+        """
+        return {
+            name: value
+            for name, value in config.settings.items()
+            if not settings_equal(
+                self.cached_readback(name), value, getattr(self, name).enum_strs
+            )
+        }
+
+    def apply_configuration(self, config: ZebraConfiguration) -> StatusBase:
+        """Writes only the settings of a configuration that have changed, with all of
+        the writes made at once.
+
+        Args:
+            config (ZebraConfiguration): The configuration to apply.
+
+        Returns:
+            StatusBase: A status that completes once every write has completed.
+        """
+        changed = self.changed_settings(config)
+        self.log.debug(f"Applying changed Zebra settings {changed}")
+        status = Status()
+        status.set_finished()
+        for name, value in changed.items():
+            status &= getattr(self, name).set(value, timeout=self.CONFIGURATION_TIMEOUT)
+        return status
+
+    def snapshot_signal_names(self) -> List[str]:
+        """Gives the dotted names of every setting captured by `snapshot`."""
+        names = []
+        for device_name in ["pc", "output", "logic_gates", "inputs"]:
+            for walk in getattr(self, device_name).walk_signals():
+                name = f"{device_name}.{walk.dotted_name}"
+                if not any(
+                    name == excluded or name.startswith(f"{excluded}.")
+                    for excluded in self.NOT_IN_SNAPSHOT
+                ):
+                    names.append(name)
+        return names
+
+    def snapshot(self) -> ZebraConfiguration:
+        """Captures the full configuration of the Zebra: position compare, outputs,
+        logic gates and soft inputs.
+
+        Monitors are started on every setting, any settings that the monitors have not
+        yet given a value for are then read from EPICS in parallel on the device
+        executor. After the first snapshot the monitored readbacks are used.
+
+        Returns:
+            ZebraConfiguration: The current configuration, which can be given to
+                `restore`.
+        """
+        names = self.snapshot_signal_names()
+        for name in names:
+            self._monitor_readback(name)
+        unread = [name for name in names if self._readbacks[name] is None]
+        values = get_device_executor().map(
+            lambda name: getattr(self, name).get(),
+            unread,
+            task_name=f"read {self.name} settings",
+        )
+        for name, value in zip(unread, values):
+            self._readbacks[name] = value
+        return ZebraConfiguration({name: self.cached_readback(name) for name in names})
+
+    def restore(self, snapshot: ZebraConfiguration) -> StatusBase:
+        """Restores a configuration captured by `snapshot`, writing only the settings
+        that differ from the current state.
+
+        Args:
+            snapshot (ZebraConfiguration): The configuration to restore.
+
+        Returns:
+            StatusBase: A status that completes once every write has completed.
+        """
+        return self.apply_configuration(snapshot)
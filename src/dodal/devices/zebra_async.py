@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+from functools import partialmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ophyd.v2.core import AsyncStatus, Device, Signal, SignalRW, wait_for_value
+from ophyd.v2.epics import epics_signal_r, epics_signal_rw, epics_signal_x
+
+from dodal.devices.zebra import (
+    ArmDemand,
+    GateType,
+    LogicGateConfiguration,
+    ZebraConfiguration,
+    settings_equal,
+)
+from dodal.log import LOGGER
+
+
+class ArmingDeviceAsync(Device):
+    """An ophyd v2 version of `ArmingDevice`, `set(ArmDemand.ARM)` completes once the
+    Zebra reports that it is armed."""
+
+    TIMEOUT = 3
+
+    def __init__(self, prefix: str, name: str = ""):
+        self.arm_set = epics_signal_rw(int, prefix + "PC_ARM")
+        self.disarm_set = epics_signal_rw(int, prefix + "PC_DISARM")
+        self.armed = epics_signal_r(int, prefix + "PC_ARM_OUT")
+        super().__init__(name)
+
+    def set(self, demand: ArmDemand) -> AsyncStatus:
+        return AsyncStatus(asyncio.wait_for(self._set(demand), self.TIMEOUT))
+
+    async def _set(self, demand: ArmDemand):
+        signal_to_set = self.arm_set if demand == ArmDemand.ARM else self.disarm_set
+        await asyncio.gather(
+            wait_for_value(self.armed, demand.value, None), signal_to_set.set(1)
+        )
+
+
+class PositionCompareAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.num_gates = epics_signal_rw(int, prefix + "PC_GATE_NGATE")
+        self.gate_trigger = epics_signal_rw(str, prefix + "PC_ENC")
+        self.gate_source = epics_signal_rw(int, prefix + "PC_GATE_SEL")
+        self.gate_input = epics_signal_rw(int, prefix + "PC_GATE_INP")
+        self.gate_width = epics_signal_rw(float, prefix + "PC_GATE_WID")
+        self.gate_start = epics_signal_rw(float, prefix + "PC_GATE_START")
+
+        self.pulse_source = epics_signal_rw(int, prefix + "PC_PULSE_SEL")
+        self.pulse_input = epics_signal_rw(int, prefix + "PC_PULSE_INP")
+        self.pulse_start = epics_signal_rw(float, prefix + "PC_PULSE_START")
+        self.pulse_width = epics_signal_rw(float, prefix + "PC_PULSE_WID")
+        self.pulse_step = epics_signal_rw(float, prefix + "PC_PULSE_STEP")
+
+        self.dir = epics_signal_rw(int, prefix + "PC_DIR")
+        self.arm_source = epics_signal_rw(str, prefix + "PC_ARM_SEL")
+        self.reset = epics_signal_x(prefix + "SYS_RESET.PROC")
+
+        self.arm = ArmingDeviceAsync(prefix)
+        super().__init__(name)
+
+    async def is_armed(self) -> bool:
+        return await self.arm.armed.get_value() == 1
+
+
+class ZebraOutputPanelAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.pulse_1_input = epics_signal_rw(int, prefix + "PULSE1_INP")
+
+        self.out_1 = epics_signal_rw(int, prefix + "OUT1_TTL")
+        self.out_2 = epics_signal_rw(int, prefix + "OUT2_TTL")
+        self.out_3 = epics_signal_rw(int, prefix + "OUT3_TTL")
+        self.out_4 = epics_signal_rw(int, prefix + "OUT4_TTL")
+        super().__init__(name)
+
+    @property
+    def out_pvs(self) -> List[Optional[SignalRW[int]]]:
+        """A list of all the output TTL PVs. Note that as the PVs are 1 indexed
+        `out_pvs[0]` is `None`.
+        """
+        return [None, self.out_1, self.out_2, self.out_3, self.out_4]
+
+
+class GateControlAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.enable = epics_signal_rw(int, prefix + "_ENA")
+        self.source_1 = epics_signal_rw(int, prefix + "_INP1")
+        self.source_2 = epics_signal_rw(int, prefix + "_INP2")
+        self.source_3 = epics_signal_rw(int, prefix + "_INP3")
+        self.source_4 = epics_signal_rw(int, prefix + "_INP4")
+        self.invert = epics_signal_rw(int, prefix + "_INV")
+        super().__init__(name)
+
+    @property
+    def sources(self) -> List[SignalRW[int]]:
+        return [self.source_1, self.source_2, self.source_3, self.source_4]
+
+
+class LogicGateConfigurerAsync(Device):
+    """An ophyd v2 version of `LogicGateConfigurer`, which takes the same
+    `LogicGateConfiguration`s."""
+
+    def __init__(self, prefix: str, name: str = ""):
+        self.and_gate_1 = GateControlAsync(prefix + "AND1")
+        self.and_gate_2 = GateControlAsync(prefix + "AND2")
+        self.and_gate_3 = GateControlAsync(prefix + "AND3")
+        self.and_gate_4 = GateControlAsync(prefix + "AND4")
+
+        self.or_gate_1 = GateControlAsync(prefix + "OR1")
+        self.or_gate_2 = GateControlAsync(prefix + "OR2")
+        self.or_gate_3 = GateControlAsync(prefix + "OR3")
+        self.or_gate_4 = GateControlAsync(prefix + "OR4")
+        super().__init__(name)
+
+        self.all_gates = {
+            GateType.AND: [
+                self.and_gate_1,
+                self.and_gate_2,
+                self.and_gate_3,
+                self.and_gate_4,
+            ],
+            GateType.OR: [
+                self.or_gate_1,
+                self.or_gate_2,
+                self.or_gate_3,
+                self.or_gate_4,
+            ],
+        }
+
+    def apply_logic_gate_config(
+        self, type: GateType, gate_number: int, config: LogicGateConfiguration
+    ) -> AsyncStatus:
+        """Uses the specified `LogicGateConfiguration` to configure a gate on the Zebra.
+
+        Args:
+            type (GateType): The type of gate e.g. AND/OR
+            gate_number (int): Which gate to configure.
+            config (LogicGateConfiguration): A configuration for the gate.
+        """
+        return self.apply_gate_configs({(type, gate_number): config})
+
+    def apply_gate_configs(
+        self, configs: Dict[Tuple[GateType, int], LogicGateConfiguration]
+    ) -> AsyncStatus:
+        """Configures many gates on the Zebra, with the enable, sources and invert of
+        every gate written concurrently.
+
+        Args:
+            configs (Dict[Tuple[GateType, int], LogicGateConfiguration]): The
+                configuration for each gate, keyed by the type and number of the gate.
+        """
+        return AsyncStatus(self._apply_gate_configs(configs))
+
+    async def _apply_gate_configs(
+        self, configs: Dict[Tuple[GateType, int], LogicGateConfiguration]
+    ):
+        writes = []
+        for (type, gate_number), config in configs.items():
+            gate: GateControlAsync = self.all_gates[type][gate_number - 1]
+            writes.append(gate.enable.set(config.enable_value))
+            for source_pv, source in zip(gate.sources, config.padded_sources):
+                writes.append(source_pv.set(source))
+            writes.append(gate.invert.set(config.invert_value))
+        await asyncio.gather(*writes)
+
+    apply_and_gate_config = partialmethod(apply_logic_gate_config, GateType.AND)
+    apply_or_gate_config = partialmethod(apply_logic_gate_config, GateType.OR)
+
+
+class SoftInputsAsync(Device):
+    def __init__(self, prefix: str, name: str = ""):
+        self.soft_in_1 = epics_signal_rw(int, prefix + "SOFT_IN:B0")
+        self.soft_in_2 = epics_signal_rw(int, prefix + "SOFT_IN:B1")
+        self.soft_in_3 = epics_signal_rw(int, prefix + "SOFT_IN:B2")
+        self.soft_in_4 = epics_signal_rw(int, prefix + "SOFT_IN:B3")
+        super().__init__(name)
+
+
+class ZebraAsync(Device):
+    """An ophyd v2 version of `Zebra`.
+
+    `configure` applies a `ZebraConfiguration`, reading the current settings and
+    writing those that have changed concurrently, and `arm` arms or disarms the
+    position compare. Both return statuses that can be awaited alongside other
+    devices e.g. whilst the detector arms.
+    """
+
+    # Timeout in seconds for all the writes of a configuration to complete
+    CONFIGURATION_TIMEOUT: float = 30.0
+
+    def __init__(self, prefix: str, name: str = ""):
+        self.pc = PositionCompareAsync(prefix)
+        self.output = ZebraOutputPanelAsync(prefix)
+        self.inputs = SoftInputsAsync(prefix)
+        self.logic_gates = LogicGateConfigurerAsync(prefix)
+        super().__init__(name)
+
+    def _signal(self, name: str) -> SignalRW:
+        signal: Any = self
+        for attr in name.split("."):
+            signal = getattr(signal, attr)
+        assert isinstance(signal, Signal), f"{name} is not a signal of the Zebra"
+        return signal
+
+    async def changed_settings(self, config: ZebraConfiguration) -> Dict[str, Any]:
+        """Gives the settings of a configuration that differ from the current values,
+        which are all read concurrently along with the choices of any setting that is
+        demanded as a string.
+
+        Args:
+            config (ZebraConfiguration): The configuration to compare against.
+
+        Returns:
+            Dict[str, Any]: The dotted names and new values of the changed settings.
+        """
+        names = list(config.settings)
+        current, choices = await asyncio.gather(
+            asyncio.gather(*(self._signal(name).get_value() for name in names)),
+            asyncio.gather(*(self._enum_choices(name, config) for name in names)),
+        )
+        return {
+            name: config.settings[name]
+            for name, value, enum_strs in zip(names, current, choices)
+            if not settings_equal(value, config.settings[name], enum_strs)
+        }
+
+    async def _enum_choices(
+        self, name: str, config: ZebraConfiguration
+    ) -> Optional[Sequence[str]]:
+        if not isinstance(config.settings[name], str):
+            return None
+        signal = self._signal(name)
+        description = await signal.describe()
+        return description[signal.name].get("choices")
+
+    def configure(self, config: ZebraConfiguration) -> AsyncStatus:
+        """Writes the settings of a configuration that have changed, completing once
+        every write has completed."""
+        return AsyncStatus(
+            asyncio.wait_for(self._configure(config), self.CONFIGURATION_TIMEOUT)
+        )
+
+    async def _configure(self, config: ZebraConfiguration):
+        changed = await self.changed_settings(config)
+        LOGGER.debug(f"Applying changed Zebra settings {changed}")
+        await asyncio.gather(
+            *(self._signal(name).set(value) for name, value in changed.items())
+        )
+
+    def arm(self, demand: ArmDemand = ArmDemand.ARM) -> AsyncStatus:
+        """Arms or disarms the position compare, see `ArmingDeviceAsync`."""
+        return self.pc.arm.set(demand)
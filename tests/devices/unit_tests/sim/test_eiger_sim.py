@@ -0,0 +1,189 @@
+from contextlib import ExitStack
+from typing import Tuple
+from unittest.mock import patch
+
+import pytest
+
+from dodal.devices.det_dim_constants import constants_from_type
+from dodal.devices.det_dist_to_beam_converter import DetectorDistanceToBeamXYConverter
+from dodal.devices.eiger import EigerDetector
+from dodal.devices.sim import (
+    EigerSimLatencies,
+    SimulatedEigerIOC,
+    benchmark_consecutive_collections,
+    benchmark_detector_params_copies,
+    benchmark_eiger,
+    format_report,
+    make_simulated_eiger,
+)
+from dodal.devices.status import await_value
+
+from ..test_eiger import create_new_params
+
+TEST_LATENCIES = EigerSimLatencies(
+    put=0.001,
+    threshold_change=0.02,
+    stale_parameters=0.01,
+    odin_file_name=0.005,
+    odin_writer_start=0.005,
+    fan_ready=0.01,
+    writer_close=0.005,
+)
+
+
+@pytest.fixture
+def sim_eiger():
+    eiger, sim = make_simulated_eiger(create_new_params(), TEST_LATENCIES)
+    yield eiger, sim
+    sim.close()
+
+
+def test_given_cam_parameter_written_then_stale_parameters_high_until_processed(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, _ = sim_eiger
+    eiger.cam.acquire_time.set(0.5).wait(1)
+    assert eiger.stale_params.get() == 1
+    await_value(eiger.stale_params, 0).wait(1)
+
+
+def test_given_file_name_written_then_meta_and_writer_id_follow(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, _ = sim_eiger
+    eiger.odin.file_writer.file_name.set("new_file").wait(1)
+    (
+        await_value(eiger.odin.meta.file_name, "new_file")
+        & await_value(eiger.odin.file_writer.id, "new_file")
+    ).wait(1)
+
+
+def test_given_latency_override_then_set_takes_at_least_that_long(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, sim = sim_eiger
+    sim.latencies.overrides["cam.omega_start"] = 0.1
+    status = eiger.cam.omega_start.set(10)
+    assert not status.done
+    status.wait(1)
+    assert eiger.cam.omega_start.get() == 10
+
+
+def test_given_writing_when_frames_acquired_then_spread_across_nodes_and_writers_finish(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, sim = sim_eiger
+    eiger.odin.file_writer.num_capture.set(10).wait(1)
+    eiger.odin.file_writer.capture.set(1).wait(1)
+    await_value(eiger.odin.meta.ready, 1).wait(1)
+
+    sim.acquire_frames(10)
+
+    assert eiger.odin.file_writer.num_captured.get() == 10
+    assert [node.num_captured.get() for node in eiger.odin.nodes.nodes] == [3, 3, 2, 2]
+    eiger.odin.create_finished_status().wait(1)
+    assert not eiger.odin.nodes.check_frames_dropped()[0]
+
+
+def test_given_not_writing_when_frames_acquired_then_frames_dropped(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, sim = sim_eiger
+    sim.acquire_frames(4)
+
+    assert eiger.odin.file_writer.num_captured.get() == 0
+    assert eiger.odin.nodes.check_frames_dropped()[0]
+
+
+def test_given_node_error_injected_then_odin_not_initialised_until_cleared(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, sim = sim_eiger
+    sim.odin.inject_node_error(2, "Bad things")
+
+    is_initialised, message = eiger.odin.check_odin_initialised()
+    assert not is_initialised
+    assert "Bad things" in message
+
+    eiger.odin.nodes.clear_odin_errors()
+    sim.settle()
+    assert eiger.odin.check_odin_initialised() == (True, "")
+
+
+def test_simulated_eiger_can_be_armed_and_unstaged(
+    sim_eiger: Tuple[EigerDetector, SimulatedEigerIOC],
+):
+    eiger, sim = sim_eiger
+    eiger.stage()
+    assert eiger.is_armed()
+
+    sim.acquire_frames(eiger.detector_params.full_number_of_images)
+    assert eiger.unstage()
+    sim.settle()
+    assert not eiger.is_armed()
+
+
+def test_benchmark_reports_timings_no_faster_than_simulated_latencies():
+    results = benchmark_eiger(create_new_params(), TEST_LATENCIES, repeats=2)
+
+    assert list(results.keys()) == ["arm", "unstage", "stage", "stop"]
+    minimum_arm_time = (
+        TEST_LATENCIES.stale_parameters
+        + TEST_LATENCIES.odin_writer_start
+        + TEST_LATENCIES.fan_ready
+    )
+    assert results["arm"].min >= minimum_arm_time
+    assert results["stage"].min >= minimum_arm_time
+    assert all(len(result.samples) == 2 for result in results.values())
+
+    report = format_report(results)
+    for name in results:
+        assert name in report
+
+
+def test_keeping_detector_armed_skips_full_arming_for_consecutive_collections():
+    arming_steps = [
+        "set_cam_pvs",
+        "set_mx_settings_pvs",
+        "_threshold_change_for_arming",
+    ]
+    calls = {}
+    for keep_armed in [False, True]:
+        with ExitStack() as stack:
+            mocks = [
+                stack.enter_context(
+                    patch.object(
+                        EigerDetector,
+                        step,
+                        autospec=True,
+                        side_effect=getattr(EigerDetector, step),
+                    )
+                )
+                for step in arming_steps
+            ]
+            benchmark_consecutive_collections(
+                create_new_params(), num_collections=3, keep_armed=keep_armed
+            )
+        calls[keep_armed] = [mock.call_count for mock in mocks]
+
+    assert calls[False] == [3, 3, 3]
+    assert calls[True] == [1, 1, 1]
+
+
+def test_evolving_detector_params_does_not_rebuild_sub_objects_unlike_constructing():
+    params = create_new_params()
+    with patch(
+        "dodal.devices.detector.DetectorDistanceToBeamXYConverter",
+        wraps=DetectorDistanceToBeamXYConverter,
+    ) as converter, patch(
+        "dodal.devices.detector.constants_from_type", wraps=constants_from_type
+    ) as size_constants:
+        results = benchmark_detector_params_copies(
+            params, repeats=1, copies_per_repeat=2
+        )
+
+    # Each construction builds both sub-objects, each evolve reuses them
+    assert converter.call_count == 2
+    assert size_constants.call_count == 2
+    assert len(results["evolve"].samples) == 1
+    assert "evolve" in format_report(results)
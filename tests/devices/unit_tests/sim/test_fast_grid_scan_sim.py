@@ -0,0 +1,115 @@
+from typing import Tuple
+
+import pytest
+
+from dodal.devices.fast_grid_scan import FastGridScan, GridScanParams
+from dodal.devices.sim import (
+    BENCHMARK_GRIDS,
+    FastGridScanSimLatencies,
+    SimulatedFastGridScanIOC,
+    benchmark_fast_grid_scan,
+    format_report,
+    make_simulated_fast_grid_scan,
+)
+from dodal.devices.status import await_value
+
+from ..test_gridscan import create_motor_bundle_with_limits
+
+
+@pytest.fixture
+def sim_fast_grid_scan():
+    limits = create_motor_bundle_with_limits(0.0, 10.0).get_xyz_limits()
+    fast_grid_scan, sim = make_simulated_fast_grid_scan(
+        limits, FastGridScanSimLatencies(put=0.001, validate=0.01)
+    )
+    yield fast_grid_scan, sim
+    sim.close()
+
+
+def test_given_parameters_outside_limits_then_scan_invalid_until_back_in_limits(
+    sim_fast_grid_scan: Tuple[FastGridScan, SimulatedFastGridScanIOC],
+):
+    fast_grid_scan, _ = sim_fast_grid_scan
+    assert fast_grid_scan.scan_invalid.get() == 0
+
+    fast_grid_scan.x_start.set(20).wait(1)
+    await_value(fast_grid_scan.scan_invalid, 1).wait(1)
+
+    fast_grid_scan.x_start.set(1).wait(1)
+    await_value(fast_grid_scan.scan_invalid, 0).wait(1)
+
+
+def test_when_scan_run_then_counters_driven_through_both_grids(
+    sim_fast_grid_scan: Tuple[FastGridScan, SimulatedFastGridScanIOC],
+):
+    fast_grid_scan, _ = sim_fast_grid_scan
+    params = GridScanParams(x_steps=3, y_steps=2, z_steps=3, dwell_time=1)
+    fast_grid_scan.upload_params.set(params).wait(1)
+    positions = []
+    fast_grid_scan.position_counter.subscribe(
+        lambda value, **_: positions.append(value), run=False
+    )
+
+    complete = fast_grid_scan.complete()
+    fast_grid_scan.kickoff().wait(1)
+    complete.wait(1)
+
+    assert positions == list(range(1, params.get_num_images() + 1))
+    assert fast_grid_scan.x_counter.get() == 2
+    assert fast_grid_scan.y_counter.get() == 2
+    assert fast_grid_scan.status.get() == 0
+
+
+def test_given_scan_invalid_then_run_ignored_and_kickoff_times_out(
+    sim_fast_grid_scan: Tuple[FastGridScan, SimulatedFastGridScanIOC],
+):
+    fast_grid_scan, _ = sim_fast_grid_scan
+    fast_grid_scan.x_start.set(20).wait(1)
+    await_value(fast_grid_scan.scan_invalid, 1).wait(1)
+    fast_grid_scan.KICKOFF_TIMEOUT = 0.1
+
+    with pytest.raises(TimeoutError):
+        fast_grid_scan.kickoff().wait(1)
+    assert fast_grid_scan.status.get() == 0
+
+
+def test_when_stopped_then_scan_finishes_early(
+    sim_fast_grid_scan: Tuple[FastGridScan, SimulatedFastGridScanIOC],
+):
+    fast_grid_scan, _ = sim_fast_grid_scan
+    fast_grid_scan.upload_params.set(
+        GridScanParams(x_steps=100, y_steps=100, dwell_time=1)
+    ).wait(1)
+    complete = fast_grid_scan.complete()
+    fast_grid_scan.kickoff().wait(1)
+
+    fast_grid_scan.stop_cmd.put(1)
+    complete.wait(1)
+
+    assert fast_grid_scan.position_counter.get() < 10000
+
+
+def test_when_reset_then_finish_of_previous_scan_forgotten(
+    sim_fast_grid_scan: Tuple[FastGridScan, SimulatedFastGridScanIOC],
+):
+    fast_grid_scan, sim = sim_fast_grid_scan
+    fast_grid_scan.upload_params.set(GridScanParams(x_steps=2, y_steps=2)).wait(1)
+    complete = fast_grid_scan.complete()
+    fast_grid_scan.kickoff().wait(1)
+    complete.wait(1)
+    sim.wait_for_motion(1)
+    assert sim.finished_at is not None
+
+    sim.reset()
+
+    assert sim.finished_at is None
+
+
+def test_fast_grid_scan_benchmark_times_each_operation():
+    results = benchmark_fast_grid_scan(BENCHMARK_GRIDS["2d_1k"], repeats=2)
+
+    assert set(results) == {"upload", "kickoff", "scan", "callbacks", "completion"}
+    for result in results.values():
+        assert len(result.samples) == 2
+    assert results["callbacks"].max < results["scan"].max
+    assert "completion" in format_report(results)
@@ -1,9 +1,14 @@
+import os
+import shutil
+
+import numpy as np
 import pytest
-from mockito import when
+from mockito import unstub, when
 
 from dodal.devices.det_dist_to_beam_converter import (
     Axis,
     DetectorDistanceToBeamXYConverter,
+    load_lookup_table,
 )
 
 LOOKUP_TABLE_TEST_VALUES = [(100.0, 200.0), (150.0, 151.0), (160.0, 165.0)]
@@ -14,7 +19,8 @@ def fake_converter() -> DetectorDistanceToBeamXYConverter:
     when(DetectorDistanceToBeamXYConverter).parse_table().thenReturn(
         LOOKUP_TABLE_TEST_VALUES
     )
-    return DetectorDistanceToBeamXYConverter("test.txt")
+    yield DetectorDistanceToBeamXYConverter("test.txt")
+    unstub()
 
 
 def test_converter_eq():
@@ -27,12 +33,11 @@ def test_converter_eq():
     assert test_converter == test_converter_dupe
     assert test_converter != test_converter_2
 
-    previous_value = test_converter_dupe.lookup_table_values[0]
-    test_converter_dupe.lookup_table_values[0] = (7.5, 23.5)
-
-    assert test_converter != test_converter_2
+    modified_values = test_converter_dupe.lookup_table_values.copy()
+    modified_values[0] = (7.5, 23.5)
+    test_converter_dupe.lookup_table_values = modified_values
 
-    test_converter_dupe.lookup_table_values[0] = previous_value
+    assert test_converter != test_converter_dupe
 
 
 @pytest.mark.parametrize(
@@ -94,10 +99,91 @@ def test_parse_table():
     test_converter = DetectorDistanceToBeamXYConverter(test_file)
 
     assert test_converter.lookup_file == test_file
-    assert test_converter.lookup_table_values == LOOKUP_TABLE_TEST_VALUES
-    assert test_converter.parse_table() == LOOKUP_TABLE_TEST_VALUES
+    np.testing.assert_array_equal(
+        test_converter.lookup_table_values, LOOKUP_TABLE_TEST_VALUES
+    )
+    np.testing.assert_array_equal(
+        test_converter.parse_table(), LOOKUP_TABLE_TEST_VALUES
+    )
 
     test_converter.reload_lookup_table()
 
     assert test_converter.lookup_file == test_file
-    assert test_converter.lookup_table_values == LOOKUP_TABLE_TEST_VALUES
+    np.testing.assert_array_equal(
+        test_converter.lookup_table_values, LOOKUP_TABLE_TEST_VALUES
+    )
+
+
+def test_converters_for_same_file_share_one_parsed_table():
+    test_file = "tests/devices/unit_tests/test_lookup_table.txt"
+    converters = [DetectorDistanceToBeamXYConverter(test_file) for _ in range(3)]
+
+    table = converters[0].lookup_table_values
+    assert all(converter.lookup_table_values is table for converter in converters)
+    assert all(column.flags.c_contiguous for column in table)
+    assert not table.flags.writeable
+
+
+def test_given_lookup_file_modified_then_table_parsed_again(tmp_path):
+    lookup_file = tmp_path / "lookup.txt"
+    shutil.copy("tests/devices/unit_tests/test_lookup_table.txt", lookup_file)
+    original_table = load_lookup_table(str(lookup_file))
+
+    with open(lookup_file, "a") as f:
+        f.write("300.0 152.0 170.0\n")
+    stat = os.stat(lookup_file)
+    os.utime(lookup_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    new_table = load_lookup_table(str(lookup_file))
+    assert new_table is not original_table
+    assert new_table.shape == (3, 3)
+    assert load_lookup_table(str(lookup_file)) is new_table
+
+
+def test_beam_xy_from_det_dists_matches_scalar_interpolation(
+    fake_converter: DetectorDistanceToBeamXYConverter,
+):
+    detector_distances = np.array([90.0, 100.0, 150.0, 190.0, 200.0, 250.0])
+
+    x_mm, y_mm = fake_converter.get_beam_xy_from_det_dists(detector_distances)
+
+    assert x_mm.shape == y_mm.shape == detector_distances.shape
+    np.testing.assert_array_equal(
+        x_mm,
+        [
+            fake_converter.get_beam_xy_from_det_dist(distance, Axis.X_AXIS)
+            for distance in detector_distances
+        ],
+    )
+    np.testing.assert_array_equal(
+        y_mm,
+        [
+            fake_converter.get_beam_xy_from_det_dist(distance, Axis.Y_AXIS)
+            for distance in detector_distances
+        ],
+    )
+
+
+def test_beam_xy_pixels_from_det_dists_matches_scalar_pixels(
+    fake_converter: DetectorDistanceToBeamXYConverter,
+):
+    detector_distances = np.linspace(100.0, 200.0, 11)
+
+    x_pixels, y_pixels = fake_converter.get_beam_xy_pixels_from_det_dists(
+        detector_distances, (100, 300), (200.0, 150.0)
+    )
+
+    np.testing.assert_allclose(
+        x_pixels,
+        [
+            fake_converter.get_beam_x_pixels(distance, 100, 200.0)
+            for distance in detector_distances
+        ],
+    )
+    np.testing.assert_allclose(
+        y_pixels,
+        [
+            fake_converter.get_beam_y_pixels(distance, 300, 150.0)
+            for distance in detector_distances
+        ],
+    )
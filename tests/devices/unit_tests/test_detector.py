@@ -1,5 +1,9 @@
 from unittest.mock import patch
 
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
 from dodal.devices.detector import DetectorParams
 
 
@@ -52,3 +56,56 @@ def test_correct_det_dist_to_beam_converter_path_passed_in(mocked_parse_table):
     )
     params.json()
     assert params.beam_xy_converter.lookup_file == "a fake directory"
+
+
+@pytest.mark.parametrize("use_roi_mode", [True, False])
+def test_beam_positions_for_many_distances_match_single_distance_positions(
+    use_roi_mode: bool,
+):
+    params = create_detector_params_with_directory("test/dir")
+    params.use_roi_mode = use_roi_mode
+    detector_distances = np.linspace(50.0, 250.0, 21)
+
+    x_mm, y_mm = params.get_beam_positions_mm(detector_distances)
+    x_pixels, y_pixels = params.get_beam_positions_pixels(detector_distances)
+
+    expected_mm = [params.get_beam_position_mm(d) for d in detector_distances]
+    expected_pixels = [params.get_beam_position_pixels(d) for d in detector_distances]
+    np.testing.assert_allclose(np.stack([x_mm, y_mm], axis=1), expected_mm)
+    np.testing.assert_allclose(np.stack([x_pixels, y_pixels], axis=1), expected_pixels)
+
+
+def test_evolve_changes_fields_and_shares_unchanged_sub_objects():
+    params = create_detector_params_with_directory("test/dir")
+
+    evolved = params.evolve(run_number=3, omega_start=90.0, directory="other/dir")
+
+    assert (evolved.run_number, evolved.omega_start) == (3, 90.0)
+    assert evolved.directory == "other/dir/"
+    assert evolved.beam_xy_converter is params.beam_xy_converter
+    assert evolved.detector_size_constants is params.detector_size_constants
+    assert params.run_number == 0
+    assert evolved == params.copy(
+        update={"run_number": 3, "omega_start": 90.0, "directory": "other/dir/"}
+    )
+
+
+def test_given_converter_path_changed_then_evolve_rebuilds_converter():
+    params = create_detector_params_with_directory("test/dir")
+    new_path = "tests/devices/unit_tests/test_lookup_table_2.txt"
+
+    evolved = params.evolve(det_dist_to_beam_converter_path=new_path)
+
+    assert evolved.beam_xy_converter.lookup_file == new_path
+
+
+def test_given_invalid_or_unknown_fields_then_evolve_raises():
+    params = create_detector_params_with_directory("test/dir")
+
+    with pytest.raises(ValidationError) as e:
+        params.evolve(run_number="not a number", not_a_field=1)
+
+    assert {error["loc"] for error in e.value.errors()} == {
+        ("run_number",),
+        ("not_a_field",),
+    }
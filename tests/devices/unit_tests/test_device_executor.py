@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+from dodal.devices.device_executor import (
+    DeviceExecutor,
+    ExecutorFullError,
+    get_device_executor,
+)
+
+
+@pytest.fixture
+def executor():
+    executor = DeviceExecutor(max_workers=2, max_queued=2, name="test")
+    yield executor
+    executor.shutdown(timeout=1)
+
+
+def test_submitted_work_runs_on_named_worker_and_returns_result(
+    executor: DeviceExecutor,
+):
+    future = executor.submit(lambda x: (x, threading.current_thread().name), 5)
+
+    result, thread_name = future.result(1)
+
+    assert result == 5
+    assert thread_name.startswith("test-")
+
+
+def test_workers_are_reused_rather_than_started_per_task(executor: DeviceExecutor):
+    for value in range(10):
+        assert executor.submit(lambda v=value: v).result(1) == value
+
+    metrics = executor.metrics()
+    assert metrics.num_workers == 1
+    assert metrics.submitted == metrics.completed == 10
+
+
+def test_given_workers_busy_and_queue_full_then_submit_rejected(
+    executor: DeviceExecutor,
+):
+    release = threading.Event()
+    started = [threading.Event(), threading.Event()]
+
+    def block(started: threading.Event):
+        started.set()
+        release.wait()
+
+    running = [
+        executor.submit(block, started[i], task_name=f"blocked {i}") for i in (0, 1)
+    ]
+    assert all(event.wait(1) for event in started)
+    queued = [executor.submit(release.wait) for _ in range(2)]
+
+    with pytest.raises(ExecutorFullError):
+        executor.submit(release.wait)
+
+    metrics = executor.metrics()
+    assert metrics.num_workers == 2
+    assert metrics.queue_depth == 2
+    assert metrics.rejected == 1
+    assert set(metrics.running) == {"blocked 0", "blocked 1"}
+
+    release.set()
+    for future in running + queued:
+        future.result(1)
+    assert executor.metrics().max_queue_latency > 0
+
+
+def test_given_queue_full_of_blocked_work_then_shutdown_does_not_block():
+    executor = DeviceExecutor(max_workers=1, max_queued=1, name="test")
+    started, release = threading.Event(), threading.Event()
+    executor.submit(lambda: started.set() or release.wait())
+    assert started.wait(1)
+    executor.submit(release.wait)
+
+    executor.shutdown(wait=False)
+    release.set()
+
+
+def test_failed_work_sets_exception_on_future_and_is_counted_and_logged(
+    executor: DeviceExecutor, caplog
+):
+    def fail():
+        raise ValueError("bad")
+
+    future = executor.submit(fail, task_name="failing snapshot")
+
+    with pytest.raises(ValueError):
+        future.result(1)
+    assert executor.metrics().failed == 1
+    assert "failing snapshot failed" in caplog.text
+    assert "ValueError: bad" in caplog.text
+
+
+def test_given_long_running_task_then_logged_as_possibly_stuck(
+    executor: DeviceExecutor, caplog
+):
+    started, release = threading.Event(), threading.Event()
+    executor.LONG_RUNNING_WARNING = 0
+
+    def stuck():
+        started.set()
+        release.wait()
+
+    future = executor.submit(stuck, task_name="stuck kickoff")
+    assert started.wait(1)
+    executor.log_metrics()
+    release.set()
+    future.result(1)
+
+    assert "stuck kickoff has been running" in caplog.text
+
+
+def test_map_runs_items_in_parallel_and_gives_results_in_order(
+    executor: DeviceExecutor,
+):
+    both_running = threading.Barrier(2, timeout=1)
+
+    def double_when_both_running(value):
+        both_running.wait()
+        return value * 2
+
+    assert executor.map(double_when_both_running, [1, 2]) == [2, 4]
+
+
+def test_given_queue_full_then_map_runs_remaining_items_in_calling_thread(
+    executor: DeviceExecutor,
+):
+    release = threading.Event()
+    for _ in range(4):
+        executor.submit(release.wait)
+
+    threads = executor.map(lambda _: threading.current_thread(), [1, 2])
+    release.set()
+
+    assert threads == [threading.current_thread()] * 2
+
+
+def test_when_map_called_from_worker_then_items_run_on_that_worker(
+    executor: DeviceExecutor,
+):
+    def map_in_worker():
+        return executor.map(lambda _: threading.current_thread(), [1, 2, 3])
+
+    worker_threads = executor.submit(map_in_worker).result(1)
+
+    assert len(set(worker_threads)) == 1
+    assert worker_threads[0] is not threading.current_thread()
+
+
+def test_device_executor_is_shared():
+    assert get_device_executor() is get_device_executor()
@@ -1,14 +1,17 @@
 import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+from bluesky.utils import ProgressBar
 from mockito import ANY, mock, verify, when
 from ophyd.sim import make_fake_device
 from ophyd.status import Status
 
 from dodal.devices.det_dim_constants import EIGER2_X_16M_SIZE
 from dodal.devices.detector import DetectorParams, TriggerMode
-from dodal.devices.eiger import EigerDetector
+from dodal.devices.eiger import EigerDetector, FramesCapturedStatus
+from dodal.devices.sim import EigerSimLatencies, SimulatedEigerIOC, make_simulated_eiger
 from dodal.devices.status import await_value
 from dodal.devices.utils import run_functions_without_blocking
 from dodal.log import LOGGER
@@ -607,3 +610,366 @@ def test_given_not_all_frames_done_when_eiger_stopped_then_do_not_wait_for_frame
     fake_eiger.stop()
 
     fake_eiger.disarm_detector.assert_called()
+
+
+@pytest.fixture
+def sim_eiger():
+    eiger, sim = make_simulated_eiger(create_new_params())
+    eiger.keep_armed = True
+    yield eiger, sim
+    sim.close()
+
+
+def _collect_with_sim(eiger: EigerDetector, sim: SimulatedEigerIOC) -> bool:
+    eiger.stage()
+    sim.acquire_frames(eiger.detector_params.full_number_of_images)
+    status_ok = eiger.unstage()
+    sim.settle()
+    return status_ok
+
+
+def test_given_keep_armed_when_unstaged_then_detector_still_armed(sim_eiger):
+    eiger, sim = sim_eiger
+
+    assert _collect_with_sim(eiger, sim)
+
+    assert eiger.is_armed()
+    assert eiger.cam.acquire.get() == 1
+
+
+def test_given_keep_armed_and_only_collection_changed_then_only_collection_pvs_written(
+    sim_eiger,
+):
+    eiger, sim = sim_eiger
+    _collect_with_sim(eiger, sim)
+    eiger.cam.acquire_time.set = MagicMock()
+    eiger.cam.photon_energy.set = MagicMock()
+
+    new_params = create_new_params()
+    new_params.run_number = 1
+    new_params.omega_start = 90
+    eiger.set_detector_parameters(new_params)
+    assert eiger.only_collection_changed()
+
+    assert _collect_with_sim(eiger, sim)
+
+    eiger.cam.acquire_time.set.assert_not_called()
+    eiger.cam.photon_energy.set.assert_not_called()
+    assert eiger.odin.file_writer.file_name.get() == f"{TEST_PREFIX}_1"
+    assert eiger.cam.omega_start.get() == 90
+    assert eiger.is_armed()
+
+
+def test_given_keep_armed_and_only_collection_changed_then_disarmed_and_rearmed(
+    sim_eiger,
+):
+    eiger, sim = sim_eiger
+    _collect_with_sim(eiger, sim)
+    acquire_puts = []
+    eiger.cam.acquire.subscribe(
+        lambda value, **_: acquire_puts.append(value), run=False
+    )
+    eiger.set_detector_parameters(create_new_params().evolve(run_number=1))
+
+    assert _collect_with_sim(eiger, sim)
+
+    assert acquire_puts == [0, 1]
+
+
+def test_given_keep_armed_when_unstaged_then_filewriter_start_timeout_triggered(
+    sim_eiger,
+):
+    eiger, sim = sim_eiger
+    eiger.odin.file_writer.start_timeout.put = MagicMock()
+
+    _collect_with_sim(eiger, sim)
+
+    eiger.odin.file_writer.start_timeout.put.assert_called_once_with(1)
+
+
+def test_given_keep_armed_and_exposure_changed_then_detector_rearmed(sim_eiger):
+    eiger, sim = sim_eiger
+    _collect_with_sim(eiger, sim)
+
+    new_params = create_new_params()
+    new_params.exposure_time = 0.5
+    eiger.set_detector_parameters(new_params)
+    assert not eiger.only_collection_changed()
+
+    assert _collect_with_sim(eiger, sim)
+
+    assert eiger.cam.acquire_time.get() == 0.5
+    assert eiger.is_armed()
+
+
+def test_given_keep_armed_when_stopped_then_detector_disarmed(sim_eiger):
+    eiger, sim = sim_eiger
+    _collect_with_sim(eiger, sim)
+
+    eiger.stop()
+    sim.settle()
+
+    assert not eiger.is_armed()
+    assert eiger.armed_params is None
+
+
+def test_given_keep_armed_when_stage_called_twice_then_only_updated_once(sim_eiger):
+    eiger, sim = sim_eiger
+    eiger.stage()
+    eiger.async_stage = MagicMock()
+
+    eiger.stage()
+
+    eiger.async_stage.assert_not_called()
+
+
+@pytest.fixture
+def frames_captured_status(fake_eiger: EigerDetector):
+    fake_eiger.odin.file_writer.num_captured.sim_put(0)
+    status = fake_eiger.create_frames_captured_status(first_frame_timeout=10)
+    yield status
+    status.clean_up()
+
+
+def test_given_frames_captured_when_target_reached_then_frames_captured_status_done(
+    fake_eiger: EigerDetector, frames_captured_status
+):
+    for frames in [1000, 2000]:
+        fake_eiger.odin.file_writer.num_captured.sim_put(frames)
+
+    frames_captured_status.wait(1)
+    assert frames_captured_status.success
+
+
+def test_frames_captured_status_reports_progress_and_rate_to_watchers(
+    fake_eiger: EigerDetector, frames_captured_status
+):
+    watcher = MagicMock()
+    frames_captured_status.watch(watcher)
+    start = time.time()
+    for frames, elapsed in [(100, 10.0), (200, 11.0)]:
+        fake_eiger.odin.file_writer.num_captured._run_subs(
+            sub_type="value", value=frames, timestamp=start + elapsed
+        )
+
+    last_progress = watcher.call_args.kwargs
+    assert last_progress["current"] == 200
+    assert last_progress["target"] == 2000
+    assert last_progress["fraction"] == pytest.approx(0.9)
+    assert last_progress["time_remaining"] == pytest.approx(18)
+    assert "frame_rate" not in last_progress
+    assert frames_captured_status.frame_rate == pytest.approx(100)
+
+
+def test_given_progress_bar_watching_then_frames_captured_status_completes(
+    fake_eiger: EigerDetector, frames_captured_status
+):
+    progress_bar = ProgressBar([frames_captured_status], delay_draw=0)
+    fake_eiger.odin.file_writer.num_captured.sim_put(1000)
+    assert "1000.0/2000.0" in progress_bar.meters[0]
+
+    fake_eiger.odin.file_writer.num_captured.sim_put(2000)
+    frames_captured_status.wait(1)
+    assert frames_captured_status.success
+
+
+def test_given_watcher_raises_then_frames_captured_status_still_completes(
+    fake_eiger: EigerDetector, frames_captured_status
+):
+    def bad_watcher(name, **kwargs):
+        if kwargs:
+            raise TypeError("Bad watcher")
+
+    frames_captured_status.watch(bad_watcher)
+    fake_eiger.odin.file_writer.num_captured.sim_put(2000)
+
+    frames_captured_status.wait(1)
+    assert frames_captured_status.success
+
+
+def test_given_frame_rate_known_then_allowed_stall_adapts_to_frame_rate(
+    fake_eiger: EigerDetector, frames_captured_status: FramesCapturedStatus
+):
+    assert frames_captured_status.allowed_stall_time() == 10
+    start = time.time()
+    for frames, elapsed in [(10, 0.0), (20, 10.0)]:
+        fake_eiger.odin.file_writer.num_captured._run_subs(
+            sub_type="value", value=frames, timestamp=start + elapsed
+        )
+
+    assert frames_captured_status.allowed_stall_time() == pytest.approx(
+        FramesCapturedStatus.STALL_FRAME_PERIODS
+    )
+
+
+def test_given_frames_stall_then_frames_captured_status_fails_without_waiting_for_first_frame_timeout(
+    fake_eiger: EigerDetector, frames_captured_status: FramesCapturedStatus
+):
+    frames_captured_status.MIN_STALL_TIMEOUT = 0.1
+    fake_eiger.odin.file_writer.num_captured.sim_put(100)
+    fake_eiger.odin.file_writer.num_captured.sim_put(200)
+
+    with pytest.raises(TimeoutError):
+        frames_captured_status.wait(2)
+
+
+def test_given_no_first_frame_timeout_then_frames_captured_status_waits_for_frames(
+    fake_eiger: EigerDetector,
+):
+    status = fake_eiger.create_frames_captured_status()
+    time.sleep(0.1)
+    assert not status.done
+
+    status.set_first_frame_timeout(0.1)
+    with pytest.raises(TimeoutError):
+        status.wait(2)
+
+
+def test_given_no_first_frame_timeout_then_stall_timer_only_started_once_timeout_set(
+    fake_eiger: EigerDetector,
+):
+    status = fake_eiger.create_frames_captured_status()
+    assert status._stall_timer is None
+
+    status.set_first_frame_timeout(10)
+    assert status._stall_timer is not None
+
+    status.cancel("Collection aborted")
+    assert status._stall_timer is None
+
+
+def test_given_free_run_when_armed_then_frames_captured_status_created_and_cancelled_on_disarm(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.detector_params.trigger_mode = TriggerMode.FREE_RUN
+    fake_eiger.odin.create_finished_status = MagicMock()
+    fake_eiger.odin.fan.ready.sim_put(1)
+
+    fake_eiger._wait_fan_ready().wait(1)
+    status = fake_eiger.frames_captured
+    assert status is not None and not status.done
+
+    fake_eiger.disarm_detector()
+    with pytest.raises(RuntimeError):
+        status.wait(1)
+    assert fake_eiger.frames_captured is None
+
+
+def test_when_threshold_change_started_then_arming_reuses_pending_change(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.cam.photon_energy.sim_put(100.0)
+    threshold_change = Status()
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=threshold_change)
+
+    started = fake_eiger.threshold_energy.set(200.0)
+    arming_status = fake_eiger._threshold_change_for_arming(200.0)
+
+    fake_eiger.cam.photon_energy.set.assert_called_once_with(
+        200.0, timeout=EigerDetector.GENERAL_STATUS_TIMEOUT
+    )
+    assert started is arming_status is threshold_change
+    assert fake_eiger.pending_threshold_change is None
+
+
+def test_given_pending_threshold_change_finished_then_arming_does_not_set_threshold(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.cam.photon_energy.sim_put(100.0)
+    fake_eiger.start_threshold_change(200.0).wait(1)
+    fake_eiger.cam.photon_energy.set = MagicMock()
+
+    fake_eiger._threshold_change_for_arming(200.0).wait(1)
+
+    fake_eiger.cam.photon_energy.set.assert_not_called()
+
+
+def test_given_pending_threshold_change_for_different_energy_then_arming_waits_then_changes(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.cam.photon_energy.sim_put(100.0)
+    first_change = Status()
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=first_change)
+    fake_eiger.start_threshold_change(200.0)
+
+    arming_status = fake_eiger._threshold_change_for_arming(300.0)
+    fake_eiger.cam.photon_energy.set.assert_called_once_with(
+        200.0, timeout=EigerDetector.GENERAL_STATUS_TIMEOUT
+    )
+
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=finished_status())
+    first_change.set_finished()
+    arming_status.wait(1)
+    fake_eiger.cam.photon_energy.set.assert_called_once_with(
+        300.0, timeout=EigerDetector.GENERAL_STATUS_TIMEOUT
+    )
+
+
+def test_given_pending_threshold_change_failed_then_arming_starts_again(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.cam.photon_energy.sim_put(100.0)
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=get_bad_status())
+    fake_eiger.start_threshold_change(200.0)
+    time.sleep(0.1)
+
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=finished_status())
+    fake_eiger._threshold_change_for_arming(200.0).wait(1)
+
+    fake_eiger.cam.photon_energy.set.assert_called_once_with(
+        200.0, timeout=EigerDetector.GENERAL_STATUS_TIMEOUT
+    )
+
+
+def test_given_detector_armed_when_threshold_change_started_then_queued_for_next_arm(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.odin.fan.ready.sim_put(1)
+    fake_eiger.cam.acquire.sim_put(1)
+    threshold_change = Status()
+    fake_eiger.cam.photon_energy.sim_put(100.0)
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=threshold_change)
+
+    queued = fake_eiger.start_threshold_change(200.0)
+
+    fake_eiger.cam.photon_energy.set.assert_not_called()
+    assert not queued.done
+
+    fake_eiger._threshold_change_for_arming(200.0)
+    fake_eiger.cam.photon_energy.set.assert_called_once()
+    assert not queued.done
+
+    threshold_change.set_finished()
+    queued.wait(1)
+    assert queued.success
+
+
+def test_given_threshold_change_queued_when_armed_at_other_energy_then_change_fails(
+    fake_eiger: EigerDetector,
+):
+    fake_eiger.odin.fan.ready.sim_put(1)
+    fake_eiger.cam.acquire.sim_put(1)
+    fake_eiger.cam.photon_energy.set = MagicMock(return_value=finished_status())
+
+    queued = fake_eiger.start_threshold_change(200.0)
+    fake_eiger._threshold_change_for_arming(300.0)
+
+    with pytest.raises(RuntimeError):
+        queued.wait(1)
+
+
+def test_given_threshold_change_started_when_armed_with_sim_then_threshold_set_once():
+    params = create_new_params()
+    latencies = EigerSimLatencies(threshold_change=0.2)
+    eiger, sim = make_simulated_eiger(params, latencies)
+    eiger.cam.photon_energy.sim_put(params.current_energy_ev - 1000)
+    photon_energy_puts = []
+    eiger.cam.photon_energy.subscribe(
+        lambda value, **_: photon_energy_puts.append(value), run=False
+    )
+
+    eiger.start_threshold_change(params.current_energy_ev)
+    eiger.async_stage().wait(5)
+    sim.close()
+
+    assert photon_energy_puts == [params.current_energy_ev]
@@ -0,0 +1,183 @@
+import asyncio
+
+import pytest
+from ophyd.v2.core import set_sim_value
+
+from dodal.beamlines import beamline_utils
+from dodal.devices.detector import TriggerMode
+from dodal.devices.eiger import EigerDetector
+from dodal.devices.eiger_async import EigerDetectorAsync
+from dodal.devices.sim import (
+    EigerSimLatencies,
+    SimulatedEigerAsyncIOC,
+    benchmark_eiger,
+    benchmark_eiger_async,
+    make_simulated_eiger_async,
+)
+
+from .test_eiger import create_new_params
+
+pytest_plugins = ("pytest_asyncio",)
+
+TEST_LATENCIES = EigerSimLatencies(
+    put=0.005,
+    stale_parameters=0.01,
+    odin_file_name=0.01,
+    odin_writer_start=0.01,
+    fan_ready=0.01,
+    writer_close=0.005,
+)
+
+
+@pytest.mark.asyncio
+async def test_when_armed_then_detector_and_filewriters_configured():
+    params = create_new_params()
+    eiger, sim = await make_simulated_eiger_async(params, TEST_LATENCIES)
+
+    await eiger.arm()
+
+    assert await eiger.is_armed()
+    assert await eiger.odin.meta.ready.get_value() == 1
+    assert await eiger.odin.file_writer.file_name.get_value() == params.full_filename
+    assert await eiger.odin.file_writer.data_type.get_value() == "UInt16"
+    assert await eiger.odin.file_writer.num_capture.get_value() == (
+        params.full_number_of_images
+    )
+    assert await eiger.cam.photon_energy.get_value() == params.current_energy_ev
+    assert await eiger.cam.acquire_time.get_value() == params.exposure_time
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_given_free_run_when_armed_then_odin_captures_until_stopped():
+    params = create_new_params().copy(update={"trigger_mode": TriggerMode.FREE_RUN})
+    eiger, sim = await make_simulated_eiger_async(params)
+
+    await eiger.arm()
+
+    assert await eiger.odin.file_writer.num_capture.get_value() == 0
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_when_collection_finished_then_unstage_disarms():
+    params = create_new_params()
+    eiger, sim = await make_simulated_eiger_async(params, TEST_LATENCIES)
+
+    await eiger.stage()
+    sim.acquire_frames(params.full_number_of_images)
+    status_ok = await eiger.unstage()
+
+    assert status_ok
+    assert not await eiger.is_armed()
+    assert await eiger.odin.file_writer.num_captured.get_value() == (
+        params.full_number_of_images
+    )
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_given_odin_not_initialised_when_armed_then_exception_raised():
+    eiger, sim = await make_simulated_eiger_async(create_new_params())
+    set_sim_value(eiger.odin.meta.initialised, 0)
+
+    with pytest.raises(Exception, match="MetaListener is not initialised"):
+        await eiger.arm()
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_given_node_error_when_armed_then_error_cleared():
+    eiger, sim = await make_simulated_eiger_async(create_new_params())
+    sim.inject_node_error(2, "Bad")
+
+    await eiger.arm()
+
+    assert await eiger.odin.nodes[2].error_message.get_value() == ""
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_when_arming_stopped_then_arming_cancelled_and_detector_disarmed():
+    latencies = EigerSimLatencies(stale_parameters=0.01, fan_ready=10)
+    eiger, sim = await make_simulated_eiger_async(create_new_params(), latencies)
+
+    arming = eiger.arm()
+    await wait_until(eiger.cam.acquire, 1)
+    await eiger.stop()
+
+    with pytest.raises(asyncio.CancelledError):
+        await arming
+    assert await eiger.cam.acquire.get_value() == 0
+    sim.close()
+
+
+@pytest.mark.asyncio
+async def test_given_arming_started_when_staged_then_arm_not_restarted():
+    eiger, sim = await make_simulated_eiger_async(create_new_params(), TEST_LATENCIES)
+
+    arming = eiger.arm()
+    arm_task = eiger._arming
+    await eiger.stage()
+
+    assert arming.done
+    assert eiger._arming is arm_task
+    sim.close()
+
+
+async def wait_until(signal, value, timeout: float = 1.0):
+    async def poll():
+        while await signal.get_value() != value:
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_when_armed_then_detector_and_filewriter_puts_made_concurrently():
+    eiger, sim = await make_simulated_eiger_async(create_new_params(), TEST_LATENCIES)
+
+    await eiger.arm()
+
+    assert sim.max_puts_in_progress > 1
+    assert sim.puts_in_progress == 0
+    sim.close()
+
+
+def test_async_benchmark_times_same_operations_as_v1_benchmark():
+    params = create_new_params()
+
+    v1_results = benchmark_eiger(params, TEST_LATENCIES, repeats=1)
+    async_results = benchmark_eiger_async(params, TEST_LATENCIES, repeats=1)
+
+    assert list(async_results) == list(v1_results)
+    assert all(len(result.samples) == 1 for result in async_results.values())
+
+
+def test_given_detector_not_connected_in_sim_then_simulated_ioc_not_created():
+    eiger = EigerDetectorAsync.with_params(
+        create_new_params(), name="eiger", prefix="SIM-EA-EIGER-01:"
+    )
+
+    with pytest.raises(TypeError):
+        SimulatedEigerAsyncIOC(eiger)
+
+
+def test_async_and_v1_eiger_can_be_instantiated_side_by_side():
+    beamline_utils.clear_devices()
+    v1_eiger = beamline_utils.device_instantiation(
+        EigerDetector, "eiger", "BL03I-EA-EIGER-01:", False, True, bl_prefix=False
+    )
+    async_eiger = beamline_utils.device_instantiation(
+        EigerDetectorAsync,
+        "eiger_async",
+        "BL03I-EA-EIGER-01:",
+        False,
+        True,
+        bl_prefix=False,
+    )
+
+    assert isinstance(v1_eiger, EigerDetector)
+    assert isinstance(async_eiger, EigerDetectorAsync)
+    assert async_eiger.name == "eiger_async"
+    beamline_utils.clear_devices()
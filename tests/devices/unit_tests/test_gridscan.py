@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock, patch
+
 import numpy as np
 import pytest
 from bluesky import plan_stubs as bps
@@ -10,7 +12,9 @@ from ophyd.sim import make_fake_device
 from dodal.devices.fast_grid_scan import (
     FastGridScan,
     GridScanParams,
+    ImageProgressReporter,
     set_fast_grid_scan_params,
+    set_fast_grid_scan_params_if_changed,
 )
 from dodal.devices.smargon import Smargon
 
@@ -126,6 +130,98 @@ def test_running_finished_with_all_images_done_then_complete_status_finishes_not
     assert complete_status.exception() is None
 
 
+def notified_images(watcher: MagicMock):
+    return [
+        call.kwargs["current"]
+        for call in watcher.call_args_list
+        if "current" in call.kwargs
+    ]
+
+
+@pytest.fixture
+def started_scan(fast_grid_scan: FastGridScan):
+    RE = RunEngine()
+    RE(
+        set_fast_grid_scan_params(
+            fast_grid_scan, GridScanParams(x_steps=10, y_steps=10)
+        )
+    )
+    fast_grid_scan.status.sim_put(1)
+    return fast_grid_scan
+
+
+@patch("dodal.devices.fast_grid_scan.time")
+def test_given_many_images_within_notify_period_then_watchers_notified_once(
+    mock_time: MagicMock, started_scan: FastGridScan
+):
+    mock_time.time.return_value = 100.0
+    complete_status = started_scan.complete()
+    watcher = MagicMock()
+    complete_status.watch(watcher)
+
+    for image in range(1, 50):
+        mock_time.time.return_value = 100.0 + image * 0.001
+        started_scan.position_counter.sim_put(image)
+
+    assert notified_images(watcher) == [1]
+
+    mock_time.time.return_value = 100.2
+    started_scan.position_counter.sim_put(50)
+    assert notified_images(watcher) == [1, 50]
+
+
+@patch("dodal.devices.fast_grid_scan.time")
+def test_time_remaining_estimated_from_smoothed_image_rate(
+    mock_time: MagicMock, started_scan: FastGridScan
+):
+    mock_time.time.return_value = 100.0
+    complete_status = started_scan.complete()
+    watcher = MagicMock()
+    complete_status.watch(watcher)
+
+    for notification in range(1, 6):
+        mock_time.time.return_value = 100.0 + notification
+        started_scan.position_counter.sim_put(10 * notification)
+
+    # A steady 10 images a second with 50 images left
+    assert watcher.call_args.kwargs["time_remaining"] == pytest.approx(5.0)
+
+    mock_time.time.return_value = 106.0
+    started_scan.position_counter.sim_put(80)
+    expected_rate = (
+        ImageProgressReporter.RATE_SMOOTHING * 30
+        + (1 - ImageProgressReporter.RATE_SMOOTHING) * 10
+    )
+    assert watcher.call_args.kwargs["time_remaining"] == pytest.approx(
+        20 / expected_rate
+    )
+
+
+@patch("dodal.devices.fast_grid_scan.time")
+def test_given_throttled_images_then_final_image_and_finish_flushed_to_watchers(
+    mock_time: MagicMock, started_scan: FastGridScan
+):
+    mock_time.time.return_value = 100.0
+    complete_status = started_scan.complete()
+    watcher = MagicMock()
+    complete_status.watch(watcher)
+
+    started_scan.position_counter.sim_put(1)
+    started_scan.position_counter.sim_put(100)
+    assert watcher.call_args.kwargs["current"] == 100
+    assert watcher.call_args.kwargs["fraction"] == 0
+
+    complete_status = started_scan.complete()
+    watcher = MagicMock()
+    complete_status.watch(watcher)
+    started_scan.position_counter.sim_put(1)
+    started_scan.position_counter.sim_put(42)
+    started_scan.status.sim_put(0)
+
+    complete_status.wait(1)
+    assert notified_images(watcher) == [1, 42]
+
+
 def create_motor_bundle_with_limits(low_limit, high_limit) -> Smargon:
     FakeSmargon = make_fake_device(Smargon)
     grid_scan_motor_bundle: Smargon = FakeSmargon(name="test")
@@ -337,3 +433,135 @@ def test_given_x_y_z_steps_when_full_number_calculated_then_answer_is_as_expecte
     grid_scan_params: GridScanParams,
 ):
     assert grid_scan_params.get_num_images() == 350
+
+
+def test_given_many_grid_positions_then_motor_positions_match_single_conversions(
+    grid_scan_params: GridScanParams,
+):
+    grid_positions = np.array([[0, 0, 0], [1, 1, 1], [2, 11, 16], [6, 5, 5]])
+
+    motor_positions = grid_scan_params.grid_positions_to_motor_positions(grid_positions)
+
+    assert motor_positions.shape == (4, 3)
+    np.testing.assert_allclose(
+        motor_positions,
+        [
+            grid_scan_params.grid_position_to_motor_position(position)
+            for position in grid_positions
+        ],
+    )
+
+
+def test_given_grid_positions_then_mask_marks_those_within_grid(
+    grid_scan_params: GridScanParams,
+):
+    grid_positions = np.array(
+        [[-1, 2, 4], [11, 2, 4], [1, 17, 4], [1, 5, 22], [1, 5, 4], [10, 15, 20]]
+    )
+
+    within = grid_scan_params.grid_positions_within_grid(grid_positions)
+
+    np.testing.assert_array_equal(within, [False, False, False, False, True, True])
+    with pytest.raises(IndexError):
+        grid_scan_params.grid_positions_to_motor_positions(grid_positions)
+    grid_scan_params.grid_positions_to_motor_positions(grid_positions[within])
+
+
+def test_given_grid_positions_not_n_by_3_then_converting_raises(
+    grid_scan_params: GridScanParams,
+):
+    with pytest.raises(ValueError):
+        grid_scan_params.grid_positions_to_motor_positions(np.array([1, 2, 3]))
+
+
+def test_all_motor_positions_snake_through_both_grids():
+    params = GridScanParams(
+        x_steps=3,
+        y_steps=2,
+        z_steps=2,
+        x_step_size=1,
+        y_step_size=10,
+        z_step_size=100,
+        x_start=0,
+        y1_start=0,
+        y2_start=5,
+        z1_start=7,
+        z2_start=0,
+    )
+
+    positions = params.all_motor_positions()
+
+    assert positions.shape == (params.get_num_images(), 3)
+    np.testing.assert_allclose(
+        positions,
+        [
+            [0, 0, 7],
+            [1, 0, 7],
+            [2, 0, 7],
+            [2, 10, 7],
+            [1, 10, 7],
+            [0, 10, 7],
+            [0, 5, 0],
+            [1, 5, 0],
+            [2, 5, 0],
+            [2, 5, 100],
+            [1, 5, 100],
+            [0, 5, 100],
+        ],
+    )
+
+
+def test_given_parameters_already_uploaded_then_only_changed_parameters_written(
+    fast_grid_scan: FastGridScan,
+):
+    RE = RunEngine()
+    params = GridScanParams(x_steps=5, y_steps=4, x_start=1.0)
+    RE(set_fast_grid_scan_params(fast_grid_scan, params))
+
+    new_params = params.copy(update={"x_start": 2.0, "y1_start": 3.0})
+    assert fast_grid_scan.changed_parameters(new_params) == {
+        "x_start": 2.0,
+        "y1_start": 3.0,
+    }
+
+    signals = {
+        name: getattr(fast_grid_scan, name)
+        for name in FastGridScan.PARAMETER_NAMES + ["position_counter"]
+    }
+    mocks = {
+        name: patch.object(signal, "set", wraps=signal.set).start()
+        for name, signal in signals.items()
+    }
+    try:
+        RE(set_fast_grid_scan_params_if_changed(fast_grid_scan, new_params))
+    finally:
+        patch.stopall()
+
+    written = {name for name, mock_set in mocks.items() if mock_set.called}
+    assert written == {"x_start", "y1_start"}
+    assert fast_grid_scan.x_start.get() == 2.0
+    assert fast_grid_scan.y1_start.get() == 3.0
+
+
+def test_given_position_counter_not_zero_then_upload_resets_it(
+    fast_grid_scan: FastGridScan,
+):
+    fast_grid_scan.position_counter.sim_put(10)
+
+    fast_grid_scan.upload_parameters(GridScanParams()).wait(1)
+
+    assert fast_grid_scan.position_counter.get() == 0
+
+
+def test_upload_completes_only_once_scan_valid(fast_grid_scan: FastGridScan):
+    fast_grid_scan.scan_invalid.sim_put(1)
+
+    status = fast_grid_scan.upload_parameters(GridScanParams(x_steps=3))
+    with pytest.raises(Exception):
+        status.wait(0.1)
+    assert not status.done
+
+    fast_grid_scan.scan_invalid.sim_put(0)
+    status.wait(1)
+    assert status.success
+    assert fast_grid_scan.x_steps.get() == 3
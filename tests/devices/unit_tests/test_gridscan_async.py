@@ -0,0 +1,158 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bluesky.protocols import Flyable, Preparable
+from ophyd.v2.core import set_sim_callback, set_sim_value
+
+from dodal.devices.fast_grid_scan import FastGridScan, GridScanParams
+from dodal.devices.fast_grid_scan_async import FastGridScanAsync
+from dodal.devices.sim import EigerSimLatencies, make_simulated_eiger_async
+
+from .test_eiger import create_new_params
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def make_fast_grid_scan(start_on_run: bool = True) -> FastGridScanAsync:
+    fgs = FastGridScanAsync("BL03S-MO-SGON-01:FGS:", name="fgs")
+    await fgs.connect(sim=True)
+
+    def run_requested(reading, value):
+        if value and start_on_run:
+            set_sim_value(fgs.status, 1)
+
+    set_sim_callback(fgs.run_cmd, run_requested)
+    return fgs
+
+
+def test_fast_grid_scan_async_is_flyable_and_preparable():
+    fgs = FastGridScanAsync("BL03S-MO-SGON-01:FGS:", name="fgs")
+
+    assert isinstance(fgs, Flyable)
+    assert isinstance(fgs, Preparable)
+
+
+@pytest.mark.asyncio
+async def test_when_prepared_then_all_parameters_written_and_counter_reset():
+    fgs = await make_fast_grid_scan()
+    set_sim_value(fgs.position_counter, 20)
+    params = GridScanParams(
+        x_steps=5, y_steps=4, z_steps=3, x_start=1.5, z2_start=2.5, dwell_time=0.2
+    )
+
+    await fgs.prepare(params)
+
+    for name in FastGridScan.PARAMETER_NAMES:
+        assert await getattr(fgs, name).get_value() == getattr(params, name)
+    assert await fgs.position_counter.get_value() == 0
+
+
+@pytest.mark.asyncio
+async def test_given_scan_invalid_when_prepared_then_waits_for_scan_to_be_valid():
+    fgs = await make_fast_grid_scan()
+    set_sim_value(fgs.scan_invalid, 1)
+
+    status = fgs.prepare(GridScanParams())
+    await asyncio.sleep(0.01)
+    assert not status.done
+
+    set_sim_value(fgs.scan_invalid, 0)
+    await asyncio.wait_for(status, 1)
+    assert status.success
+
+
+@pytest.mark.asyncio
+async def test_expected_images_derived_from_step_counts():
+    fgs = await make_fast_grid_scan()
+    updates = []
+    fgs.expected_images.subscribe_value(updates.append)
+
+    await fgs.prepare(GridScanParams(x_steps=10, y_steps=5, z_steps=2))
+    await asyncio.sleep(0)
+
+    assert await fgs.expected_images.get_value() == 70
+    assert updates[-1] == 70
+    fgs.expected_images.clear_sub(updates.append)
+
+
+@pytest.mark.asyncio
+async def test_kickoff_completes_once_scan_running():
+    fgs = await make_fast_grid_scan()
+
+    await asyncio.wait_for(fgs.kickoff(), 1)
+
+    assert await fgs.status.get_value() == 1
+
+
+@pytest.mark.asyncio
+async def test_given_scan_never_starts_then_kickoff_times_out():
+    fgs = await make_fast_grid_scan(start_on_run=False)
+    fgs.KICKOFF_TIMEOUT = 0.01
+
+    with pytest.raises(asyncio.TimeoutError):
+        await fgs.kickoff()
+
+
+@pytest.mark.asyncio
+async def test_complete_reports_progress_and_finishes_when_scan_stops():
+    fgs = await make_fast_grid_scan()
+    await fgs.prepare(GridScanParams(x_steps=2, y_steps=2))
+    await fgs.kickoff()
+
+    status = fgs.complete()
+    watcher = MagicMock()
+    status.watch(watcher)
+    await asyncio.sleep(0.01)
+    set_sim_value(fgs.position_counter, 3)
+    await asyncio.sleep(0.01)
+    assert not status.done
+
+    set_sim_value(fgs.status, 0)
+    await asyncio.wait_for(status, 1)
+
+    assert watcher.call_args.kwargs["current"] == 3
+    assert watcher.call_args.kwargs["target"] == 4
+    assert watcher.call_args.kwargs["fraction"] == 1 / 4
+
+
+@pytest.mark.asyncio
+async def test_gridscan_can_be_prepared_whilst_detector_arms():
+    fgs = await make_fast_grid_scan()
+    eiger, sim = await make_simulated_eiger_async(
+        create_new_params(), EigerSimLatencies(put=0.005, fan_ready=0.01)
+    )
+
+    await asyncio.gather(eiger.arm(), fgs.prepare(GridScanParams(x_steps=3)))
+    await fgs.kickoff()
+
+    assert await eiger.is_armed()
+    assert await fgs.expected_images.get_value() == 3
+    sim.close()
+
+
+@pytest.mark.asyncio
+@patch("dodal.devices.fast_grid_scan.time")
+async def test_complete_throttles_progress_and_flushes_final_count(
+    mock_time: MagicMock,
+):
+    mock_time.time.return_value = 100.0
+    fgs = await make_fast_grid_scan()
+    await fgs.prepare(GridScanParams(x_steps=10, y_steps=10))
+    await fgs.kickoff()
+
+    status = fgs.complete()
+    watcher = MagicMock()
+    status.watch(watcher)
+    await asyncio.sleep(0.01)
+    for image in range(1, 50):
+        mock_time.time.return_value = 100.0 + image * 0.001
+        set_sim_value(fgs.position_counter, image)
+        await asyncio.sleep(0)
+
+    assert [call.kwargs["current"] for call in watcher.call_args_list] == [0]
+
+    set_sim_value(fgs.status, 0)
+    await asyncio.wait_for(status, 1)
+
+    assert [call.kwargs["current"] for call in watcher.call_args_list] == [0, 49]
@@ -1,8 +1,22 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pytest
+from ophyd import EpicsMotor
+from ophyd.sim import make_fake_device
 
-from dodal.devices.motors import XYZLimitBundle
+from dodal.devices.i23.gonio import Gonio
+from dodal.devices.motors import MotorLimitHelper, XYZLimitBundle
+from dodal.devices.smargon import Smargon
+
+
+@pytest.fixture
+def motor() -> EpicsMotor:
+    FakeEpicsMotor = make_fake_device(EpicsMotor)
+    motor: EpicsMotor = FakeEpicsMotor(name="motor")
+    motor.low_limit_travel.sim_put(-5)
+    motor.high_limit_travel.sim_put(5)
+    return motor
 
 
 def test_given_position_in_limits_then_position_valid_returns_true():
@@ -35,3 +49,122 @@ def test_when_position_valid_called_without_3_vector_the_raises():
 
     with pytest.raises(ValueError):
         raise bundle.position_valid([0, 0, 0, 0])
+
+
+def test_given_limits_cached_then_checking_positions_does_not_read_limits(
+    motor: EpicsMotor,
+):
+    helper = MotorLimitHelper(motor)
+
+    with patch.object(motor.low_limit_travel, "get") as low_get, patch.object(
+        motor.high_limit_travel, "get"
+    ) as high_get:
+        assert helper.is_within(0)
+        assert not helper.is_within(6)
+
+    low_get.assert_not_called()
+    high_get.assert_not_called()
+
+
+def test_when_limits_change_then_monitored_limits_used(motor: EpicsMotor):
+    helper = MotorLimitHelper(motor)
+
+    motor.high_limit_travel.sim_put(10)
+
+    assert helper.limits == (-5, 10)
+    assert helper.is_within(6)
+
+
+def test_given_no_monitor_update_then_limits_read_on_first_use(motor: EpicsMotor):
+    helper = MotorLimitHelper(motor)
+    helper._low = None
+
+    assert helper.limits == (-5, 5)
+
+
+def test_when_bundle_refreshed_then_limits_read_for_every_axis():
+    mock_limits = MagicMock(), MagicMock(), MagicMock()
+    bundle = XYZLimitBundle(*mock_limits)
+
+    bundle.refresh()
+
+    for mock in mock_limits:
+        mock.refresh.assert_called_once()
+
+
+def test_when_helper_closed_then_limits_no_longer_monitored(motor: EpicsMotor):
+    subscriptions = len(motor.low_limit_travel._callbacks["value"])
+    helper = MotorLimitHelper(motor)
+
+    helper.close()
+    motor.high_limit_travel.sim_put(10)
+
+    assert len(motor.low_limit_travel._callbacks["value"]) == subscriptions
+    assert helper._high == 5
+
+
+@pytest.mark.parametrize("device_type", [Smargon, Gonio])
+def test_when_xyz_limits_got_repeatedly_then_no_more_subscriptions_made(
+    device_type,
+):
+    device = make_fake_device(device_type)(name="device")
+    limits = device.get_xyz_limits()
+    subscriptions = len(device.x.low_limit_travel._callbacks["value"])
+
+    for _ in range(5):
+        assert device.get_xyz_limits() is limits
+
+    assert len(device.x.low_limit_travel._callbacks["value"]) == subscriptions
+
+
+@pytest.fixture
+def limit_bundle() -> XYZLimitBundle:
+    FakeEpicsMotor = make_fake_device(EpicsMotor)
+    helpers = []
+    for name, (low, high) in zip("xyz", [(-1, 1), (-2, 2), (-3, 3)]):
+        motor: EpicsMotor = FakeEpicsMotor(name=name)
+        motor.low_limit_travel.sim_put(low)
+        motor.high_limit_travel.sim_put(high)
+        helpers.append(MotorLimitHelper(motor))
+    return XYZLimitBundle(*helpers)
+
+
+def test_bundle_limits_give_low_and_high_of_each_axis(limit_bundle: XYZLimitBundle):
+    low, high = limit_bundle.limits
+
+    np.testing.assert_allclose(low, [-1, -2, -3])
+    np.testing.assert_allclose(high, [1, 2, 3])
+
+
+POSITIONS = [[0, 0, 0], [1.5, 0, 0], [0, -2.5, 3.5], [-1, 2, -3]]
+
+
+def test_when_many_positions_checked_then_mask_matches_single_checks(
+    limit_bundle: XYZLimitBundle,
+):
+    mask = limit_bundle.positions_valid(POSITIONS)
+
+    assert mask.tolist() == [limit_bundle.position_valid(p) for p in POSITIONS]
+    assert mask.tolist() == [True, False, False, True]
+
+
+def test_limit_violations_give_signed_distance_outside_limits_per_axis(
+    limit_bundle: XYZLimitBundle,
+):
+    violations = limit_bundle.limit_violations(POSITIONS)
+
+    np.testing.assert_allclose(
+        violations, [[0, 0, 0], [0.5, 0, 0], [0, -0.5, 0.5], [0, 0, 0]]
+    )
+
+
+def test_clipped_positions_are_within_limits(limit_bundle: XYZLimitBundle):
+    clipped = limit_bundle.clip_to_limits(POSITIONS)
+
+    np.testing.assert_allclose(clipped, [[0, 0, 0], [1, 0, 0], [0, -2, 3], [-1, 2, -3]])
+    assert limit_bundle.positions_valid(clipped).all()
+
+
+def test_when_positions_not_n_by_3_then_raises(limit_bundle: XYZLimitBundle):
+    with pytest.raises(ValueError):
+        limit_bundle.positions_valid([0, 0, 0])
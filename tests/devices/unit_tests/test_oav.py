@@ -45,6 +45,19 @@ def test_snapshot_trigger_handles_request_with_bad_status_code_correctly(
         st.wait()
 
 
+@pytest.mark.parametrize("error", [ConnectionError, OSError])
+@patch("requests.get")
+@patch("dodal.devices.areadetector.plugins.MJPG.Image.open")
+def test_given_snapshot_fails_other_than_bad_status_then_trigger_fails_immediately(
+    mock_open: MagicMock, mock_get: MagicMock, fake_oav: OAV, error
+):
+    mock_open.side_effect = error("Snapshot failed")
+
+    st = fake_oav.snapshot.trigger()
+    with pytest.raises(error):
+        st.wait(1)
+
+
 @patch("requests.get")
 @patch("dodal.devices.areadetector.plugins.MJPG.Image")
 def test_snapshot_trigger_loads_correct_url(
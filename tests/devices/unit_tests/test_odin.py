@@ -1,8 +1,11 @@
+from unittest.mock import MagicMock
+
 import pytest
 from mockito import when
 from ophyd.sim import make_fake_device
 
-from dodal.devices.eiger_odin import EigerOdin
+from dodal.devices.device_executor import get_device_executor
+from dodal.devices.eiger_odin import EigerOdin, OdinNodesStatus, odin_nodes_status_type
 
 
 @pytest.fixture
@@ -120,3 +123,165 @@ def test_wait_for_all_filewriters_to_finish(
     status.wait(1)
     assert status.done
     assert status.success
+
+
+def test_given_node_status_monitored_then_checks_do_not_read_from_epics(
+    fake_odin: EigerOdin,
+):
+    for node in fake_odin.nodes.nodes:
+        for signal_name in fake_odin.nodes.MONITORED_SIGNALS:
+            getattr(node, signal_name).sim_put(0)
+        node.error_message.sim_put("")
+        node.fr_initialised.sim_put(1)
+        node.fp_initialised.sim_put(1)
+    fake_odin.nodes.node_2.frames_dropped.sim_put(3)
+
+    for node in fake_odin.nodes.nodes:
+        for signal_name in fake_odin.nodes.MONITORED_SIGNALS:
+            getattr(node, signal_name).get = MagicMock()
+
+    assert fake_odin.nodes.get_init_state()
+    assert fake_odin.nodes.get_error_state() == (False, "")
+    frames_dropped, message = fake_odin.nodes.check_frames_dropped()
+    assert frames_dropped
+    assert "Filewriter 2 dropped" in message
+    assert not fake_odin.nodes.check_frames_timed_out()[0]
+    fake_odin.nodes.clear_odin_errors()
+
+    for node in fake_odin.nodes.nodes:
+        for signal_name in fake_odin.nodes.MONITORED_SIGNALS:
+            getattr(node, signal_name).get.assert_not_called()
+
+
+def test_given_monitor_update_then_snapshot_timestamp_updated(fake_odin: EigerOdin):
+    fake_odin.nodes.node_1.error_status.sim_put(1)
+    before = fake_odin.nodes.snapshot_timestamp
+
+    fake_odin.nodes.node_1.error_status.sim_put(0)
+
+    assert fake_odin.nodes.snapshot_timestamp >= before
+    assert fake_odin.nodes.snapshot_age() < 1
+
+
+def test_given_error_message_cleared_then_odin_errors_not_cleared_again(
+    fake_odin: EigerOdin,
+):
+    fake_odin.nodes.node_0.error_message.sim_put("Error")
+    fake_odin.nodes.node_1.error_message.sim_put("")
+    for node in fake_odin.nodes.nodes[2:]:
+        node.error_message.sim_put("")
+    for node in fake_odin.nodes.nodes:
+        node.clear_errors.put = MagicMock()
+
+    fake_odin.nodes.clear_odin_errors()
+
+    fake_odin.nodes.node_0.clear_errors.put.assert_called_once_with(1)
+    fake_odin.nodes.node_1.clear_errors.put.assert_not_called()
+
+
+def test_when_snapshot_refreshed_then_values_read_from_epics(fake_odin: EigerOdin):
+    fake_odin.nodes.node_3.error_status.get = MagicMock(return_value=1)
+
+    fake_odin.nodes.refresh_snapshot()
+
+    assert fake_odin.nodes.get_error_state()[0]
+
+
+@pytest.mark.parametrize("num_nodes", [0, -1])
+def test_given_no_nodes_then_odin_type_rejected(num_nodes: int):
+    with pytest.raises(ValueError):
+        EigerOdin.with_num_nodes(num_nodes)
+    with pytest.raises(ValueError):
+        odin_nodes_status_type(num_nodes)
+
+
+def test_when_signal_family_read_then_nodes_read_on_shared_device_executor(
+    fake_odin: EigerOdin,
+):
+    for node in fake_odin.nodes.nodes:
+        node.num_captured.sim_put(5)
+    submitted = get_device_executor().metrics().submitted
+
+    assert fake_odin.nodes.read_signal_family("num_captured") == [5] * 4
+
+    assert get_device_executor().metrics().submitted == submitted + 4
+
+
+@pytest.fixture
+def fake_odin_with_8_nodes():
+    FakeOdin = make_fake_device(EigerOdin.with_num_nodes(8))
+    fake_odin: EigerOdin = FakeOdin(name="test")
+
+    return fake_odin
+
+
+def test_given_default_odin_then_has_4_nodes(fake_odin: EigerOdin):
+    assert isinstance(fake_odin.nodes, OdinNodesStatus)
+    assert [node.prefix for node in fake_odin.nodes.nodes] == [
+        "OD1:",
+        "OD2:",
+        "OD3:",
+        "OD4:",
+    ]
+
+
+def test_odin_types_with_same_number_of_nodes_are_reused():
+    assert EigerOdin.with_num_nodes(4) is EigerOdin
+    assert EigerOdin.with_num_nodes(8) is EigerOdin.with_num_nodes(8)
+    assert odin_nodes_status_type(8) is odin_nodes_status_type(8)
+
+
+def test_given_8_nodes_then_all_nodes_have_expected_prefixes(
+    fake_odin_with_8_nodes: EigerOdin,
+):
+    nodes = fake_odin_with_8_nodes.nodes.nodes
+    assert [node.prefix for node in nodes] == [f"OD{n}:" for n in range(1, 9)]
+
+
+def test_given_8_nodes_then_finished_status_waits_on_all_nodes(
+    fake_odin_with_8_nodes: EigerOdin,
+):
+    nodes = fake_odin_with_8_nodes.nodes.nodes
+    fake_odin_with_8_nodes.meta.ready.sim_put(0)
+    for node in nodes:
+        node.writing.sim_put(1)
+
+    status = fake_odin_with_8_nodes.create_finished_status()
+    for node in nodes[:-1]:
+        node.writing.sim_put(0)
+    assert not status.done
+
+    nodes[-1].writing.sim_put(0)
+    status.wait(1)
+    assert status.success
+
+
+def test_given_error_on_last_of_8_nodes_then_error_reported(
+    fake_odin_with_8_nodes: EigerOdin,
+):
+    nodes = fake_odin_with_8_nodes.nodes
+    for node in nodes.nodes:
+        node.error_status.sim_put(0)
+        node.error_message.sim_put("")
+    nodes.node_7.error_status.sim_put(1)
+    nodes.node_7.error_message.sim_put("Help")
+
+    is_error, error_message = nodes.get_error_state()
+    assert is_error
+    assert error_message.startswith("Filewriter 7")
+    assert error_message.endswith("Help")
+
+
+def test_when_snapshot_refreshed_then_each_signal_read_once_per_node(
+    fake_odin_with_8_nodes: EigerOdin,
+):
+    nodes = fake_odin_with_8_nodes.nodes
+    for node in nodes.nodes:
+        node.num_captured.sim_put(5)
+        node.num_captured.get = MagicMock(return_value=10)
+
+    nodes.refresh_snapshot()
+
+    for node in nodes.nodes:
+        node.num_captured.get.assert_called_once()
+        assert nodes.cached_value(node, "num_captured") == 10
@@ -0,0 +1,186 @@
+import threading
+import time
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+from ophyd import Signal
+from ophyd.sim import make_fake_device
+
+from dodal.devices.eiger_odin import EigerOdin
+from dodal.devices.odin_file_tail import OdinFileTail, summed_intensities
+
+FRAME_SHAPE = (4, 5)
+
+
+class LocalOdinWriter:
+    """Stands in for an Odin filewriter, appending frames to an HDF5 file in SWMR
+    mode and then updating num_captured."""
+
+    def __init__(self, file_path: Path, num_captured: Signal):
+        self.file = h5py.File(file_path, "w", libver="latest")
+        self.dataset = self.file.create_dataset(
+            "data",
+            shape=(0, *FRAME_SHAPE),
+            maxshape=(None, *FRAME_SHAPE),
+            chunks=(1, *FRAME_SHAPE),
+            dtype="uint16",
+        )
+        self.file.swmr_mode = True
+        self.num_captured = num_captured
+        self.num_captured.put(0)
+
+    def write_frames(self, num_frames: int, update_num_captured: bool = True):
+        start = self.dataset.shape[0]
+        self.dataset.resize(start + num_frames, axis=0)
+        for frame in range(start, start + num_frames):
+            self.dataset[frame] = np.full(FRAME_SHAPE, frame, dtype="uint16")
+        self.dataset.flush()
+        if update_num_captured:
+            self.num_captured.put(start + num_frames)
+
+    def close(self):
+        self.file.close()
+
+
+@pytest.fixture
+def num_captured():
+    return Signal(name="num_captured", value=0)
+
+
+@pytest.fixture
+def writer(tmp_path: Path, num_captured: Signal):
+    writer = LocalOdinWriter(tmp_path / "test_000001.h5", num_captured)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def tail(writer: LocalOdinWriter, num_captured: Signal):
+    tail = OdinFileTail(writer.file.filename, timeout=2, poll_period=0.01)
+    tail.follow(num_captured)
+    yield tail
+    tail.close()
+
+
+def test_given_frames_written_then_tail_yields_frames_in_order(
+    writer: LocalOdinWriter, tail: OdinFileTail
+):
+    writer.write_frames(3)
+
+    frames = [frame.copy() for frame in tail.frames(3)]
+
+    assert [frame[0, 0] for frame in frames] == [0, 1, 2]
+    assert frames[0].shape == FRAME_SHAPE
+
+
+def test_given_frames_not_yet_captured_then_tail_does_not_read_them(
+    writer: LocalOdinWriter, tail: OdinFileTail
+):
+    writer.write_frames(2)
+    writer.write_frames(2, update_num_captured=False)
+    tail.stop()
+
+    assert len(list(tail.frames())) == 2
+
+
+def test_chunks_are_views_of_a_reused_buffer(
+    writer: LocalOdinWriter, tail: OdinFileTail
+):
+    tail.chunk_size = 4
+    writer.write_frames(6)
+
+    chunks = list(tail.chunks(6))
+
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert chunks[0].base is chunks[1].base
+
+
+def test_given_frames_written_whilst_tailing_then_all_frames_summed(
+    writer: LocalOdinWriter, tail: OdinFileTail
+):
+    def write_in_background():
+        for _ in range(5):
+            time.sleep(0.01)
+            writer.write_frames(2)
+
+    writing = threading.Thread(target=write_in_background)
+    writing.start()
+    sums = list(summed_intensities(tail, 10))
+    writing.join()
+
+    assert sums == [frame * FRAME_SHAPE[0] * FRAME_SHAPE[1] for frame in range(10)]
+
+
+def test_given_frames_stop_arriving_then_tail_times_out(
+    writer: LocalOdinWriter, tail: OdinFileTail
+):
+    tail.timeout = 0.1
+    writer.write_frames(1)
+
+    with pytest.raises(TimeoutError):
+        list(tail.frames(2))
+
+
+def test_given_file_not_yet_created_then_tail_waits_for_file(
+    tmp_path: Path, num_captured: Signal
+):
+    file_path = tmp_path / "later_000001.h5"
+    tail = OdinFileTail(file_path, timeout=2, poll_period=0.01)
+    tail.follow(num_captured)
+
+    writers = []
+
+    def create_later():
+        time.sleep(0.05)
+        writers.append(LocalOdinWriter(file_path, num_captured))
+        writers[0].write_frames(1)
+
+    creating = threading.Thread(target=create_later)
+    creating.start()
+    frames = [frame.copy() for frame in tail.frames(1)]
+    creating.join()
+    tail.close()
+    writers[0].close()
+
+    assert len(frames) == 1
+
+
+def test_given_dataset_not_yet_in_file_then_file_closed_and_opened_again_later(
+    tmp_path: Path, num_captured: Signal
+):
+    file_path = tmp_path / "empty_000001.h5"
+    h5py.File(file_path, "w", libver="latest").close()
+    tail = OdinFileTail(file_path, timeout=0.1, poll_period=0.01)
+    tail.follow(num_captured)
+
+    with pytest.raises(TimeoutError):
+        list(tail.frames(1))
+    assert tail._file is None
+
+    # Recreating the file would fail if the tail had left it open
+    writer = LocalOdinWriter(file_path, num_captured)
+    writer.write_frames(1)
+    frames = [frame.copy() for frame in tail.frames(1)]
+    tail.close()
+    writer.close()
+
+    assert len(frames) == 1
+
+
+@pytest.mark.parametrize("node_number", [0, 2])
+def test_tail_for_odin_node_follows_the_file_and_num_captured_of_that_node(
+    tmp_path: Path, node_number: int
+):
+    odin: EigerOdin = make_fake_device(EigerOdin)(name="test")
+    odin.file_writer.file_path.sim_put(str(tmp_path))
+    odin.file_writer.file_name.sim_put("test")
+
+    tail = OdinFileTail.for_odin_node(odin, node_number)
+    odin.file_writer.num_captured.sim_put(20)
+    odin.nodes.nodes[node_number].num_captured.sim_put(5)
+
+    assert tail.file_path == tmp_path / f"test_00000{node_number + 1}.h5"
+    assert tail._num_captured == 5
+    tail.close()
@@ -0,0 +1,135 @@
+import math
+from unittest.mock import MagicMock, patch
+
+import pytest
+from ophyd.sim import make_fake_device
+
+from dodal.devices.eiger_odin import EigerOdin
+from dodal.devices.odin_throughput import FrameRateTracker, OdinThroughputMonitor
+
+
+@pytest.fixture
+def fake_odin() -> EigerOdin:
+    FakeOdin = make_fake_device(EigerOdin)
+    return FakeOdin(name="test")
+
+
+@pytest.fixture
+def monitor(fake_odin: EigerOdin):
+    monitor = OdinThroughputMonitor(fake_odin, name="monitor", lag_warning_frames=50)
+    yield monitor
+    monitor.stop_monitoring()
+
+
+def send_frames(odin: EigerOdin, timestamp: float, frames_sent, node_captured):
+    for node, captured in zip(odin.nodes.nodes, node_captured):
+        node.num_captured.sim_put(captured, timestamp=timestamp)
+    odin.fan.frames_sent.sim_put(frames_sent, timestamp=timestamp)
+
+
+def test_frame_rate_tracker_gives_rate_over_window():
+    tracker = FrameRateTracker(window=1.0)
+    for time_s, count in [(0, 0), (0.5, 50), (1.0, 100), (1.5, 200)]:
+        tracker.add(count, time_s)
+
+    assert tracker.rate == pytest.approx(150 / 1.0)
+
+
+def test_frame_rate_tracker_resets_when_counter_goes_backwards():
+    tracker = FrameRateTracker(window=1.0)
+    tracker.add(100, 0)
+    tracker.add(200, 1)
+    tracker.add(0, 2)
+
+    assert tracker.rate == 0
+    assert tracker.count == 0
+
+
+def test_given_nodes_keeping_up_then_rates_and_lag_reported(
+    fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    fake_odin.file_writer.num_capture.sim_put(4000)
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 400, [100, 100, 100, 100])
+
+    assert monitor.aggregate_frame_rate.get() == pytest.approx(400)
+    assert monitor.fan_frame_rate.get() == pytest.approx(400)
+    assert monitor.node_frame_rates.get() == pytest.approx([100] * 4)
+    assert monitor.lag_frames.get() == 0
+    assert monitor.time_remaining.get() == pytest.approx(3600 / 400)
+    assert not monitor.any_node_behind()
+
+
+@patch("dodal.devices.odin_throughput.LOGGER")
+def test_given_node_falls_behind_then_warning_logged_once(
+    mock_logger: MagicMock, fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 800, [200, 200, 120, 200])
+
+    assert monitor.nodes_behind.get() == [False, False, True, False]
+    assert monitor.node_lag_frames.get()[2] == pytest.approx(80)
+    assert monitor.lag_frames.get() == 80
+    mock_logger.warning.assert_called_once()
+    assert "filewriter 2" in mock_logger.warning.call_args[0][0]
+
+    send_frames(fake_odin, 101.5, 810, [202, 202, 122, 202])
+    mock_logger.warning.assert_called_once()
+
+
+@patch("dodal.devices.odin_throughput.LOGGER")
+def test_given_node_drops_frames_then_warning_logged_and_total_reported(
+    mock_logger: MagicMock, fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    fake_odin.nodes.node_1.frames_dropped.sim_put(3)
+    fake_odin.nodes.node_3.frames_timed_out.sim_put(2)
+
+    assert monitor.frames_dropped.get() == 3
+    assert monitor.frames_timed_out.get() == 2
+    assert mock_logger.warning.call_count == 2
+
+
+def test_when_reset_then_frame_totals_and_target_cleared(
+    fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    fake_odin.file_writer.num_capture.sim_put(4000)
+    fake_odin.nodes.node_1.frames_dropped.sim_put(3)
+    fake_odin.nodes.node_3.frames_timed_out.sim_put(2)
+
+    monitor.reset()
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 400, [100, 100, 100, 100])
+
+    assert monitor.frames_dropped.get() == 0
+    assert monitor.frames_timed_out.get() == 0
+    assert math.isnan(monitor.time_remaining.get())
+
+
+def test_given_no_target_then_no_time_remaining(
+    fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    fake_odin.file_writer.num_capture.sim_put(0)
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 400, [100, 100, 100, 100])
+
+    assert math.isnan(monitor.time_remaining.get())
+
+
+def test_monitor_is_readable(fake_odin: EigerOdin, monitor: OdinThroughputMonitor):
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 400, [100, 100, 100, 100])
+
+    reading = monitor.read()
+
+    assert reading["monitor_aggregate_frame_rate"]["value"] == pytest.approx(400)
+    assert "monitor_lag_frames" in monitor.describe()
+
+
+def test_when_monitoring_stopped_then_not_updated(
+    fake_odin: EigerOdin, monitor: OdinThroughputMonitor
+):
+    monitor.stop_monitoring()
+    send_frames(fake_odin, 100.0, 0, [0, 0, 0, 0])
+    send_frames(fake_odin, 101.0, 400, [100, 100, 100, 100])
+
+    assert monitor.aggregate_frame_rate.get() == 0
@@ -1,15 +1,38 @@
+import threading
+from contextlib import ExitStack
+from functools import partial
+from unittest.mock import patch
+
+import numpy as np
 import pytest
+from bluesky.plan_stubs import mv
+from bluesky.run_engine import RunEngine
 from mockito import mock, verify
 from ophyd.sim import make_fake_device
+from ophyd.status import Status
 
+from dodal.devices.device_executor import get_device_executor
 from dodal.devices.zebra import (
+    IN3_TTL,
+    OR1,
+    PC_PULSE,
     GateType,
+    I03Axes,
+    I24Axes,
     LogicGateConfiguration,
     LogicGateConfigurer,
+    Zebra,
+    ZebraConfiguration,
     boolean_array_to_integer,
 )
 
 
+@pytest.fixture
+def zebra() -> Zebra:
+    FakeZebra = make_fake_device(Zebra)
+    return FakeZebra(name="zebra")
+
+
 @pytest.mark.parametrize(
     "boolean_array,expected_integer",
     [
@@ -99,3 +122,273 @@ def test_logic_gate_configuration_with_too_many_sources_then_error():
 
     with pytest.raises(AssertionError):
         config.add_input(5)
+
+
+def test_zebra_configuration_with_logic_gate_gives_same_values_as_configurer():
+    config = ZebraConfiguration().with_logic_gate(
+        GateType.AND, 3, LogicGateConfiguration(32).add_input(51, True).add_input(1)
+    )
+
+    assert config.settings == {
+        "logic_gates.and_gate_3.enable": 7,
+        "logic_gates.and_gate_3.source_1": 32,
+        "logic_gates.and_gate_3.source_2": 51,
+        "logic_gates.and_gate_3.source_3": 1,
+        "logic_gates.and_gate_3.source_4": 0,
+        "logic_gates.and_gate_3.invert": 2,
+    }
+
+
+def test_when_configuration_applied_then_all_settings_written(zebra: Zebra):
+    config = (
+        ZebraConfiguration({"pc.gate_start": 1.5, "pc.num_gates": 10})
+        .with_output(1, OR1)
+        .with_logic_gate(GateType.OR, 1, LogicGateConfiguration(IN3_TTL))
+    )
+
+    zebra.apply_configuration(config).wait(1)
+
+    assert zebra.pc.gate_start.get() == 1.5
+    assert zebra.pc.num_gates.get() == 10
+    assert zebra.output.out_1.get() == OR1
+    assert zebra.logic_gates.or_gate_1.source_1.get() == IN3_TTL
+    assert zebra.changed_settings(config) == {}
+
+
+def test_given_settings_unchanged_then_only_changed_settings_written(zebra: Zebra):
+    zebra.apply_configuration(
+        ZebraConfiguration({"pc.gate_start": 1.5, "output.out_2": PC_PULSE})
+    ).wait(1)
+
+    with patch.object(
+        zebra.pc.gate_start, "set", wraps=zebra.pc.gate_start.set
+    ) as gate_start_set, patch.object(
+        zebra.output.out_2, "set", wraps=zebra.output.out_2.set
+    ) as out_2_set:
+        zebra.apply_configuration(
+            ZebraConfiguration({"pc.gate_start": 2.0, "output.out_2": PC_PULSE})
+        ).wait(1)
+
+    gate_start_set.assert_called_once()
+    out_2_set.assert_not_called()
+    assert zebra.pc.gate_start.get() == 2.0
+
+
+def test_when_settings_change_outside_configuration_then_readback_cache_follows(
+    zebra: Zebra,
+):
+    config = ZebraConfiguration({"pc.gate_width": 3.0})
+    zebra.apply_configuration(config).wait(1)
+
+    zebra.pc.gate_width.sim_put(4.0)
+
+    assert zebra.changed_settings(config) == {"pc.gate_width": 3.0}
+
+
+@pytest.mark.parametrize(
+    "readback, demand, changed",
+    [(3, I03Axes.OMEGA.value, False), (2, I03Axes.OMEGA.value, True), (3, 3, False)],
+)
+def test_given_enum_readback_is_int_then_compared_with_string_setting_by_name(
+    zebra: Zebra, readback: int, demand, changed: bool
+):
+    zebra.pc.gate_trigger.sim_set_enum_strs(["Enc1", "Enc2", "Enc3", "Enc4"])
+    zebra.pc.gate_trigger.sim_put(readback)
+    config = ZebraConfiguration({"pc.gate_trigger": demand})
+
+    assert (zebra.changed_settings(config) != {}) == changed
+
+
+def test_configuration_can_be_applied_in_a_plan(zebra: Zebra):
+    RE = RunEngine()
+
+    RE(mv(zebra.configuration, ZebraConfiguration({"pc.pulse_step": 0.1})))
+
+    assert zebra.pc.pulse_step.get() == 0.1
+
+
+def test_snapshot_captures_all_settings_but_not_commands_or_arm_state(zebra: Zebra):
+    zebra.pc.gate_start.sim_put(5.0)
+    zebra.logic_gates.or_gate_4.invert.sim_put(3)
+    zebra.inputs.soft_in_2.sim_put(1)
+
+    snapshot = zebra.snapshot()
+
+    assert snapshot.settings["pc.gate_start"] == 5.0
+    assert snapshot.settings["logic_gates.or_gate_4.invert"] == 3
+    assert snapshot.settings["inputs.soft_in_2"] == 1
+    assert "output.out_4" in snapshot.settings
+    assert "pc.reset" not in snapshot.settings
+    assert not any(name.startswith("pc.arm.") for name in snapshot.settings)
+
+
+def test_given_no_monitor_updates_yet_then_snapshot_reads_settings_in_parallel(
+    zebra: Zebra,
+):
+    both_reading = threading.Barrier(2, timeout=1)
+    submitted = get_device_executor().metrics().submitted
+
+    def get_when_both_reading(value):
+        both_reading.wait()
+        return value
+
+    with patch.object(
+        zebra.pc.gate_width, "get", side_effect=lambda: get_when_both_reading(2.0)
+    ), patch.object(
+        zebra.pc.gate_start, "get", side_effect=lambda: get_when_both_reading(3.0)
+    ):
+        snapshot = zebra.snapshot()
+
+    assert snapshot.settings["pc.gate_width"] == 2.0
+    assert snapshot.settings["pc.gate_start"] == 3.0
+    assert get_device_executor().metrics().submitted > submitted
+
+
+def test_when_snapshot_restored_then_only_changed_settings_written(zebra: Zebra):
+    snapshot = zebra.snapshot()
+    zebra.apply_configuration(
+        ZebraConfiguration({"pc.gate_start": 1.0}).with_output(2, PC_PULSE)
+    ).wait(1)
+
+    signals = [getattr(zebra, name) for name in snapshot.settings]
+    set_mocks = [patch.object(s, "set", wraps=s.set).start() for s in signals]
+    zebra.restore(snapshot).wait(1)
+    patch.stopall()
+
+    written = [s.name for s, set_mock in zip(signals, set_mocks) if set_mock.called]
+    assert written == [zebra.pc.gate_start.name, zebra.output.out_2.name]
+    assert zebra.changed_settings(snapshot) == {}
+
+
+def test_when_many_gates_configured_then_all_written_before_any_completes(
+    zebra: Zebra,
+):
+    configurer = zebra.logic_gates
+    pending = Status()
+    gates = [configurer.and_gate_1, configurer.or_gate_2]
+    signals = [s for gate in gates for s in [gate.enable, *gate.sources, gate.invert]]
+    set_mocks = [patch.object(s, "set", return_value=pending).start() for s in signals]
+
+    status = configurer.apply_gate_configs(
+        {
+            (GateType.AND, 1): LogicGateConfiguration(IN3_TTL),
+            (GateType.OR, 2): LogicGateConfiguration(PC_PULSE).add_input(OR1, True),
+        }
+    )
+    patch.stopall()
+
+    assert all(set_mock.call_count == 1 for set_mock in set_mocks)
+    assert not status.done
+    pending.set_finished()
+    status.wait(1)
+
+
+def test_apply_gate_configs_writes_each_gate(zebra: Zebra):
+    configurer = zebra.logic_gates
+
+    configurer.apply_gate_configs(
+        {
+            (GateType.AND, 3): LogicGateConfiguration(IN3_TTL),
+            (GateType.OR, 1): LogicGateConfiguration(PC_PULSE).add_input(OR1, True),
+        }
+    ).wait(1)
+
+    assert [s.get() for s in configurer.and_gate_3.sources] == [IN3_TTL, 0, 0, 0]
+    assert [s.get() for s in configurer.or_gate_1.sources] == [PC_PULSE, OR1, 0, 0]
+    assert configurer.or_gate_1.enable.get() == 3
+    assert configurer.or_gate_1.invert.get() == 2
+
+
+def put_captured_points(zebra: Zebra, num_points: int, num_downloaded: int):
+    capture = zebra.capture
+    capture.time.sim_put(np.arange(num_points) * 0.5)
+    for encoder_number, encoder in enumerate(capture.encoders):
+        encoder.sim_put(np.arange(num_points) + 100 * encoder_number)
+    capture.num_captured.sim_put(num_downloaded)
+    capture.num_downloaded.sim_put(num_downloaded)
+
+
+def test_when_captured_points_read_then_arrays_truncated_to_downloaded(zebra: Zebra):
+    put_captured_points(zebra, 10, 6)
+
+    data = zebra.capture.read_captured()
+
+    assert len(data) == 6
+    np.testing.assert_array_equal(data.time, np.arange(6) * 0.5)
+    assert data.encoders.shape == (6, 4)
+    np.testing.assert_array_equal(data.positions(I03Axes.OMEGA), np.arange(6) + 300)
+    np.testing.assert_array_equal(data.positions(I24Axes.OMEGA), np.arange(6) + 100)
+
+
+def test_when_captured_points_read_then_waveforms_read_in_parallel(zebra: Zebra):
+    put_captured_points(zebra, 10, 6)
+    capture = zebra.capture
+    all_reading = threading.Barrier(5, timeout=1)
+
+    def get_when_all_reading(waveform):
+        all_reading.wait()
+        return waveform
+
+    with ExitStack() as stack:
+        for signal in [capture.time, *capture.encoders]:
+            stack.enter_context(
+                patch.object(
+                    signal,
+                    "get",
+                    side_effect=partial(get_when_all_reading, signal.get()),
+                )
+            )
+        data = capture.read_captured()
+
+    np.testing.assert_array_equal(data.time, np.arange(6) * 0.5)
+
+
+def test_given_fewer_points_captured_than_downloaded_then_points_truncated_to_captured(
+    zebra: Zebra,
+):
+    put_captured_points(zebra, 10, 6)
+    zebra.capture.num_captured.sim_put(2)
+
+    data = zebra.capture.read_captured()
+
+    assert len(data) == 2
+    assert data.encoders.shape == (2, 4)
+
+
+def test_when_streaming_then_each_new_block_of_points_given_once(zebra: Zebra):
+    blocks = []
+    stop = zebra.capture.stream(blocks.append)
+
+    put_captured_points(zebra, 10, 4)
+    put_captured_points(zebra, 10, 10)
+    stop()
+    put_captured_points(zebra, 20, 20)
+
+    assert [(block.first_point, len(block)) for block in blocks] == [(0, 4), (4, 6)]
+    np.testing.assert_array_equal(
+        np.concatenate([block.positions(I03Axes.SMARGON_Y) for block in blocks]),
+        np.arange(10) + 100,
+    )
+
+
+def test_given_zebra_rearmed_then_streaming_restarts_from_first_point(zebra: Zebra):
+    blocks = []
+    zebra.capture.stream(blocks.append)
+
+    put_captured_points(zebra, 10, 10)
+    zebra.capture.num_downloaded.sim_put(0)
+    put_captured_points(zebra, 3, 3)
+
+    assert [(block.first_point, len(block)) for block in blocks] == [(0, 10), (0, 3)]
+
+
+def test_given_waveforms_behind_count_then_missing_points_streamed_later(
+    zebra: Zebra,
+):
+    blocks = []
+    zebra.capture.stream(blocks.append)
+
+    put_captured_points(zebra, 5, 8)
+    put_captured_points(zebra, 8, 9)
+
+    assert [(block.first_point, len(block)) for block in blocks] == [(0, 5), (5, 3)]
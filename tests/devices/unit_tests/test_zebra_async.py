@@ -0,0 +1,150 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from ophyd.v2.core import set_sim_callback, set_sim_value
+from ophyd.v2.epics import epics_signal_rw
+
+from dodal.devices.sim import EigerSimLatencies, make_simulated_eiger_async
+from dodal.devices.zebra import (
+    IN3_TTL,
+    OR1,
+    PC_PULSE,
+    ArmDemand,
+    GateType,
+    I03Axes,
+    LogicGateConfiguration,
+    ZebraConfiguration,
+)
+from dodal.devices.zebra_async import ZebraAsync
+
+from .test_eiger import create_new_params
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def make_zebra(respond_to_arming: bool = True) -> ZebraAsync:
+    zebra = ZebraAsync("BL03S-EA-ZEBRA-01:", name="zebra")
+    await zebra.connect(sim=True)
+
+    def arm_requested(reading, value):
+        if value and respond_to_arming:
+            set_sim_value(zebra.pc.arm.armed, 1)
+
+    def disarm_requested(reading, value):
+        if value and respond_to_arming:
+            set_sim_value(zebra.pc.arm.armed, 0)
+
+    set_sim_callback(zebra.pc.arm.arm_set, arm_requested)
+    set_sim_callback(zebra.pc.arm.disarm_set, disarm_requested)
+    return zebra
+
+
+GRIDSCAN_CONFIG = (
+    ZebraConfiguration({"pc.gate_trigger": I03Axes.OMEGA.value, "pc.gate_start": 1.5})
+    .with_output(1, OR1)
+    .with_logic_gate(GateType.OR, 1, LogicGateConfiguration(IN3_TTL))
+)
+
+
+@pytest.mark.asyncio
+async def test_when_configured_then_all_settings_written():
+    zebra = await make_zebra()
+
+    await zebra.configure(GRIDSCAN_CONFIG)
+
+    assert await zebra.pc.gate_trigger.get_value() == "Enc4"
+    assert await zebra.pc.gate_start.get_value() == 1.5
+    assert await zebra.output.out_1.get_value() == OR1
+    assert await zebra.logic_gates.or_gate_1.source_1.get_value() == IN3_TTL
+    assert await zebra.changed_settings(GRIDSCAN_CONFIG) == {}
+
+
+@pytest.mark.asyncio
+async def test_given_enum_setting_then_compared_with_string_demand_by_value():
+    zebra = ZebraAsync("BL03S-EA-ZEBRA-01:", name="zebra")
+    zebra.pc.gate_trigger = epics_signal_rw(I03Axes, "BL03S-EA-ZEBRA-01:PC_ENC")
+    zebra.set_name("zebra")
+    await zebra.connect(sim=True)
+
+    set_sim_value(zebra.pc.gate_trigger, I03Axes.OMEGA)
+
+    unchanged = ZebraConfiguration({"pc.gate_trigger": I03Axes.OMEGA.value})
+    changed = ZebraConfiguration({"pc.gate_trigger": I03Axes.SMARGON_Y.value})
+    assert await zebra.changed_settings(unchanged) == {}
+    assert await zebra.changed_settings(changed) == {"pc.gate_trigger": "Enc2"}
+
+
+@pytest.mark.asyncio
+async def test_given_settings_unchanged_then_not_written_again():
+    zebra = await make_zebra()
+    await zebra.configure(GRIDSCAN_CONFIG)
+
+    with patch.object(
+        zebra.pc.gate_start, "set", wraps=zebra.pc.gate_start.set
+    ) as gate_start_set:
+        await zebra.configure(
+            ZebraConfiguration({"pc.gate_start": 1.5, "pc.gate_width": 2.0})
+        )
+
+    gate_start_set.assert_not_called()
+    assert await zebra.pc.gate_width.get_value() == 2.0
+
+
+@pytest.mark.asyncio
+async def test_when_many_gates_configured_then_each_gate_written():
+    zebra = await make_zebra()
+    gates = zebra.logic_gates
+
+    await gates.apply_gate_configs(
+        {
+            (GateType.AND, 3): LogicGateConfiguration(IN3_TTL),
+            (GateType.OR, 1): LogicGateConfiguration(PC_PULSE).add_input(OR1, True),
+        }
+    )
+    await gates.apply_and_gate_config(1, LogicGateConfiguration(OR1))
+
+    sources = [await source.get_value() for source in gates.or_gate_1.sources]
+    assert sources == [PC_PULSE, OR1, 0, 0]
+    assert await gates.or_gate_1.enable.get_value() == 3
+    assert await gates.or_gate_1.invert.get_value() == 2
+    assert await gates.and_gate_3.source_1.get_value() == IN3_TTL
+    assert await gates.and_gate_1.source_1.get_value() == OR1
+
+
+@pytest.mark.asyncio
+async def test_arming_completes_once_zebra_reports_armed_and_disarm_reverses_it():
+    zebra = await make_zebra()
+
+    await asyncio.wait_for(zebra.arm(ArmDemand.ARM), 1)
+    assert await zebra.pc.is_armed()
+
+    await asyncio.wait_for(zebra.arm(ArmDemand.DISARM), 1)
+    assert not await zebra.pc.is_armed()
+
+
+@pytest.mark.asyncio
+async def test_given_zebra_never_arms_then_arming_times_out():
+    zebra = await make_zebra(respond_to_arming=False)
+    zebra.pc.arm.TIMEOUT = 0.01
+
+    with pytest.raises(asyncio.TimeoutError):
+        await zebra.arm(ArmDemand.ARM)
+
+
+@pytest.mark.asyncio
+async def test_zebra_can_be_configured_and_armed_whilst_detector_arms():
+    zebra = await make_zebra()
+    eiger, sim = await make_simulated_eiger_async(
+        create_new_params(), EigerSimLatencies(put=0.005, fan_ready=0.01)
+    )
+
+    async def configure_and_arm_zebra():
+        await zebra.configure(GRIDSCAN_CONFIG)
+        await zebra.arm(ArmDemand.ARM)
+
+    await asyncio.gather(eiger.arm(), configure_and_arm_zebra())
+
+    assert await eiger.is_armed()
+    assert await zebra.pc.is_armed()
+    sim.close()